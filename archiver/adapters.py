@@ -1,20 +1,83 @@
 import logging
 import os
+import random
 import re
-import io
-from typing import List, Optional, Union
+import asyncio
+import hashlib
+import threading
+import time
+from typing import List, Optional, Sequence, Union
+from urllib.parse import urlencode
 from common.constants import NOTION_CATEGORIES
 import google.genai as genai
+from google.genai import types
 import requests
 from django.conf import settings
-from PIL import Image
 
 from common.exceptions import LLMServiceError, NotionAPIError
 from .dto import QnACreateDTO, QnAResponseDTO
+from .fingerprints import image_parts
+from .images import sniff_mime_type
+from .llm_cache import cache_key, get_response_cache
 from .models import QnALog
+from .ratelimit import acquire_token
 
 logger = logging.getLogger(__name__)
 
+# 이미지 한 장(bytes) 또는 여러 장(bytes 목록)
+ImageData = Union[bytes, Sequence[bytes], None]
+
+# 재시도할 노션 응답 코드 (429: 호출 제한, 5xx: 일시적 서버 오류)
+NOTION_RETRY_STATUSES = {429, 500, 502, 503, 504}
+# 처리 여부를 알 수 없는 5xx가 있으므로 생성/추가 요청은 처리되지 않은 것이 확실한 429만 재시도
+NOTION_NON_IDEMPOTENT_RETRY_STATUSES = {429}
+
+# 노션 API 제한: rich_text 객체 하나의 글자 수, 블록 하나의 rich_text 개수, 요청 하나의 자식 블록 수
+NOTION_TEXT_LIMIT = 2000
+NOTION_RICH_TEXT_LIMIT = 100
+NOTION_CHILDREN_LIMIT = 100
+
+# 노션에서 고친 값을 되가져올 속성 → QnALog 필드 (질문내용/질문횟수는 DB가 원본이라 제외)
+NOTION_EDITABLE_PROPERTIES = {"이름": "title", "AI답변": "ai_answer", "카테고리": "category", "키워드": "keywords"}
+
+# notion_synced_properties 안에 본문 서명을 넣어 두는 키 (노션 속성이 아니므로 PATCH에는 들어가지 않음)
+NOTION_BODY_KEY = "_body"
+
+# 답변의 ``` 코드 블록 (닫는 ```가 없으면 끝까지 코드로 봄)
+_CODE_FENCE = re.compile(r"^[ \t]*```[ \t]*([^\n`]*)\n(.*?)(?:^[ \t]*```[ \t]*$|\Z)", re.DOTALL | re.MULTILINE)
+# 노션 코드 블록이 지원하는 언어 이름으로 변환 (없는 언어는 plain text)
+NOTION_CODE_LANGUAGES = {
+    "python": "python", "py": "python", "javascript": "javascript", "js": "javascript",
+    "typescript": "typescript", "ts": "typescript", "bash": "bash", "sh": "shell", "shell": "shell",
+    "zsh": "shell", "console": "shell", "sql": "sql", "json": "json", "html": "html", "css": "css",
+    "yaml": "yaml", "yml": "yaml", "toml": "toml", "dockerfile": "docker", "docker": "docker",
+    "java": "java", "c": "c", "cpp": "c++", "c++": "c++", "go": "go", "rust": "rust",
+    "markdown": "markdown", "md": "markdown", "diff": "diff", "xml": "xml", "makefile": "makefile",
+}
+
+_notion_session = None
+_notion_session_pid = None
+_notion_session_lock = threading.Lock()
+
+
+def get_notion_session() -> requests.Session:
+    """
+    프로세스당 하나의 keep-alive 세션을 재사용합니다 (매 호출마다 TLS 핸드셰이크 방지)
+    Django-Q 워커는 fork로 생성되므로 pid가 바뀌면 새 세션을 만듭니다
+    """
+    global _notion_session, _notion_session_pid
+    if _notion_session is None or _notion_session_pid != os.getpid():
+        with _notion_session_lock:
+            if _notion_session is None or _notion_session_pid != os.getpid():
+                session = requests.Session()
+                pool_size = getattr(settings, "NOTION_POOL_SIZE", 4)
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _notion_session = session
+                _notion_session_pid = os.getpid()
+    return _notion_session
+
 
 def create_qna_dto_from_ai_response(
     question_text: str,
@@ -64,27 +127,176 @@ def qna_model_to_response_dto(qna: QnALog) -> QnAResponseDTO:
     return QnAResponseDTO.model_validate(qna)
 
 
+def notion_page_id(page_url: Optional[str]) -> Optional[str]:
+    """노션 페이지 URL 끝의 32자리 페이지 id (형식이 다르면 None)"""
+    match = re.search(r"([0-9a-fA-F]{32})/?(?:[?#].*)?$", page_url or "")
+    return match.group(1).lower() if match else None
+
+
+def build_notion_properties(dto: Union[QnACreateDTO, QnALog]) -> dict:
+    """노션 데이터베이스 속성 값 (페이지 생성과 변경분 동기화에서 같이 사용)"""
+    properties = {
+        "이름": {"title": [{"text": {"content": (dto.title or "질문")[:100]}}]},
+        "질문내용": {
+            "rich_text": [
+                {"text": {"content": (dto.question_text or "내용 없음")[:1990]}}
+            ]
+        },
+        "AI답변": {
+            "rich_text": [
+                {"text": {"content": (dto.ai_answer or "답변 대기 중")[:1990]}}
+            ]
+        },
+        "카테고리": {"select": {"name": dto.category or "General"}},
+        "질문횟수": {"number": int(dto.hit_count or 1)},
+    }
+
+    # 멀티 셀렉트(키워드) 처리
+    if dto.keywords:
+        properties["키워드"] = {
+            "multi_select": [{"name": kw[:50]} for kw in dto.keywords]
+        }
+    return properties
+
+
+def _rich_text(content: str) -> list:
+    """글자 수 제한에 맞춰 나눈 rich_text 목록"""
+    return [
+        {"type": "text", "text": {"content": content[start:start + NOTION_TEXT_LIMIT]}}
+        for start in range(0, len(content), NOTION_TEXT_LIMIT)
+    ]
+
+
+def _text_blocks(block_type: str, content: str, **extra) -> list:
+    """같은 종류의 블록으로 내용을 담습니다 (rich_text 개수 제한을 넘으면 블록을 이어서 나눔)"""
+    pieces = _rich_text(content)
+    return [
+        {
+            "object": "block",
+            "type": block_type,
+            block_type: {"rich_text": pieces[start:start + NOTION_RICH_TEXT_LIMIT], **extra},
+        }
+        for start in range(0, max(len(pieces), 1), NOTION_RICH_TEXT_LIMIT)
+    ]
+
+
+def _paragraph_blocks(text: str) -> list:
+    blocks = []
+    for paragraph in re.split(r"\n[ \t]*\n", text):
+        paragraph = paragraph.strip("\n")
+        if paragraph.strip():
+            blocks += _text_blocks("paragraph", paragraph)
+    return blocks
+
+
+def _markdown_blocks(text: str) -> list:
+    """빈 줄로 나눈 문단은 paragraph, ``` 코드는 줄바꿈/들여쓰기를 그대로 code 블록으로 만듭니다"""
+    blocks, position = [], 0
+    for match in _CODE_FENCE.finditer(text):
+        blocks += _paragraph_blocks(text[position:match.start()])
+        language = (match.group(1).split() or ["plain text"])[0].lower()
+        code = match.group(2).removesuffix("\n")
+        blocks += _text_blocks("code", code, language=NOTION_CODE_LANGUAGES.get(language, "plain text"))
+        position = match.end()
+    return blocks + _paragraph_blocks(text[position:])
+
+
+def build_notion_blocks(dto: Union[QnACreateDTO, QnALog]) -> list:
+    """페이지 본문 블록: 잘리지 않은 질문과 AI 답변 전체 (속성에는 앞부분만 들어감)"""
+    return [
+        *_text_blocks("heading_2", "질문"),
+        *_markdown_blocks(dto.question_text or "내용 없음"),
+        *_text_blocks("heading_2", "AI 답변"),
+        *_markdown_blocks(dto.ai_answer or "답변 대기 중"),
+    ]
+
+
+def notion_body_signature(dto: Union[QnACreateDTO, QnALog]) -> str:
+    """본문 블록을 만드는 질문/답변 원문의 서명 (달라졌을 때만 본문을 다시 씀)"""
+    text = f"{dto.question_text or ''}\0{dto.ai_answer or ''}"
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def notion_snapshot(dto: Union[QnACreateDTO, QnALog]) -> dict:
+    """노션에 반영한 상태 (보낸 속성 + 본문 서명, notion_synced_properties에 저장)"""
+    return {**build_notion_properties(dto), NOTION_BODY_KEY: notion_body_signature(dto)}
+
+
+def _plain_text(items: list) -> str:
+    # 조회 결과는 plain_text, 보낸 속성은 text.content에 내용이 있음
+    return "".join(item.get("plain_text", item.get("text", {}).get("content", "")) for item in items)
+
+
+def notion_property_value(prop: Optional[dict]) -> str:
+    """노션 속성 하나의 값을 QnALog 필드 형식의 문자열로 꺼냅니다 (키워드는 쉼표로 연결)"""
+    prop = prop or {}
+    if "title" in prop:
+        return _plain_text(prop["title"])
+    if "rich_text" in prop:
+        return _plain_text(prop["rich_text"])
+    if "select" in prop:
+        return (prop["select"] or {}).get("name", "")
+    if "multi_select" in prop:
+        return ", ".join(option["name"] for option in prop["multi_select"])
+    return ""
+
+
+def notion_edits(remote: dict, synced: dict) -> dict:
+    """
+    노션 페이지의 현재 속성(remote)과 마지막으로 보낸 속성(synced)을 비교해 노션에서 고친 속성만 반환합니다
+    ({속성 이름: 값}, 노션에 없는 속성은 비교하지 않음)
+    """
+    return {
+        name: notion_property_value(remote[name])
+        for name in NOTION_EDITABLE_PROPERTIES
+        if name in remote and notion_property_value(remote[name]) != notion_property_value(synced.get(name))
+    }
+
+
+def changed_properties(current: dict, synced: dict) -> dict:
+    """마지막으로 노션에 반영한 속성(synced)과 비교해 달라진 속성만 반환합니다 (빠진 키워드는 비움)"""
+    changed = {name: value for name, value in current.items() if synced.get(name) != value}
+    if "키워드" in synced and "키워드" not in current:
+        changed["키워드"] = {"multi_select": []}
+    return changed
+
+
+_gemini_client = None
+_gemini_client_options = None
+_gemini_client_lock = threading.Lock()
+
+
+def get_gemini_client(api_key: str) -> genai.Client:
+    """
+    프로세스 공용 Gemini 클라이언트를 반환합니다 (처음 호출될 때 생성)
+    동기 호출(client.models)과 비동기 호출(client.aio.models)이 각각 HTTP 연결 풀을 요청 간에 재사용합니다
+    API 키나 GEMINI_API_BASE_URL이 바뀌거나 fork된 워커 프로세스에서는 새로 만듭니다 (연결 풀은 프로세스 간에 공유하지 않음)
+    """
+    global _gemini_client, _gemini_client_options
+    options = (api_key, settings.GEMINI_API_BASE_URL, os.getpid())
+    if _gemini_client is None or _gemini_client_options != options:
+        with _gemini_client_lock:
+            if _gemini_client is None or _gemini_client_options != options:
+                _gemini_client = genai.Client(
+                    api_key=api_key, http_options=types.HttpOptions(base_url=settings.GEMINI_API_BASE_URL)
+                )
+                _gemini_client_options = options
+    return _gemini_client
+
+
 class GeminiAdapter:
     """Gemini API와 통신을 전담하는 어댑터"""
 
-    _client_configured = False  # 클래스 변수로 설정 여부 관리
+    model_name = "models/gemini-2.5-flash"
 
     def __init__(self):
         self.api_key = getattr(settings, "GEMINI_API_KEY", None)
         if not self.api_key:
             raise LLMServiceError("GEMINI_API_KEY가 설정되지 않았습니다")
-        # do not configure client here; lazy configure in _setup_client
-
-    def _setup_client(self):
-        # Lazy Singleton: 설정이 안되있을떄만 실행
-        if not GeminiAdapter._client_configured:
-            api_key = self.api_key or os.getenv("GEMINI_API_KEY")
-            if not api_key:
-                raise LLMServiceError("GEMINI_API_KEY missing")
-            # prefer configure if available
-            if hasattr(genai, "configure"):
-                genai.configure(api_key=api_key)
-            GeminiAdapter._client_configured = True
+
+    @property
+    def client(self) -> genai.Client:
+        return get_gemini_client(self.api_key)
 
     def _build_prompt(self, question_text: str) -> str:
         """AI에게 보낼 프롬프트를 구성합니다"""
@@ -103,65 +315,156 @@ class GeminiAdapter:
         3. **해결 코드**: (중요 코드 블록. 설명은 주석으로)                                                                                                                   
         4. **체크포인트**: (실수 방지 팁 하나)                                                                                                                                
 
-        질문 내용: {question_text}                                                                                                                                            
+        질문 내용: {question_text or "(첨부한 스크린샷 참고)"}                                                                                                                                            
         """
 
-    def generate_answer(self, question_text: str, image_data: Optional[bytes] = None) -> QnACreateDTO:
-        self._setup_client()
-
-
+    def _build_contents(self, question_text: str, image_data: ImageData = None) -> list:
+        """이미지(선택, 여러 장 가능)와 프롬프트로 모델 입력을 구성합니다"""
         content_parts = []
-        if image_data:
-            try:
-                img = Image.open(io.BytesIO(image_data))
-                content_parts.append(img)
-                logger.info("이미지 로딩 성공")
-            except Exception as e:
-                logger.warning(f"이미지 로딩 에러: {e}")
+        for part in image_parts(image_data):
+            # 서비스에서 전처리(images.prepare_image)한 바이트를 그대로 보냄
+            # (PIL 이미지를 넘기면 SDK가 다시 인코딩하면서 요청이 커짐)
+            content_parts.append(types.Part.from_bytes(data=part, mime_type=sniff_mime_type(part)))
         prompt = self._build_prompt(question_text)
         content_parts.append(prompt)
+        return content_parts
+
+    def _generation_config(self) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(max_output_tokens=2048, temperature=0.7)
+
+    def _parse_response(self, question_text: str, response) -> QnACreateDTO:
+        """모델 응답을 검사하고 QnACreateDTO로 변환합니다"""
+        # 응답 텍스트 추출 로직 간소화
+        if response.prompt_feedback and response.prompt_feedback.block_reason:
+            block_reason = response.prompt_feedback.block_reason
+            logger.warning(
+                f"Gemini 응답 차단되었습니다. 이유: {block_reason}")
+            raise LLMServiceError(f"AI 응답이 차단되었습니다: {block_reason}")
+
+        if not response.text:
+            finish_reason = response.candidates[0].finish_reason if response.candidates else 'N/A'
+            logger.warning(f"Gemini 응답이 비어있음 이유: {finish_reason}")
+            raise LLMServiceError("AI 응답이 비어있습니다")
+
+        return create_qna_dto_from_ai_response(
+            question_text=question_text,
+            ai_raw_text =response.text
+        )
+
+    def _to_service_error(self, e: Exception) -> LLMServiceError:
+        """SDK 예외를 LLMServiceError로 변환합니다"""
+        if isinstance(e, LLMServiceError):
+            return e
+
+        msg = str(e).lower()
+        # 힐당량 초과 및 기타 에러 핸들링
+        if "quota" in msg or "rate" in msg:
+            logger.warning(f" Quota/Rate limit error {e}")
+            return LLMServiceError("API 할달량 초과, 나중에 재시도하세여")
+        logger.error(f"Gemini API 에러 {e}", exc_info=True)
+        # 더이상 클라이언트 미지원 에러를 던지지말고 실제 발생 에러를 전달
+        return LLMServiceError(f"AI 응답 생성 실패: {str(e)}")
+
+    def _cache_key(self, question_text: str, image_data: ImageData) -> str:
+        parts = image_parts(image_data)
+        # 한 장이면 기존 키와 같게, 여러 장이면 각 이미지 해시를 이어 붙인 값으로 계산
+        images_key = parts[0] if len(parts) == 1 else b"".join(hashlib.sha256(p).digest() for p in parts)
+        return cache_key(self.model_name, self._build_prompt(question_text), images_key)
+
+    def _cache_response(self, cache, key: str, response):
+        # 정상 응답(_parse_response 통과)만 저장합니다
+        if isinstance(response.text, str):
+            cache.set(key, response.text)
+
+    def generate_answer(self, question_text: str, image_data: ImageData = None) -> QnACreateDTO:
+        # 같은 입력(모델, 프롬프트, 이미지)으로 받은 응답이 있으면 재사용
+        cache = get_response_cache()
+        key = self._cache_key(question_text, image_data) if cache else None
+        cached_text = cache.get(key) if cache else None
+        if cached_text is not None:
+            logger.info("Gemini 응답 캐시 사용")
+            return create_qna_dto_from_ai_response(question_text=question_text, ai_raw_text=cached_text)
+
+        content_parts = self._build_contents(question_text, image_data)
 
         try:
-            # 모델 선언 및 호출 방식 단순화 (표준 SDK방식)
-            model = genai.GenerativeModel("models/gemini-2.5-flash")
-
-            # 안전 설정 및 생성 설정 추가
-            response = model.generate_content(
-                content_parts,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=2048, temperature=0.7
-                ),
+            response = self.client.models.generate_content(
+                model=self.model_name,
+                contents=content_parts,
+                config=self._generation_config(),
             )
+            dto = self._parse_response(question_text, response)
 
-            # 응답 텍스트 추출 로직 간소화
-            if response.prompt_feedback.block_reason:
-                block_reason = response.prompt_feedback.block_reason
-                logger.warning(
-                    f"Gemini 응답 차단되었습니다. 이유: {block_reason}")
-                raise LLMServiceError(f"AI 응답이 차단되었습니다: {block_reason}")
-
-            if not response.text:
-                finish_reason = response.candidates[0].finish_reason if response.candidates else 'N/A'
-                logger.warning(f"Gemini 응답이 비어있음 이유: {finish_reason}")
-                raise LLMServiceError("AI 응답이 비어있습니다")
-
-            return create_qna_dto_from_ai_response(
-                question_text=question_text,
-                ai_raw_text =response.text
+        except Exception as e:
+            raise self._to_service_error(e)
+
+        if cache:
+            self._cache_response(cache, key, response)
+        return dto
+
+    async def agenerate_answer(self, question_text: str, image_data: ImageData = None) -> QnACreateDTO:
+        """
+        generate_answer의 비동기 버전
+        SDK의 async 호출을 사용하므로 응답을 기다리는 동안 이벤트 루프(워커)를 점유하지 않습니다
+        """
+        # 캐시 파일 접근은 잠금 대기가 있을 수 있으므로 이벤트 루프 밖에서 수행
+        cache = get_response_cache()
+        key = self._cache_key(question_text, image_data) if cache else None
+        cached_text = await asyncio.to_thread(cache.get, key) if cache else None
+        if cached_text is not None:
+            logger.info("Gemini 응답 캐시 사용")
+            return create_qna_dto_from_ai_response(question_text=question_text, ai_raw_text=cached_text)
+
+        content_parts = self._build_contents(question_text, image_data)
+
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.model_name,
+                contents=content_parts,
+                config=self._generation_config(),
             )
+            dto = self._parse_response(question_text, response)
 
         except Exception as e:
-            if isinstance(e, LLMServiceError):
-                raise e
+            raise self._to_service_error(e)
 
-            msg = str(e).lower()
-            # 힐당량 초과 및 기타 에러 핸들링
-            if "quota" in msg or "rate" in msg:
-                logger.warning(f" Quota/Rate limit error {e}")
-                raise LLMServiceError("API 할달량 초과, 나중에 재시도하세여")
-            logger.error(f"Gemini API 에러 {e}", exc_info=True)
-            # 더이상 클라이언트 미지원 에러를 던지지말고 실제 발생 에러를 전달
-            raise LLMServiceError(f"AI 응답 생성 실패: {str(e)}")
+        if cache:
+            await asyncio.to_thread(self._cache_response, cache, key, response)
+        return dto
+
+    async def astream_answer(self, question_text: str, image_data: ImageData = None):
+        """
+        agenerate_answer의 스트리밍 버전
+        응답 텍스트 조각을 생성되는 대로 yield하며, 전체 텍스트의 파싱(QnACreateDTO)은 호출한 쪽에서 합니다
+        """
+        cache = get_response_cache()
+        key = self._cache_key(question_text, image_data) if cache else None
+        cached_text = await asyncio.to_thread(cache.get, key) if cache else None
+        if cached_text is not None:
+            logger.info("Gemini 응답 캐시 사용")
+            yield cached_text
+            return
+
+        content_parts = self._build_contents(question_text, image_data)
+        parts = []
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=self.model_name,
+                contents=content_parts,
+                config=self._generation_config(),
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+        except Exception as e:
+            raise self._to_service_error(e)
+
+        if not parts:
+            logger.warning("Gemini 스트리밍 응답이 비어있음")
+            raise LLMServiceError("AI 응답이 비어있습니다")
+        if cache:
+            await asyncio.to_thread(cache.set, key, "".join(parts))
 
 
 class NotionAdapter:
@@ -174,56 +477,175 @@ class NotionAdapter:
         if not self.token or not self.database_id:
             raise NotionAPIError("NOTION_TOKEN 또는 NOTION_DB_ID가 설정되지 않았습니다")
 
-        self.url = "https://api.notion.com/v1/pages"
+        self.base_url = getattr(settings, "NOTION_API_URL", "https://api.notion.com/v1")
+        self.url = f"{self.base_url}/pages"
         self.headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json",
             "Notion-Version": "2022-06-28",
         }
+        self.session = get_notion_session()
+        self.rate_limit = getattr(settings, "NOTION_RATE_LIMIT", 3.0)
+        self.rate_burst = getattr(settings, "NOTION_RATE_BURST", 3)
+        self.max_retries = getattr(settings, "NOTION_MAX_RETRIES", 5)
+
+    def _request(
+        self, method: str, url: str, payload: Optional[dict] = None, idempotent: bool = True
+    ) -> requests.Response:
+        """
+        노션 API 호출 공통 처리
+        - 모든 워커가 공유하는 토큰 버킷으로 호출 속도를 제한 (NOTION_RATE_LIMIT req/s)
+        - 429/5xx 응답은 Retry-After(없으면 지수 백오프)만큼 기다린 뒤 재시도
+        - 페이지 생성/블록 추가처럼 다시 보내면 중복되는 요청(idempotent=False)은 429만 재시도
+        """
+        retry_statuses = NOTION_RETRY_STATUSES if idempotent else NOTION_NON_IDEMPOTENT_RETRY_STATUSES
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limit > 0:
+                acquire_token("notion", self.rate_limit, self.rate_burst)
+            # 타임아웃을 설정하여 무한 대기를 방지합니다
+            response = self.session.request(method, url, headers=self.headers, json=payload, timeout=10)
+            if response.status_code not in retry_statuses or attempt == self.max_retries:
+                return response
 
-    def create_qna_page(self, dto: Union[QnACreateDTO, QnALog]) -> str:
-        """DTO를 받아서 노션 페이지를 생성하고 생성된 페이지 URL 반환"""
-        properties = {
-            "이름": {"title": [{"text": {"content": (dto.title or "질문")[:100]}}]},
-            "질문내용": {
-                "rich_text": [
-                    {"text": {"content": (dto.question_text or "내용 없음")[:1990]}}
-                ]
-            },
-            "AI답변": {
-                "rich_text": [
-                    {"text": {"content": (dto.ai_answer or "답변 대기 중")[:1990]}}
-                ]
-            },
-            "카테고리": {"select": {"name": dto.category or "General"}},
-            "질문횟수": {"number": int(dto.hit_count or 1)},
-        }
+            delay = self._retry_delay(response, attempt)
+            logger.warning(
+                f"노션 API {response.status_code} 응답, {delay:.2f}초 후 재시도 ({attempt + 1}/{self.max_retries})"
+            )
+            time.sleep(delay)
+        return response
 
-        # 멀티 셀렉트(키워드) 처리
-        if dto.keywords:
-            properties["키워드"] = {
-                "multi_select": [{"name": kw[:50]} for kw in dto.keywords]
-            }
+    @staticmethod
+    def _retry_delay(response: requests.Response, attempt: int) -> float:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        return min(30.0, 0.5 * 2**attempt) * (1 + random.random() * 0.1)
+
+    @staticmethod
+    def _json(response: requests.Response) -> dict:
+        """성공 응답의 JSON (본문이 JSON이 아니면 NotionAPIError)"""
+        try:
+            return response.json()
+        except ValueError:
+            logger.error(f" 노션 API 응답이 JSON이 아닙니다: {response.status_code} {response.text[:500]}")
+            raise NotionAPIError(f" 노션 API 응답을 해석할 수 없습니다 (HTTP {response.status_code})")
+
+    @staticmethod
+    def _raise_error(response: requests.Response):
+        """
+        에러 응답을 NotionAPIError로 바꿔 발생시킵니다
+        프록시/게이트웨이가 돌려준 HTML 등 JSON이 아닌 본문이면 상태 코드로 알립니다
+        """
+        try:
+            error_detail = response.json()
+        except ValueError:
+            error_detail = None
+        if not isinstance(error_detail, dict):
+            logger.error(f" 노션 API 에러 응답: {response.status_code} {response.text[:500]}")
+            raise NotionAPIError(f" 노션 API 에러 :HTTP {response.status_code}")
+        logger.error(f" 노션 API 에러 응답: {error_detail}")
+        raise NotionAPIError(f" 노션 API 에러 :{error_detail.get('message', 'unknown Error')}")
 
-        data = {"parent": {"database_id": self.database_id}, "properties": properties}
+    def create_qna_page(self, dto: Union[QnACreateDTO, QnALog]) -> str:
+        """
+        DTO를 받아서 노션 페이지를 생성하고 생성된 페이지 URL 반환
+        본문 블록은 처음 100개를 페이지와 함께 만들고, 나머지는 100개씩 이어 붙입니다
+        """
+        properties = build_notion_properties(dto)
+        blocks = build_notion_blocks(dto)
+
+        data = {
+            "parent": {"database_id": self.database_id},
+            "properties": properties,
+            "children": blocks[:NOTION_CHILDREN_LIMIT],
+        }
 
         try:
-            # 타임아웃을 설정하여 무한 대기를 방지합니다
-            response = requests.post(
-                self.url, headers=self.headers, json=data, timeout=10
-            )
+            response = self._request("POST", self.url, data, idempotent=False)
 
             if response.status_code == 200:
-                notion_url = response.json().get("url")
+                page = self._json(response)
+                notion_url = page.get("url")
                 logger.info(f"노션 페이지 생성 성공 {notion_url}")
+                self._append_remaining_blocks(page.get("id"), blocks[NOTION_CHILDREN_LIMIT:])
                 return notion_url
             else:
-                error_detail = response.json()
-                logger.error(f" 노션 API 에러 응답: {error_detail}")
-                raise NotionAPIError(
-                    f" 노션 API 에러 :{error_detail.get('message', 'unknown Error')}"
-                )
+                self._raise_error(response)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"노션 연결 중 네트워크 오류 발생 {e}")
             raise NotionAPIError(f" 노션 서버 연결 실패 {str(e)}")
+
+    def _append_remaining_blocks(self, page_id: str, blocks: list):
+        # 페이지는 이미 만들어졌으므로 실패해도 URL은 저장함 (다시 업로드하면 페이지가 중복 생성됨)
+        try:
+            self.append_blocks(page_id, blocks)
+        except NotionAPIError as e:
+            logger.error(f"노션 본문 일부를 추가하지 못했습니다 (page: {page_id}): {e.message}")
+
+    def append_blocks(self, block_id: str, blocks: list) -> int:
+        """블록(페이지) 아래에 자식 블록을 요청당 최대 100개씩 이어 붙이고 요청 수를 반환합니다"""
+        requests_made = 0
+        for start in range(0, len(blocks), NOTION_CHILDREN_LIMIT):
+            children = blocks[start:start + NOTION_CHILDREN_LIMIT]
+            # 블록 추가는 다시 보내면 같은 블록이 두 번 붙으므로 429만 재시도
+            url = f"{self.base_url}/blocks/{block_id}/children"
+            self._call("PATCH", url, {"children": children}, idempotent=False)
+            requests_made += 1
+        return requests_made
+
+    def list_block_children(self, block_id: str) -> list:
+        """블록(페이지) 바로 아래의 자식 블록 목록 (100개씩 next_cursor로 이어서 조회)"""
+        children, query = [], {"page_size": NOTION_CHILDREN_LIMIT}
+        while True:
+            data = self._call("GET", f"{self.base_url}/blocks/{block_id}/children?{urlencode(query)}", None)
+            children.extend(data.get("results", []))
+            if not data.get("has_more") or not data.get("next_cursor"):
+                return children
+            query["start_cursor"] = data["next_cursor"]
+
+    def replace_page_body(self, page_id: str, blocks: list) -> int:
+        """
+        페이지 본문을 blocks로 바꾸고 블록 추가 요청 수를 반환합니다
+        기존 자식 블록을 모두 지운(DELETE /blocks/{id}) 뒤 100개씩 다시 붙이며, 중간에 실패하면 다음 동기화에서 처음부터 다시 씁니다
+        """
+        for block in self.list_block_children(page_id):
+            self._call("DELETE", f"{self.base_url}/blocks/{block['id']}", None)
+        return self.append_blocks(page_id, blocks)
+
+    def update_page_properties(self, page_id: str, properties: dict):
+        """기존 페이지의 속성 중 주어진 것만 바꿉니다 (PATCH /pages/{id})"""
+        self._call("PATCH", f"{self.url}/{page_id}", {"properties": properties})
+
+    def query_edited_pages(self, edited_since=None, page_size: int = 100):
+        """
+        데이터베이스에서 edited_since 이후(같은 시각 포함)에 수정된 페이지를 last_edited_time 오름차순으로 조회합니다
+        응답 한 번의 페이지 목록씩 돌려주며, next_cursor로 다음 묶음을 이어서 요청합니다
+        """
+        payload = {"sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}], "page_size": page_size}
+        if edited_since is not None:
+            payload["filter"] = {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": edited_since.isoformat()},
+            }
+        while True:
+            data = self._call("POST", f"{self.base_url}/databases/{self.database_id}/query", payload)
+            yield data.get("results", [])
+            if not data.get("has_more") or not data.get("next_cursor"):
+                return
+            payload["start_cursor"] = data["next_cursor"]
+
+    def _call(self, method: str, url: str, payload: Optional[dict], idempotent: bool = True) -> dict:
+        """요청을 보내고 200이 아니면 NotionAPIError를 발생시킵니다 (응답 JSON 반환)"""
+        try:
+            response = self._request(method, url, payload, idempotent)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"노션 연결 중 네트워크 오류 발생 {e}")
+            raise NotionAPIError(f" 노션 서버 연결 실패 {str(e)}")
+
+        if response.status_code != 200:
+            self._raise_error(response)
+        return self._json(response)
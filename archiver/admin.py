@@ -1,11 +1,13 @@
 import logging
 
 from django.contrib import admin
+from django.db.models import Q
+from django_q.tasks import async_task
 from import_export.admin import ExportActionMixin
 
 from common.exceptions import NotionAPIError
 
-from .models import QnALog
+from .models import NotionSyncState, QnALog
 from .services import QnAService
 
 logger = logging.getLogger("apps")
@@ -15,7 +17,7 @@ logger = logging.getLogger("apps")
 class QnALogAdmin(ExportActionMixin, admin.ModelAdmin):
     # 1. 목록 화면 설정
     # 질문 빈도(hit_count)를 가장 앞에 나오게 함
-    list_display = ("id", "hit_count", "title", "is_verified", "category", "created_at")
+    list_display = ("id", "hit_count", "title", "is_verified", "notion_sync_state", "category", "created_at")
     list_display_links = (
         "id",
         "title",
@@ -25,12 +27,14 @@ class QnALogAdmin(ExportActionMixin, admin.ModelAdmin):
     list_editable = ("is_verified", "category")
 
     # 필터 및 검색
-    list_filter = ("is_verified", "category", "created_at")
+    list_filter = ("is_verified", "notion_sync_state", "category", "created_at")
     search_fields = ("title", "question_text", "ai_answer")
 
     # 정렬 질문횟수가 많은 순서대로
     ordering = ("-created_at", "-hit_count")
 
+    actions = ("publish_to_notion",)
+
     # 저장 로직
     def save_model(self, request, obj, form, change):
         """
@@ -48,17 +52,35 @@ class QnALogAdmin(ExportActionMixin, admin.ModelAdmin):
                 level="warning",
             )
             return
+        previous_state = obj.notion_sync_state
         super().save_model(request, obj, form, change)
-        # 워커가 실행될 떄 메세지
-        if obj.is_verified and not obj.notion_page_url:
+        # 이번 저장으로 노션 업로드가 예약되었을 때 메세지 (이미 예약/업로드된 질문은 다시 예약하지 않음)
+        if previous_state == NotionSyncState.NONE and obj.notion_sync_state == NotionSyncState.PENDING:
             self.message_user(
                 request,
                 f" {obj.id}번 데이터 노션 업로드 대기열(worker)에 추가되었습니다"
             )
 
+    @admin.action(description="선택한 검증된 질문 노션 일괄 업로드")
+    def publish_to_notion(self, request, queryset):
+        """
+        선택한 질문 중 검증 완료 & 노션 링크가 없는 질문을 작업 하나로 묶어 업로드합니다
+        (실패로 끝난 업로드도 다시 시도)
+        """
+        log_ids = list(
+            queryset.filter(is_verified=True)
+            .filter(Q(notion_page_url__isnull=True) | Q(notion_page_url=""))
+            .values_list("id", flat=True)
+        )
+        if not log_ids:
+            self.message_user(request, " 업로드할 질문이 없습니다 (검증 완료 & 노션 링크 없는 질문만 업로드)", level="warning")
+            return
+        async_task("archiver.tasks.task_publish_notion_batch", log_ids)
+        self.message_user(request, f" {len(log_ids)}건을 노션 일괄 업로드 작업(worker)에 추가했습니다")
+
     fieldsets = (
         ("기본 정보", {"fields": ("category", "keywords", "title", "hit_count")}),
         ("질문 및 답변", {"fields": ("question_text", "ai_answer")}),
-        ("검증 및 연동", {"fields": ("is_verified", "notion_page_url")}),
+        ("검증 및 연동", {"fields": ("is_verified", "notion_page_url", "notion_sync_state", "notion_dirty")}),
     )
-    readonly_fields = ("notion_page_url", "hit_count")
+    readonly_fields = ("notion_page_url", "notion_sync_state", "notion_dirty", "hit_count")
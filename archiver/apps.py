@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ArchiverConfig(AppConfig):
     name = "archiver"
+
+    def ready(self):
+        from .db import set_similarity_threshold
+
+        connection_created.connect(set_similarity_threshold, dispatch_uid="archiver_trgm_threshold")
@@ -0,0 +1,36 @@
+"""
+PostgreSQL 세션 설정 관련 유틸리티
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+def set_similarity_threshold(sender, connection, **kwargs):
+    """
+    connection_created 시그널 핸들러
+    새 DB 세션마다 pg_trgm.similarity_threshold(% 연산자 기준값)를 설정합니다
+    """
+    if connection.vendor != "postgresql":
+        return
+    threshold = getattr(settings, "SIMILARITY_THRESHOLD", 0.6)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, false)", [str(threshold)])
+    connection.trgm_threshold = threshold
+
+
+def ensure_similarity_threshold(threshold: float):
+    """
+    현재 세션의 % 연산자 기준값이 threshold와 다를 때만 변경합니다
+    (기본값으로 호출하면 추가 쿼리가 발생하지 않음)
+    """
+    connection.ensure_connection()
+    if connection.vendor != "postgresql" or getattr(connection, "trgm_threshold", None) == threshold:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, false)", [str(threshold)])
+    connection.trgm_threshold = threshold
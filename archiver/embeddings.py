@@ -0,0 +1,402 @@
+"""
+임베딩 기반 유사 질문 검색
+
+검증된 QnALog의 질문을 벡터로 변환해 디스크의 NumPy 행렬(.npy)로 저장하고,
+각 웹 워커는 이 파일을 메모리 맵으로 열어 공유합니다 (OS 페이지 캐시 공유)
+쓰기는 Django-Q 워커에서만 일어나며, 질문 단위 변경은 delta 파일에 덧붙이고
+쌓이면 새 버전으로 합쳐 교체하므로 읽는 쪽은 바뀐 것을 감지해 다시 읽기만 하면 됩니다
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from common.exceptions import LLMServiceError
+
+logger = logging.getLogger(__name__)
+
+# 버전 디렉터리 안에서 기준 세그먼트 이후의 변경을 덧붙이는 파일 (EmbeddingIndex 참고)
+DELTA_FILE = "delta.bin"
+
+
+class EmbeddingBackend:
+    """텍스트 목록을 (n, dim) float32 행렬로 변환하는 백엔드의 기본 클래스"""
+
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    외부 API 없이 동작하는 결정적(deterministic) 임베딩
+    공백을 제거한 문자 n-gram(1~3)을 해시해 고정 차원 벡터에 누적합니다
+    테스트와 로컬 개발용이며, 조사/어미만 다른 한국어 문장도 어느 정도 가깝게 나옵니다
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _vector(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        compact = re.sub(r"\s+", "", (text or "").lower())
+        for n in (1, 2, 3):
+            for i in range(len(compact) - n + 1):
+                digest = hashlib.blake2b(compact[i : i + n].encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vec[bucket] += sign * n
+        return vec
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return normalize(np.stack([self._vector(t) for t in texts]))
+
+
+class GeminiEmbeddingBackend(EmbeddingBackend):
+    """Gemini 임베딩 API(text-embedding-004)를 사용하는 백엔드"""
+
+    dim = 768
+    model_name = "models/text-embedding-004"
+
+    def __init__(self):
+        from .adapters import GeminiAdapter
+
+        # API 키 확인과 클라이언트(프로세스 공용)는 GeminiAdapter와 공유
+        self._client = GeminiAdapter().client
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        try:
+            result = self._client.models.embed_content(model=self.model_name, contents=list(texts))
+        except Exception as e:
+            raise LLMServiceError(f"임베딩 생성 실패: {e}")
+        if len(result.embeddings or []) != len(texts):
+            raise LLMServiceError(f"임베딩 개수가 맞지 않습니다 ({len(result.embeddings or [])}/{len(texts)})")
+        return normalize(np.asarray([embedding.values for embedding in result.embeddings], dtype=np.float32))
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (코사인 유사도를 내적으로 계산하기 위함)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+_backend = None
+_backend_path = None
+_backend_lock = threading.Lock()
+
+
+def get_embedding_backend() -> EmbeddingBackend:
+    """settings.EMBEDDING_BACKEND에 지정된 백엔드를 프로세스당 한 번만 생성합니다"""
+    global _backend, _backend_path
+    if _backend is None or _backend_path != settings.EMBEDDING_BACKEND:
+        with _backend_lock:
+            if _backend is None or _backend_path != settings.EMBEDDING_BACKEND:
+                _backend = import_string(settings.EMBEDDING_BACKEND)()
+                _backend_path = settings.EMBEDDING_BACKEND
+    return _backend
+
+
+class EmbeddingIndex:
+    """
+    (id, 벡터) 쌍을 저장하는 디스크 기반 인덱스
+
+    <directory>/<version>/vectors.npy  (n, dim) float32, 행 단위 정규화된 벡터 (기준 세그먼트)
+    <directory>/<version>/ids.npy      (n,) int64, 각 행에 대응하는 QnALog id
+    <directory>/<version>/delta.bin    기준 세그먼트 이후의 추가/교체/삭제 레코드 (고정 길이, 덧붙이기만 함)
+    <directory>/CURRENT                현재 버전 이름
+
+    질문 하나를 추가/교체/삭제할 때는 delta.bin에 레코드 하나(삭제는 tombstone)만 덧붙이므로
+    쓰기 비용이 인덱스 크기와 무관하며, 같은 id는 마지막 레코드가 기준 세그먼트와 앞선 레코드를 덮어씁니다
+    레코드가 max_delta개 쌓이면 둘을 합친 새 버전을 만들고(compact) CURRENT를 원자적으로 교체하므로
+    읽는 쪽은 vectors/ids가 항상 같은 버전으로 짝지어진 상태만 보고, delta.bin은 온전한 레코드까지만 읽습니다
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_delta: Optional[int] = None):
+        self.directory = Path(directory or settings.EMBEDDING_INDEX_DIR)
+        self.current_path = self.directory / "CURRENT"
+        self.max_delta = max_delta or settings.EMBEDDING_INDEX_MAX_DELTA
+        self._signature = None
+        self._base = (None, None, None)
+        self._delta_size = None
+        self._snapshot = None
+        self._reload_lock = threading.Lock()
+
+    # ---------- 읽기 ----------
+
+    def _current_signature(self):
+        try:
+            stat = os.stat(self.current_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def _read_version(self, mmap_mode=None):
+        """현재 버전의 (이름, 기준 벡터, 기준 id)"""
+        try:
+            version = self.current_path.read_text().strip()
+        except FileNotFoundError:
+            return None, None, None
+        vectors = np.load(self.directory / version / "vectors.npy", mmap_mode=mmap_mode)
+        ids = np.load(self.directory / version / "ids.npy")
+        return version, vectors, ids
+
+    def _read_delta(self, version: str, dim: int) -> Tuple[np.ndarray, int]:
+        """delta 레코드와 파일 크기 (쓰는 중인 마지막 레코드는 제외)"""
+        try:
+            raw = (self.directory / version / DELTA_FILE).read_bytes()
+        except FileNotFoundError:
+            raw = b""
+        dtype = _delta_dtype(dim)
+        return np.frombuffer(raw, dtype=dtype, count=len(raw) // dtype.itemsize), len(raw)
+
+    def _current_delta_size(self) -> Optional[int]:
+        version = self._base[0]
+        try:
+            return os.stat(self.directory / version / DELTA_FILE).st_size if version else None
+        except FileNotFoundError:
+            return 0
+
+    def _load(self) -> Optional["_Snapshot"]:
+        """CURRENT가 교체되면 새 기준 세그먼트를 메모리 맵으로 열고, delta.bin이 늘어나면 레코드만 다시 읽습니다"""
+        signature = self._current_signature()
+        if signature is None:
+            return None
+        if signature == self._signature and self._current_delta_size() == self._delta_size:
+            return self._snapshot
+        with self._reload_lock:
+            if signature != self._signature:
+                try:
+                    self._base = self._read_version(mmap_mode="r")
+                except FileNotFoundError:
+                    # 읽는 사이 버전이 두 번 교체되어 정리된 경우: 최신 버전으로 다시 시도
+                    signature = self._current_signature()
+                    self._base = self._read_version(mmap_mode="r")
+                self._signature = signature
+            version, vectors, ids = self._base
+            delta, self._delta_size = self._read_delta(version, vectors.shape[1])
+            self._snapshot = _Snapshot(vectors, ids, delta)
+        return self._snapshot
+
+    def __len__(self):
+        snapshot = self._load()
+        return 0 if snapshot is None else len(snapshot)
+
+    def __contains__(self, log_id: int):
+        snapshot = self._load()
+        return snapshot is not None and log_id in snapshot
+
+    def search(self, queries: np.ndarray, k: int = 5) -> List[List[Tuple[int, float]]]:
+        """
+        여러 질의 벡터를 한 번의 행렬곱으로 검색해 질의별 상위 k개 (id, 코사인 유사도)를 반환합니다
+        기준 세그먼트에서 delta로 덮어쓴(교체/삭제된) 행은 점수를 -inf로 두어 후보에서 뺍니다
+        """
+        queries = normalize(np.atleast_2d(queries))
+        snapshot = self._load()
+        if snapshot is None or len(snapshot) == 0:
+            return [[] for _ in range(len(queries))]
+        if snapshot.dim != queries.shape[1]:
+            logger.error(
+                f"임베딩 차원 불일치 (인덱스 {snapshot.dim}, 질의 {queries.shape[1]}) - 인덱스를 재생성하세요"
+            )
+            return [[] for _ in range(len(queries))]
+
+        scores = queries @ snapshot.vectors.T  # (m, n)
+        if snapshot.base_shadowed is not None:
+            scores[:, snapshot.base_shadowed] = -np.inf
+        if len(snapshot.delta_ids):
+            scores = np.hstack([scores, queries @ snapshot.delta_vectors.T])
+        # 살아 있는 행이 k개 이상이므로 -inf 행은 상위 k개에 들지 않음
+        k = min(k, len(snapshot))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[row, candidates])]
+            results.append([(snapshot.id_at(i), float(scores[row, i])) for i in ordered])
+        return results
+
+    # ---------- 쓰기 (Django-Q 워커) ----------
+
+    def _write(self, vectors: np.ndarray, ids: np.ndarray):
+        previous = self.current_path.read_text().strip() if self.current_path.exists() else None
+        version = f"v{time.time_ns()}-{os.getpid()}"
+        (self.directory / version).mkdir()
+        np.save(self.directory / version / "vectors.npy", np.ascontiguousarray(vectors, dtype=np.float32))
+        np.save(self.directory / version / "ids.npy", np.asarray(ids, dtype=np.int64))
+
+        tmp_current = self.directory / f".CURRENT.{os.getpid()}"
+        tmp_current.write_text(version)
+        os.replace(tmp_current, self.current_path)
+
+        # 직전 버전은 아직 읽는 중일 수 있으므로 남기고 그 이전 버전만 정리
+        # (이미 메모리 맵으로 열린 파일은 삭제되어도 닫힐 때까지 유효함)
+        for path in self.directory.glob("v*"):
+            if path.name not in (version, previous):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _append(self, version: str, dim: int, log_id: int, vector: Optional[np.ndarray]) -> int:
+        """delta.bin에 레코드 하나를 덧붙이고 레코드 수를 반환합니다 (vector가 None이면 tombstone)"""
+        record = np.zeros(1, dtype=_delta_dtype(dim))
+        record["id"] = log_id
+        if vector is None:
+            record["deleted"] = 1
+        else:
+            record["vector"] = vector
+        path = self.directory / version / DELTA_FILE
+        # 레코드 하나를 write 한 번으로 덧붙임 (읽는 쪽은 온전한 레코드까지만 사용)
+        with open(path, "ab") as f:
+            f.write(record.tobytes())
+            return f.tell() // record.itemsize
+
+    def _compact(self, version: str, vectors: np.ndarray, ids: np.ndarray):
+        """기준 세그먼트와 delta를 합친 새 버전을 만듭니다"""
+        delta, _ = self._read_delta(version, vectors.shape[1])
+        merged_vectors, merged_ids = _Snapshot(vectors, ids, delta).materialize()
+        self._write(merged_vectors, merged_ids)
+        logger.info(f"임베딩 인덱스 compact: delta {len(delta)}건 반영, {len(merged_ids)}개")
+
+    def _locked(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return _FileLock(self.directory / ".lock")
+
+    def upsert(self, log_id: int, vector: np.ndarray):
+        """id의 벡터를 추가하거나 교체합니다"""
+        vector = normalize(np.atleast_2d(vector))
+        dim = vector.shape[1]
+        with self._locked():
+            version, vectors, ids = self._read_version(mmap_mode="r")
+            if version is None or vectors.shape[1] != dim:
+                if version is not None:
+                    logger.warning("임베딩 차원이 바뀌어 기존 인덱스를 비웁니다")
+                self._write(vector, np.array([log_id], dtype=np.int64))
+                return
+            if self._append(version, dim, log_id, vector[0]) >= self.max_delta:
+                self._compact(version, vectors, ids)
+
+    def remove(self, log_id: int) -> bool:
+        """id의 벡터를 제거합니다 (없으면 False)"""
+        with self._locked():
+            version, vectors, ids = self._read_version(mmap_mode="r")
+            if version is None:
+                return False
+            dim = vectors.shape[1]
+            delta, _ = self._read_delta(version, dim)
+            if log_id not in _Snapshot(vectors, ids, delta):
+                return False
+            if self._append(version, dim, log_id, None) >= self.max_delta:
+                self._compact(version, vectors, ids)
+            return True
+
+    def rebuild(self, ids: Sequence[int], vectors: np.ndarray):
+        """전체 인덱스를 주어진 데이터로 교체합니다"""
+        with self._locked():
+            self._write(normalize(vectors), np.asarray(ids, dtype=np.int64))
+
+
+def _delta_dtype(dim: int) -> np.dtype:
+    # 레코드: id, 삭제 여부(tombstone), 정규화된 벡터
+    return np.dtype([("id", "<i8"), ("deleted", "u1"), ("vector", "<f4", (dim,))])
+
+
+class _Snapshot:
+    """기준 세그먼트와 delta 레코드를 합친 읽기 상태 (같은 id는 마지막 레코드 기준)"""
+
+    def __init__(self, vectors: np.ndarray, ids: np.ndarray, delta: np.ndarray):
+        self.vectors = vectors
+        self.ids = ids
+        self.dim = vectors.shape[1]
+        if len(delta):
+            # 뒤에서부터 처음 나온 레코드 = id별 마지막 레코드
+            latest_ids, first_from_end = np.unique(delta["id"][::-1], return_index=True)
+            latest = delta[len(delta) - 1 - first_from_end]
+            live = latest["deleted"] == 0
+            self.base_shadowed = np.isin(ids, latest_ids)
+            self.delta_ids = latest["id"][live]
+            self.delta_vectors = np.ascontiguousarray(latest["vector"][live], dtype=np.float32)
+            base_live = len(ids) - int(self.base_shadowed.sum())
+        else:
+            self.base_shadowed = None
+            self.delta_ids = np.empty(0, dtype=np.int64)
+            self.delta_vectors = np.empty((0, self.dim), dtype=np.float32)
+            base_live = len(ids)
+        self._len = base_live + len(self.delta_ids)
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, log_id: int):
+        if np.any(self.delta_ids == log_id):
+            return True
+        matches = self.ids == log_id
+        if self.base_shadowed is not None:
+            matches &= ~self.base_shadowed
+        return bool(np.any(matches))
+
+    def id_at(self, column: int) -> int:
+        """search 점수 행렬의 열 번호 → id (기준 세그먼트 다음에 delta 행이 이어짐)"""
+        if column < len(self.ids):
+            return int(self.ids[column])
+        return int(self.delta_ids[column - len(self.ids)])
+
+    def materialize(self) -> Tuple[np.ndarray, np.ndarray]:
+        """살아 있는 행만 모은 (벡터, id)"""
+        if self.base_shadowed is None:
+            base_vectors, base_ids = self.vectors, self.ids
+        else:
+            base_vectors, base_ids = self.vectors[~self.base_shadowed], self.ids[~self.base_shadowed]
+        return np.vstack([base_vectors, self.delta_vectors]), np.concatenate([base_ids, self.delta_ids])
+
+
+class _FileLock:
+    """여러 워커 프로세스의 동시 쓰기를 막는 flock 기반 잠금"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_CREAT | os.O_RDWR)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+
+
+_index = None
+
+
+def get_embedding_index() -> EmbeddingIndex:
+    """프로세스 공용 인덱스 객체 (파일 변경 감지 상태를 재사용)"""
+    global _index
+    if _index is None or _index.directory != Path(settings.EMBEDDING_INDEX_DIR):
+        _index = EmbeddingIndex()
+    return _index
+
+
+def search_similar(question_text: str) -> List[Tuple[int, float]]:
+    """
+    질문과 의미가 가까운 (id, 유사도) 목록을 유사도 순으로 반환합니다
+    EMBEDDING_SIMILARITY_THRESHOLD 미만은 제외합니다
+    """
+    index = get_embedding_index()
+    if not len(index):
+        return []
+    query = get_embedding_backend().embed([question_text])
+    threshold = settings.EMBEDDING_SIMILARITY_THRESHOLD
+    matches = index.search(query, k=settings.EMBEDDING_TOP_K)[0]
+    return [(log_id, score) for log_id, score in matches if score >= threshold]
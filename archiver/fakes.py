@@ -0,0 +1,268 @@
+"""
+테스트/벤치마크용 가짜 외부 서버
+실제 API를 호출하지 않고 지연시간, 호출 횟수 등을 재현하기 위해 사용합니다
+"""
+
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeHTTPServer:
+    """
+    JSON API를 흉내내는 로컬 HTTP 서버의 공통 부분 (응답 내용은 하위 클래스의 handle에서 결정)
+
+    사용 예:
+        with FakeNotionServer(latency=0.3) as server:
+            with override_settings(NOTION_API_URL=server.base_url):
+                ...
+            server.requests  # 받은 요청 목록
+
+    rate_limit를 주면 실제 노션처럼 초당 요청 수를 넘는 요청에 429와 Retry-After를 돌려줍니다
+    (rate_limited: 429로 거절한 횟수, connections: 맺어진 TCP 연결 수)
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limit: float = 0.0, burst: int = 1):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.requests = []
+        self.rate_limited = 0
+        self.connections = 0
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def record(self, method: str, path: str, body: dict):
+        with self._lock:
+            self.requests.append({"method": method, "path": path, "body": body})
+
+    def _take_token(self):
+        """서버 측 토큰 버킷: 허용되면 None, 초과면 다시 시도할 때까지의 시간(초)"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) * self.rate_limit)
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            self.rate_limited += 1
+            return (1 - self._tokens) / self.rate_limit
+
+    def handle(self, method: str, path: str, body: dict):
+        """(status, payload, headers)를 반환합니다"""
+        return 404, {"object": "error", "message": f"unknown endpoint {method} {path}"}, {}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # keep-alive 연결에서 헤더/본문을 나눠 쓸 때 Nagle 지연(~40ms)이 생기지 않도록
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def _dispatch(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                server.record(method, self.path, body)
+                if server.latency:
+                    time.sleep(server.latency)
+                retry_after = server._take_token() if server.rate_limit else None
+                if retry_after is not None:
+                    status, headers = 429, {"Retry-After": f"{retry_after:.3f}"}
+                    payload = {"object": "error", "code": "rate_limited", "message": "Rate limited"}
+                else:
+                    status, payload, headers = server.handle(method, self.path, body)
+                raw = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PATCH(self):
+                self._dispatch("PATCH")
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_DELETE(self):
+                self._dispatch("DELETE")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class FakeNotionServer(FakeHTTPServer):
+    """
+    Notion API(/v1/pages, /v1/blocks/<id>(/children), /v1/databases/<id>/query)를 흉내내는 로컬 HTTP 서버
+    pages: 페이지 id별 현재 속성, blocks: 페이지 id별 본문 블록(블록마다 id 부여), edited: 페이지 id별 last_edited_time
+    (edit_page로 관리자가 노션에서 직접 고친 상황을 만들 수 있음)
+    실제 노션처럼 자식 블록 100개, rich_text 100개/2000자를 넘는 요청은 400으로 거절합니다
+    """
+
+    children_limit = 100
+    rich_text_limit = 100
+    text_limit = 2000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pages = {}
+        self.blocks = {}
+        self.edited = {}
+
+    def edit_page(self, page_id: str, properties: dict):
+        """노션 화면에서 속성을 고친 것처럼 바꿉니다 (last_edited_time 갱신)"""
+        with self._lock:
+            self.pages[page_id].update(properties)
+            self.edited[page_id] = datetime.now(timezone.utc)
+
+    def _page_object(self, page_id: str) -> dict:
+        return {
+            "object": "page",
+            "id": str(uuid.UUID(page_id)),
+            "url": f"https://www.notion.so/{page_id}",
+            "last_edited_time": self.edited[page_id].isoformat().replace("+00:00", "Z"),
+            "archived": False,
+            "properties": self.pages[page_id],
+        }
+
+    def _query(self, body: dict):
+        since = body.get("filter", {}).get("last_edited_time", {}).get("on_or_after")
+        since = datetime.fromisoformat(since) if since else None
+        with self._lock:
+            page_ids = sorted(
+                (page_id for page_id, edited in self.edited.items() if since is None or edited >= since),
+                key=lambda page_id: self.edited[page_id],
+            )
+            start = int(body.get("start_cursor") or 0)
+            end = start + min(int(body.get("page_size", 100)), 100)
+            results = [self._page_object(page_id) for page_id in page_ids[start:end]]
+        has_more = end < len(page_ids)
+        return {"object": "list", "results": results, "has_more": has_more, "next_cursor": str(end) if has_more else None}
+
+    @staticmethod
+    def _with_ids(children: list) -> list:
+        return [dict(block, id=uuid.uuid4().hex) for block in children]
+
+    def _children(self, page_id: str, query: dict):
+        with self._lock:
+            blocks = list(self.blocks[page_id])
+        start = int(query.get("start_cursor", ["0"])[0])
+        end = start + min(int(query.get("page_size", ["100"])[0]), 100)
+        has_more = end < len(blocks)
+        return {"object": "list", "results": blocks[start:end], "has_more": has_more, "next_cursor": str(end) if has_more else None}
+
+    def _delete_block(self, block_id: str):
+        with self._lock:
+            for page_id, blocks in self.blocks.items():
+                for index, block in enumerate(blocks):
+                    if block["id"] == block_id:
+                        del blocks[index]
+                        self.edited[page_id] = datetime.now(timezone.utc)
+                        return 200, dict(block, archived=True), {}
+        return 404, {"object": "error", "code": "object_not_found", "message": "block not found"}, {}
+
+    def _validate_children(self, children):
+        if len(children) > self.children_limit:
+            return f"body.children.length should be ≤ `{self.children_limit}`, instead was `{len(children)}`."
+        for block in children:
+            rich_text = block.get(block.get("type"), {}).get("rich_text", [])
+            if len(rich_text) > self.rich_text_limit:
+                return f"rich_text.length should be ≤ `{self.rich_text_limit}`."
+            if any(len(item["text"]["content"]) > self.text_limit for item in rich_text):
+                return f"text.content.length should be ≤ `{self.text_limit}`."
+        return None
+
+    def handle(self, method: str, path: str, body: dict):
+        path, query = urlsplit(path).path, parse_qs(urlsplit(path).query)
+        if method == "POST" and path == "/v1/pages":
+            error = self._validate_children(body.get("children", []))
+            if error:
+                return 400, {"object": "error", "code": "validation_error", "message": error}, {}
+            page_id = uuid.uuid4().hex
+            with self._lock:
+                self.pages[page_id] = dict(body.get("properties", {}))
+                self.blocks[page_id] = self._with_ids(body.get("children", []))
+                self.edited[page_id] = datetime.now(timezone.utc)
+            return 200, {"object": "page", "id": page_id, "url": f"https://www.notion.so/{page_id}"}, {}
+        if method == "PATCH" and path.startswith("/v1/blocks/") and path.endswith("/children"):
+            page_id = path.split("/")[3]
+            error = self._validate_children(body.get("children", []))
+            if error:
+                return 400, {"object": "error", "code": "validation_error", "message": error}, {}
+            with self._lock:
+                if page_id not in self.blocks:
+                    return 404, {"object": "error", "code": "object_not_found", "message": "block not found"}, {}
+                children = self._with_ids(body["children"])
+                self.blocks[page_id].extend(children)
+                self.edited[page_id] = datetime.now(timezone.utc)
+            return 200, {"object": "list", "results": children}, {}
+        if method == "GET" and path.startswith("/v1/blocks/") and path.endswith("/children"):
+            page_id = path.split("/")[3]
+            if page_id not in self.blocks:
+                return 404, {"object": "error", "code": "object_not_found", "message": "block not found"}, {}
+            return 200, self._children(page_id, query), {}
+        if method == "DELETE" and path.startswith("/v1/blocks/"):
+            return self._delete_block(path.rsplit("/", 1)[-1])
+        if method == "PATCH" and path.startswith("/v1/pages/"):
+            page_id = path.rsplit("/", 1)[-1]
+            with self._lock:
+                if page_id not in self.pages:
+                    return 404, {"object": "error", "code": "object_not_found", "message": "page not found"}, {}
+                self.pages[page_id].update(body.get("properties", {}))
+                self.edited[page_id] = datetime.now(timezone.utc)
+            return 200, {"object": "page", "id": page_id, "url": f"https://www.notion.so/{page_id}"}, {}
+        if method == "POST" and path.startswith("/v1/databases/") and path.endswith("/query"):
+            return 200, self._query(body), {}
+        return super().handle(method, path, body)
+
+
+class FakeGeminiServer(FakeHTTPServer):
+    """Gemini generateContent(/v1/models/<model>:generateContent)를 흉내내는 로컬 HTTP 서버"""
+
+    answer = "제목: 가짜 Gemini 답변\n카테고리: General\n키워드: fake, gemini, bench\n\n1. **문제 요약**: 벤치마크"
+
+    def handle(self, method: str, path: str, body: dict):
+        if method == "POST" and path.endswith(":generateContent"):
+            payload = {"candidates": [{"content": {"parts": [{"text": self.answer}]}, "finishReason": "STOP"}]}
+            return 200, payload, {}
+        return super().handle(method, path, body)
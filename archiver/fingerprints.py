@@ -0,0 +1,136 @@
+"""
+질문 지문(fingerprint)과 유사도 비교용 서명(signature) 계산
+
+표기만 다른 같은 질문(대소문자, 공백, 전각/반각, 끝 문장부호 차이)을
+같은 값으로 묶기 위해 정규화한 뒤 sha256으로 요약합니다
+
+서명은 trigram 유사도 검색에 쓰는 정규화 텍스트로, 붙여넣은 traceback의 파일 경로/줄 번호/주소/시각처럼
+질문마다 달라지는 토큰을 지우고 길이를 제한합니다 (QnALog.question_signature)
+
+에러 지문은 붙여넣은 에러의 예외 타입 + 정규화한 메시지 + 가장 안쪽 프레임들의 sha256으로,
+같은 에러면 실행 환경(경로/줄 번호)이 달라도 같은 값이 됩니다 (QnALog.error_fingerprint)
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Optional, Sequence, Union
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCT = re.compile(r"[\s.!?~…。？！]+$")
+
+# 서명에서 지우는 토큰 (순서대로 적용: 경로/URL을 먼저 지워야 그 안의 숫자가 남지 않음)
+_VOLATILE_TOKENS = [
+    re.compile(r"traceback \(most recent call last\):"),
+    # traceback 프레임 (File "...", line N, in f + 들여쓴 코드 줄) - 프레임워크 프레임은 에러마다 겹쳐 점수만 올림
+    re.compile(r'^[ \t]*file "[^"\n]*", line \d+[^\n]*(?:\n[ \t]{2,}[^\n]*)*', re.MULTILINE),
+    re.compile(r"[a-z][a-z0-9+.-]*://\S+"),  # URL
+    re.compile(r"(?:\b[a-z]:|~|\.{1,2})?(?:[\\/][\w.@+-]+){2,}[\\/]?"),  # 파일 경로 (유닉스/윈도우)
+    re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"),  # uuid
+    re.compile(r"\b0x[0-9a-f]+\b"),  # 메모리 주소
+    re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}\b"),  # ip 주소
+    re.compile(r"\b\d{4}-\d{2}-\d{2}(?:[t ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?(?:z|[+-]\d{2}:?\d{2})?)?\b"),  # 날짜/시각
+    re.compile(r"\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b"),  # 시각
+    re.compile(r"\bline \d+\b"),  # traceback 줄 번호
+    re.compile(r"\b\d{5,}\b"),  # pid, 포트, id 같은 긴 숫자
+    re.compile(r"[\^~=*#-]{3,}"),  # 밑줄 표시(^^^^)와 구분선
+]
+
+
+# traceback 프레임 머리: File "경로", line N, in 함수
+_FRAME = re.compile(r'^([ \t]*)File "([^"\n]+)", line \d+, in ([^\s]+)', re.MULTILINE)
+# traceback 마지막 줄: 예외 타입(모듈 경로 포함)과 메시지
+_EXCEPTION = re.compile(r"^([A-Za-z_][\w.]*)(?::[ \t]*(.*))?$")
+# traceback 없이 한 줄만 붙여넣은 에러 (ModuleNotFoundError: ..., git/pip의 fatal: / error: ...)
+_ERROR_LINE = re.compile(
+    r"^[ \t]*((?:[A-Za-z_]\w*\.)*[A-Za-z_]\w*(?:Error|Exception|Warning)|fatal|error)[ \t]*:[ \t]*(\S.*)$",
+    re.MULTILINE,
+)
+# 설치 위치에 따라 달라지는 경로 앞부분 (이후의 패키지 내 경로만 남김)
+_INSTALL_PREFIX = re.compile(r"^.*/(?:site-packages|dist-packages|lib/python\d+(?:\.\d+)?)/")
+
+
+def _remove_volatile_tokens(text: str) -> str:
+    for pattern in _VOLATILE_TOKENS:
+        text = pattern.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def normalize_question(text: str) -> str:
+    """비교용으로 질문 텍스트를 정규화합니다"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _TRAILING_PUNCT.sub("", text)
+
+
+def question_signature(text: str, max_length: int = 512) -> str:
+    """
+    trigram 비교용 질문 서명
+    소문자/공백 정규화 후 질문마다 달라지는 토큰을 지우고, max_length보다 길면 앞부분(질문)과
+    뒷부분(traceback의 마지막 예외 메시지)만 남깁니다
+    """
+    text = _remove_volatile_tokens(unicodedata.normalize("NFKC", text or "").lower())
+    if len(text) > max_length:
+        head = max_length // 2
+        text = text[:head].rstrip() + " " + text[-(max_length - head - 1):].lstrip()
+    return text
+
+
+def _frame_location(path: str, function: str) -> str:
+    """프레임 위치를 환경과 무관한 형태로 (패키지 안 경로 또는 파일 이름 + 함수 이름, 줄 번호 제외)"""
+    path = path.replace("\\", "/").lower()
+    stripped = _INSTALL_PREFIX.sub("", path)
+    return f"{stripped if stripped != path else path.rsplit('/', 1)[-1]}:{function}"
+
+
+def _last_exception(text: str, frames: list) -> Optional[tuple]:
+    """마지막 프레임 다음에 나오는 예외 줄 (프레임보다 깊게 들여쓴 코드/^^^ 줄은 건너뜀)"""
+    indent = len(frames[-1].group(1))
+    for line in text[frames[-1].end():].splitlines()[1:]:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("```") or len(line) - len(line.lstrip()) > indent:
+            continue
+        match = _EXCEPTION.match(stripped)
+        return (match.group(1), match.group(2) or "") if match else None
+    return None
+
+
+def error_fingerprint(text: str, frame_count: int = 3) -> Optional[str]:
+    """
+    질문에 붙여넣은 에러의 지문 (예외 타입 + 정규화한 메시지 + 가장 안쪽 frame_count개 프레임의 sha256 hex)
+    traceback이 없으면 마지막 "XxxError: 메시지" / "fatal: 메시지" 줄로 계산하고, 에러가 없으면 None
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    frames = list(_FRAME.finditer(text))
+    exception = _last_exception(text, frames) if frames else None
+    if exception is None:
+        lines = _ERROR_LINE.findall(text)
+        if not lines:
+            return None
+        exception, frames = lines[-1], []
+
+    error_type, message = exception
+    parts = [error_type, _remove_volatile_tokens(message.lower())]
+    parts += [_frame_location(frame.group(2), frame.group(3)) for frame in frames[-frame_count:]]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def image_parts(image_data: Union[bytes, Sequence[bytes], None]) -> list:
+    """이미지 한 장(bytes) 또는 여러 장(목록)을 목록으로 맞춥니다"""
+    if not image_data:
+        return []
+    if isinstance(image_data, (bytes, bytearray)):
+        return [image_data]
+    return [part for part in image_data if part]
+
+
+def question_fingerprint(text: str, image_data: Union[bytes, Sequence[bytes], None] = None) -> str:
+    """
+    정규화한 질문(+ 첨부 이미지 내용, 순서대로)의 sha256 hex
+    이미지가 다르면 같은 문장이라도 다른 질문으로 취급합니다
+    """
+    digest = hashlib.sha256(normalize_question(text).encode())
+    for part in image_parts(image_data):
+        digest.update(b"\0")
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
@@ -0,0 +1,150 @@
+"""
+질문 빈도(hit_count) 집계
+
+기본은 DB에서 원자적으로 증가시키는 UPDATE 한 번(hit_count = hit_count + 1)이며,
+HIT_COUNT_BUFFER_ENABLED를 켜면 프로세스 안에서 행별로 모아두었다가
+주기적으로(또는 일정 개수가 쌓이면) 한 번의 UPDATE로 반영합니다
+어느 방식이든 QnALog.save()를 거치지 않으므로 노션 업로드 태스크가 다시 등록되지 않습니다
+(노션 페이지의 질문횟수는 notion_dirty를 켜 두고 주기 동기화에서 모아서 반영, 업로드 전 질문은 업로드할 때 현재 값이 올라가므로 제외)
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, Case, F, PositiveIntegerField, Q, Value, When
+
+from .models import QnALog
+
+logger = logging.getLogger(__name__)
+
+
+def _notion_dirty_if_published() -> Case:
+    # 노션 페이지가 있는 행만 동기화 대상으로 표시하고, 나머지는 기존 값을 유지
+    return Case(
+        When(~Q(notion_page_url="") & Q(notion_page_url__isnull=False), then=Value(True)),
+        default=F("notion_dirty"),
+        output_field=BooleanField(),
+    )
+
+
+def increment_hit_count(log_id: int, amount: int = 1) -> int:
+    """DB에서 원자적으로 hit_count를 증가시킵니다 (반영된 행 수 반환)"""
+    return QnALog.objects.filter(pk=log_id).update(
+        hit_count=F("hit_count") + amount, notion_dirty=_notion_dirty_if_published()
+    )
+
+
+def bulk_increment_hit_counts(counts: dict) -> int:
+    """{id: 증가량}을 한 번의 UPDATE 문으로 반영합니다"""
+    if not counts:
+        return 0
+    delta = Case(
+        *[When(pk=log_id, then=Value(amount)) for log_id, amount in counts.items()],
+        default=Value(0),
+        output_field=PositiveIntegerField(),
+    )
+    return QnALog.objects.filter(pk__in=list(counts)).update(
+        hit_count=F("hit_count") + delta, notion_dirty=_notion_dirty_if_published()
+    )
+
+
+class HitCountBuffer:
+    """
+    hit_count 증가분을 행별로 합쳐두었다가 한 번에 반영하는 버퍼
+    인기 질문에 요청이 몰려도 같은 행에 대한 UPDATE 경합이 flush 주기당 한 번으로 줄어듭니다
+    (프로세스가 비정상 종료되면 마지막 flush 이후의 증가분은 유실될 수 있음)
+    """
+
+    def __init__(self, flush_interval: float = 5.0, flush_size: int = 100):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._counts = Counter()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, log_id: int, amount: int = 1):
+        self._ensure_started()
+        with self._lock:
+            self._counts[log_id] += amount
+            self._pending += amount
+            should_flush = self._pending >= self.flush_size
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> int:
+        """쌓인 증가분을 DB에 반영합니다 (반영한 증가량 합계 반환)"""
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, Counter()
+                self._pending = 0
+            if not counts:
+                return 0
+            try:
+                bulk_increment_hit_counts(counts)
+            except Exception as e:
+                logger.error(f"hit_count 반영 실패, 다음 flush에 재시도합니다: {e}")
+                with self._lock:
+                    self._counts.update(counts)
+                    self._pending += sum(counts.values())
+                return 0
+            return sum(counts.values())
+
+    def _ensure_started(self):
+        # gunicorn이 fork한 워커마다 자체 flush 스레드를 가지도록 pid 기준으로 시작
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._counts = Counter()
+            self._pending = 0
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="hit-count-flusher", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            finally:
+                # flush 스레드의 DB 연결은 요청 주기로 정리되지 않으므로 직접 닫음
+                connection.close()
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_hit_count_buffer() -> HitCountBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = HitCountBuffer(
+                    flush_interval=settings.HIT_COUNT_FLUSH_INTERVAL,
+                    flush_size=settings.HIT_COUNT_FLUSH_SIZE,
+                )
+                atexit.register(_buffer.stop)
+    return _buffer
+
+
+def record_hit(log_id: int):
+    """설정에 따라 즉시 반영하거나 버퍼에 모아 반영합니다"""
+    if settings.HIT_COUNT_BUFFER_ENABLED:
+        get_hit_count_buffer().add(log_id)
+    else:
+        increment_hit_count(log_id)
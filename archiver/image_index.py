@@ -0,0 +1,122 @@
+"""
+이미지 지각 해시(dHash) 검색 인덱스
+
+검증된 질문의 첨부 이미지 해시를 다중 인덱스 해싱 테이블에 넣어두고, 해밍 거리가 IMAGE_HASH_MAX_DISTANCE 이하인
+이미지를 찾습니다 (글 없이 같은 에러 스크린샷만 올린 질문도 기존 답변으로 연결하기 위함)
+인덱스는 프로세스마다 메모리에 두며, IMAGE_INDEX_REFRESH_SECONDS마다 DB의 (개수, 마지막 수정 시각)을
+확인해 바뀌었을 때만 다시 만듭니다
+"""
+
+import logging
+import threading
+import time
+from itertools import chain
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .images import DHASH_BITS, hamming_distance
+from .models import QnAImage, QnALog
+
+logger = logging.getLogger(__name__)
+
+
+class MultiIndexHash:
+    """
+    해밍 거리 검색용 다중 인덱스 해싱(multi-index hashing)
+
+    해시를 radius + 1개 구간으로 나누면, 거리가 radius 이하인 두 해시는 비둘기집 원리에 따라
+    적어도 한 구간이 정확히 같습니다. 구간별 해시 테이블에서 정확히 일치하는 후보만 모아
+    실제 거리를 확인하므로 전체를 훑지 않습니다
+    (256비트 dHash는 무작위 해시 간 거리가 128 근처에 몰려 BK-tree의 가지치기가 거의 되지 않음)
+    """
+
+    def __init__(self, bits: int, radius: int, items: Iterable[Tuple[int, int]] = ()):
+        self.radius = radius
+        chunks = radius + 1
+        bounds = [bits * i // chunks for i in range(chunks + 1)]
+        # (shift, mask): 해시에서 각 구간을 꺼내는 방법
+        self.slices = [(low, (1 << (high - low)) - 1) for low, high in zip(bounds, bounds[1:])]
+        self.tables = [{} for _ in self.slices]
+        self.size = 0
+        for value, item_id in items:
+            self.add(value, item_id)
+
+    def add(self, value: int, item_id: int):
+        entry = (value, item_id)
+        for table, (shift, mask) in zip(self.tables, self.slices):
+            table.setdefault((value >> shift) & mask, []).append(entry)
+        self.size += 1
+
+    def search(self, value: int, radius: Optional[int] = None) -> List[Tuple[int, int]]:
+        """거리가 radius(기본: 만들 때의 radius) 이하인 (거리, id) 목록을 가까운 순으로 반환 (id마다 하나)"""
+        radius = self.radius if radius is None else radius
+        if radius > self.radius:
+            raise ValueError(f"radius {radius}는 인덱스의 최대 거리 {self.radius}보다 클 수 없습니다")
+        # 한 id에 해시가 여러 개일 수 있으므로(질문의 추가 이미지) 같은 항목만 건너뛰고 id별로 가장 가까운 거리를 남김
+        seen = set()
+        best = {}
+        for table, (shift, mask) in zip(self.tables, self.slices):
+            for entry in table.get((value >> shift) & mask, ()):
+                if entry in seen:
+                    continue
+                seen.add(entry)
+                candidate, item_id = entry
+                distance = hamming_distance(value, candidate)
+                if distance <= radius and distance < best.get(item_id, radius + 1):
+                    best[item_id] = distance
+        return sorted((distance, item_id) for item_id, distance in best.items())
+
+
+class ImageHashIndex:
+    """검증된 질문의 이미지 해시 인덱스 (프로세스 공용, 필요할 때만 다시 만듦)"""
+
+    def __init__(self):
+        self._table = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _querysets(self):
+        # (질문의 첫 이미지, 추가 첨부 이미지)
+        return (
+            QnALog.objects.filter(is_verified=True, image_dhash__isnull=False).values_list("image_dhash", "id"),
+            QnAImage.objects.filter(qna_log__is_verified=True, image_dhash__isnull=False).values_list(
+                "image_dhash", "qna_log_id"
+            ),
+        )
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < settings.IMAGE_INDEX_REFRESH_SECONDS:
+            return
+        with self._lock:
+            if self._signature is not None and now - self._checked_at < settings.IMAGE_INDEX_REFRESH_SECONDS:
+                return
+            logs, extra_images = self._querysets()
+            stats = logs.aggregate(count=Count("id"), last=Max("updated_at"))
+            signature = (stats["count"], stats["last"], extra_images.count())
+            radius = settings.IMAGE_HASH_MAX_DISTANCE
+            if signature != self._signature or self._table.radius != radius:
+                rows = chain(logs.iterator(), extra_images.iterator())
+                self._table = MultiIndexHash(DHASH_BITS, radius, ((int(value, 16), log_id) for value, log_id in rows))
+                self._signature = signature
+                logger.info(f"이미지 해시 인덱스 갱신: {self._table.size}건")
+            self._checked_at = now
+
+    def search(self, value: int) -> List[Tuple[int, int]]:
+        """거리가 IMAGE_HASH_MAX_DISTANCE 이하인 검증된 질문의 (거리, id) 목록"""
+        self._refresh()
+        return self._table.search(value)
+
+    def invalidate(self):
+        with self._lock:
+            self._signature = None
+
+
+_index = ImageHashIndex()
+
+
+def get_image_index() -> ImageHashIndex:
+    return _index
@@ -0,0 +1,191 @@
+"""
+Gemini 응답 캐시
+
+(모델 이름, 프롬프트, 이미지 바이트)의 해시를 키로 모델의 원본 응답 텍스트를 저장합니다
+저장소는 호스트의 SQLite 파일(WAL 모드)이라 같은 호스트의 웹/Django-Q 워커 프로세스가 함께 사용하며,
+TTL이 지난 항목은 무시하고 항목 수가 GEMINI_CACHE_MAX_ENTRIES를 넘으면 가장 오래 안 쓰인 항목부터 지웁니다
+
+조회는 쓰기 잠금 없이 읽기만 하고, 최근 사용 시각과 hit/miss 집계는 프로세스 안에 모았다가
+저장(set) 때나 일정 개수/시간마다 한 번의 쓰기로 반영합니다
+캐시 파일 오류(잠금 대기 시간 초과 등)는 요청을 실패시키지 않고 조회는 miss, 저장은 건너뜀으로 처리합니다
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used_idx ON entries (last_used_at);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value) VALUES ('hits', 0), ('misses', 0);
+"""
+
+
+def cache_key(model_name: str, prompt: str, image_data: Optional[bytes] = None) -> str:
+    """모델 입력 전체를 대표하는 sha256 키"""
+    digest = hashlib.sha256()
+    for part in (model_name.encode(), prompt.encode(), hashlib.sha256(image_data or b"").digest()):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """SQLite 파일 기반 응답 캐시 (스레드/프로세스마다 별도 연결 사용)"""
+
+    # 모아 둔 최근 사용 기록을 반영하는 기준 (개수, 초)
+    touch_batch_size = 64
+    touch_interval = 5.0
+
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._pending_lock = threading.Lock()
+        self._touches = {}
+        self._hits = 0
+        self._misses = 0
+        self._flushed_at = time.monotonic()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # 이미 만들어진 파일이면 쓰기 잠금이 필요한 스키마 스크립트를 건너뜀
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'counters'").fetchone() is None:
+                conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        """TTL 안의 항목이면 값을 반환합니다 (최근 사용 시각은 모아 두었다가 나중에 반영)"""
+        try:
+            row = self._connection().execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Gemini 응답 캐시 조회 실패, 캐시 없이 진행: {e}")
+            return None
+        now = time.time()
+        hit = row is not None and now - row[1] <= self.ttl
+        self._record(key if hit else None, now)
+        return row[0] if hit else None
+
+    def set(self, key: str, value: str):
+        """값을 저장하고 모아 둔 사용 기록 반영, 만료/초과 항목 정리를 한 트랜잭션에서 합니다"""
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._apply_pending(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl,))
+                excess = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM entries WHERE key IN "
+                        "(SELECT key FROM entries ORDER BY last_used_at ASC LIMIT ?)",
+                        (excess,),
+                    )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Gemini 응답 캐시 저장 실패, 저장하지 않음: {e}")
+
+    def _record(self, key: Optional[str], now: float):
+        # 조회 결과를 모아 두고, 충분히 모였거나 시간이 지났으면 한 번에 반영
+        with self._pending_lock:
+            if key is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._touches[key] = now
+            due = (
+                len(self._touches) >= self.touch_batch_size
+                or time.monotonic() - self._flushed_at >= self.touch_interval
+            )
+        if due:
+            self.flush()
+
+    def _apply_pending(self, conn: sqlite3.Connection):
+        """모아 둔 최근 사용 시각과 hit/miss 수를 쓰기 트랜잭션 안에서 반영합니다"""
+        with self._pending_lock:
+            touches, hits, misses = self._touches, self._hits, self._misses
+            self._touches, self._hits, self._misses = {}, 0, 0
+            self._flushed_at = time.monotonic()
+        if touches:
+            conn.executemany(
+                "UPDATE entries SET last_used_at = MAX(last_used_at, ?) WHERE key = ?",
+                [(used_at, key) for key, used_at in touches.items()],
+            )
+        for name, count in (("hits", hits), ("misses", misses)):
+            if count:
+                conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (count, name))
+
+    def flush(self):
+        """모아 둔 사용 기록을 반영합니다 (실패하면 버림 - LRU 순서와 집계가 조금 부정확해질 뿐)"""
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._apply_pending(conn)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Gemini 응답 캐시 사용 기록 반영 실패: {e}")
+
+    def stats(self) -> dict:
+        self.flush()
+        conn = self._connection()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {"hits": counters["hits"], "misses": counters["misses"], "entries": entries}
+
+    def clear(self):
+        with self._pending_lock:
+            self._touches, self._hits, self._misses = {}, 0, 0
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM entries")
+            conn.execute("UPDATE counters SET value = 0")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """프로세스 공용 캐시 객체 (GEMINI_CACHE_ENABLED가 꺼져 있으면 None)"""
+    global _cache
+    if not settings.GEMINI_CACHE_ENABLED:
+        return None
+    path = Path(settings.GEMINI_CACHE_PATH)
+    if _cache is None or _cache.path != path:
+        with _cache_lock:
+            if _cache is None or _cache.path != path:
+                _cache = ResponseCache(path, settings.GEMINI_CACHE_TTL, settings.GEMINI_CACHE_MAX_ENTRIES)
+    return _cache
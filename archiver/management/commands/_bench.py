@@ -0,0 +1,76 @@
+"""
+벤치마크 커맨드(bench_*)에서 공통으로 사용하는 도구
+"""
+
+import asyncio
+import statistics
+import time
+from contextlib import contextmanager
+
+from archiver.dto import QnACreateDTO
+
+
+def percentile(values, pct: float) -> float:
+    """정렬된 값 목록에서 pct(0~100) 백분위 값을 반환합니다"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies) -> dict:
+    """지연시간(초) 목록을 ms 단위 요약 통계로 변환합니다"""
+    return {
+        "count": len(latencies),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+@contextmanager
+def stopwatch():
+    """with 블록의 실행 시간을 측정합니다 (결과는 dict["elapsed"]에 초 단위로 저장)"""
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["elapsed"] = time.perf_counter() - start
+
+
+def fake_gemini_class(latency: float = 0.0, chunks: int = 10):
+    """지정한 지연시간 후 고정 답변을 돌려주는 GeminiAdapter 대체 클래스를 만듭니다"""
+
+    class FakeGeminiAdapter:
+        def _dto(self, question_text):
+            return QnACreateDTO(
+                question_text=question_text,
+                title="벤치마크 질문",
+                category="General",
+                keywords=["bench"],
+                ai_answer="벤치마크 답변",
+            )
+
+        def generate_answer(self, question_text, image_data=None):
+            if latency:
+                time.sleep(latency)
+            return self._dto(question_text)
+
+        async def agenerate_answer(self, question_text, image_data=None):
+            if latency:
+                await asyncio.sleep(latency)
+            return self._dto(question_text)
+
+        async def astream_answer(self, question_text, image_data=None):
+            # 전체 지연시간을 chunks개 조각에 나눠서 보냄 (첫 조각은 latency / chunks 후 도착)
+            lines = ["제목: 벤치마크 질문\n", "카테고리: General\n", "키워드: bench\n"]
+            lines += ["벤치마크 답변\n"] * max(0, chunks - len(lines))
+            for line in lines:
+                if latency:
+                    await asyncio.sleep(latency / len(lines))
+                yield line
+
+    return FakeGeminiAdapter
@@ -0,0 +1,49 @@
+"""
+이미지가 첨부된 기존 질문의 지각 해시(image_dhash)를 채웁니다
+(필드를 추가할 때 마이그레이션이 한 번 채우며, 그때 읽지 못한 이미지를 다시 시도할 때 사용. 여러 번 실행해도 비어있는 행만 처리)
+
+    python manage.py backfill_image_hashes --batch-size 200
+"""
+
+from django.core.management.base import BaseCommand
+
+from archiver.images import dhash_hex, prepare_image
+from archiver.models import QnALog
+
+
+class Command(BaseCommand):
+    help = "image_dhash가 비어있는 QnALog의 첨부 이미지 해시를 계산해 저장합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="한 번에 저장할 행 수")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        rows = (
+            QnALog.objects.filter(image_dhash__isnull=True)
+            .exclude(image="")
+            .exclude(image__isnull=True)
+            .only("id", "image")
+            .order_by("id")
+        )
+
+        updated, skipped, batch = 0, 0, []
+        for log in rows.iterator(chunk_size=batch_size):
+            try:
+                with log.image.open("rb") as f:
+                    prepared = prepare_image(f.read())
+            except OSError as e:
+                self.stderr.write(f"이미지를 열 수 없습니다 ({log.id}): {e}")
+                prepared = None
+            if not prepared:
+                skipped += 1
+                continue
+            log.image_dhash = dhash_hex(prepared.dhash)
+            batch.append(log)
+            if len(batch) == batch_size:
+                updated += QnALog.objects.bulk_update(batch, ["image_dhash"])
+                batch = []
+        if batch:
+            updated += QnALog.objects.bulk_update(batch, ["image_dhash"])
+
+        self.stdout.write(self.style.SUCCESS(f"이미지 해시 저장 완료: {updated}건 (건너뜀 {skipped}건)"))
@@ -0,0 +1,47 @@
+"""
+기존 질문의 유사도 비교용 서명(question_signature)과 에러 지문(error_fingerprint)을 채웁니다
+(필드를 추가할 때 마이그레이션이 한 번 채우며, 여러 번 실행해도 서명이나 에러 지문이 비어있는 행만 처리)
+정규화 규칙이나 QUESTION_SIGNATURE_MAX_LENGTH를 바꾼 뒤에는 --all로 전체를 다시 계산합니다
+
+    python manage.py backfill_question_signatures --batch-size 1000
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from archiver.fingerprints import error_fingerprint, question_signature
+from archiver.models import QnALog
+
+
+class Command(BaseCommand):
+    help = "question_signature/error_fingerprint가 비어있는 QnALog의 서명과 에러 지문을 계산해 저장합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="한 번에 저장할 행 수")
+        parser.add_argument("--all", action="store_true", help="이미 서명이 있는 행도 다시 계산")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        max_length = settings.QUESTION_SIGNATURE_MAX_LENGTH
+        fields = ["question_signature", "error_fingerprint"]
+        rows = QnALog.objects.only("id", "question_text", *fields).order_by("id")
+        if not options["all"]:
+            # 에러가 없는 질문은 error_fingerprint가 계속 비어있으므로 실행할 때마다 다시 확인함
+            rows = rows.filter(Q(question_signature="") | Q(error_fingerprint__isnull=True)).exclude(question_text="")
+
+        updated, unchanged, batch = 0, 0, []
+        for log in rows.iterator(chunk_size=batch_size):
+            values = (question_signature(log.question_text, max_length), error_fingerprint(log.question_text))
+            if values == (log.question_signature, log.error_fingerprint):
+                unchanged += 1
+                continue
+            log.question_signature, log.error_fingerprint = values
+            batch.append(log)
+            if len(batch) == batch_size:
+                updated += QnALog.objects.bulk_update(batch, fields)
+                batch = []
+        if batch:
+            updated += QnALog.objects.bulk_update(batch, fields)
+
+        self.stdout.write(self.style.SUCCESS(f"질문 서명/에러 지문 저장 완료: {updated}건 (변경 없음 {unchanged}건)"))
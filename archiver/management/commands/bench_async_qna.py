@@ -0,0 +1,108 @@
+"""
+동기(QnABotAPIView) / 비동기(AsyncQnABotAPIView) 경로의 동시 처리량 비교 벤치마크
+
+Gemini는 지정한 지연시간만큼 대기하는 가짜 어댑터로 대체하고, 노션 업로드 예약은 생략합니다
+동기 경로는 gunicorn sync 워커 수만큼의 스레드로 제한하고, 비동기 경로는 하나의 이벤트 루프에서 실행합니다
+
+    python manage.py bench_async_qna --requests 200 --latency 1.0 --sync-workers 3
+"""
+
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from archiver.models import QnALog
+
+from ._bench import fake_gemini_class, stopwatch, summarize
+
+BENCH_PREFIX = "[bench-async]"
+
+
+class Command(BaseCommand):
+    help = "동기/비동기 QnA 엔드포인트의 동시 처리량을 비교합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="경로별 동시 요청 수")
+        parser.add_argument("--latency", type=float, default=1.0, help="가짜 Gemini 응답 지연(초)")
+        parser.add_argument("--sync-workers", type=int, default=3, help="동기 경로의 워커(스레드) 수")
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        latency = options["latency"]
+        sync_workers = options["sync_workers"]
+
+        with override_settings(
+            GEMINI_API_KEY="bench"
+        ), patch(
+            "archiver.services.GeminiAdapter", fake_gemini_class(latency)
+        ), patch(
+            "archiver.services._qna_service", None
+        ), patch(
+            "archiver.models.dispatch_notion_outbox"
+        ):
+            try:
+                sync_stats = self._run_sync(total, sync_workers)
+                async_stats = asyncio.run(self._run_async(total))
+            finally:
+                deleted, _ = QnALog.objects.filter(
+                    question_text__startswith=BENCH_PREFIX
+                ).delete()
+                self.stdout.write(f"벤치마크 데이터 {deleted}건 정리 완료")
+
+        self.stdout.write(f"요청 {total}건, Gemini 지연 {latency:.2f}s, 동기 워커 {sync_workers}개")
+        for name, stats in (("sync", sync_stats), ("async", async_stats)):
+            self.stdout.write(
+                f"{name:>5}: {stats['throughput']:8.1f} req/s | "
+                f"wall {stats['wall']:.2f}s | p50 {stats['p50_ms']:.0f}ms | "
+                f"p99 {stats['p99_ms']:.0f}ms | 실패 {stats['errors']}"
+            )
+
+    def _question(self):
+        return f"{BENCH_PREFIX} {uuid.uuid4().hex}"
+
+    def _run_sync(self, total, workers):
+        url = reverse("archiver:qna_bot")
+
+        def one_request(_):
+            start = time.perf_counter()
+            try:
+                response = Client().post(
+                    url, {"question_text": self._question()}, content_type="application/json"
+                )
+                return time.perf_counter() - start, response.status_code
+            finally:
+                connection.close()
+
+        with stopwatch() as timer, ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(one_request, range(total)))
+        return self._stats(results, timer["elapsed"])
+
+    async def _run_async(self, total):
+        url = reverse("archiver:qna_bot_async")
+        client = AsyncClient()
+
+        async def one_request():
+            start = time.perf_counter()
+            response = await client.post(
+                url, {"question_text": self._question()}, content_type="application/json"
+            )
+            return time.perf_counter() - start, response.status_code
+
+        with stopwatch() as timer:
+            results = await asyncio.gather(*(one_request() for _ in range(total)))
+        return self._stats(results, timer["elapsed"])
+
+    def _stats(self, results, wall):
+        latencies = [elapsed for elapsed, _ in results]
+        stats = summarize(latencies)
+        stats["wall"] = wall
+        stats["throughput"] = len(results) / wall if wall else 0.0
+        stats["errors"] = sum(1 for _, status in results if status != 200)
+        return stats
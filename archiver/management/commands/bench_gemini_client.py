@@ -0,0 +1,58 @@
+"""
+요청당 Gemini 클라이언트 준비 비용 벤치마크
+
+가짜 Gemini 서버(archiver.fakes.FakeGeminiServer)를 대상으로 두 방식을 비교합니다
+  - per-request: 요청마다 QnAService/GeminiAdapter/genai.Client를 새로 생성 (이전 방식, 매번 새 연결)
+  - shared: 프로세스 공용 서비스와 클라이언트 재사용 (get_qna_service, keep-alive 연결 재사용)
+서버 지연시간을 뺀 값을 요청당 오버헤드로 출력합니다
+
+    python manage.py bench_gemini_client --requests 300 --latency 0.01
+"""
+
+import uuid
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from archiver.fakes import FakeGeminiServer
+from archiver.services import QnAService, get_qna_service
+
+from ._bench import stopwatch, summarize
+
+
+class Command(BaseCommand):
+    help = "요청마다 Gemini 어댑터/클라이언트를 만들 때와 재사용할 때의 요청당 오버헤드를 비교합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300, help="방식별 요청 수")
+        parser.add_argument("--latency", type=float, default=0.01, help="가짜 Gemini 응답 지연(초)")
+
+    def handle(self, *args, **options):
+        latency = options["latency"]
+
+        def per_request(question_text):
+            with patch("archiver.adapters._gemini_client", None):
+                return QnAService().gemini.generate_answer(question_text)
+
+        def shared(question_text):
+            return get_qna_service().gemini.generate_answer(question_text)
+
+        with override_settings(GEMINI_API_KEY="bench", GEMINI_CACHE_ENABLED=False), patch(
+            "archiver.services._qna_service", None
+        ):
+            for name, ask in (("per-request", per_request), ("shared", shared)):
+                with FakeGeminiServer(latency=latency) as server, override_settings(
+                    GEMINI_API_BASE_URL=server.base_url
+                ):
+                    ask("warm-up")
+                    latencies = []
+                    for _ in range(options["requests"]):
+                        with stopwatch() as timer:
+                            ask(f"[bench-client] {uuid.uuid4().hex}")
+                        latencies.append(max(0.0, timer["elapsed"] - latency))
+                stats = summarize(latencies)
+                self.stdout.write(
+                    f"{name:>11}: 오버헤드 p50 {stats['p50_ms']:6.2f}ms p99 {stats['p99_ms']:6.2f}ms "
+                    f"mean {stats['mean_ms']:6.2f}ms | TCP 연결 {server.connections}개"
+                )
@@ -0,0 +1,84 @@
+"""
+인기 질문 1개에 요청이 몰릴 때 hit_count 집계 방식별 처리량/유실 벤치마크
+
+  - legacy: 읽고 +1 한 뒤 save(update_fields=["hit_count"]) (기존 방식, 동시 요청 시 증가분 유실)
+  - atomic: UPDATE ... SET hit_count = hit_count + 1 (행 잠금 경합은 남음)
+  - buffered: 프로세스 내 버퍼에 모아 주기적으로 한 번에 반영
+
+    python manage.py bench_hit_count --workers 16 --hits 200
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from archiver.hitcounter import HitCountBuffer, increment_hit_count
+from archiver.models import QnALog
+
+from ._bench import stopwatch, summarize
+
+BENCH_PREFIX = "[bench-hit]"
+
+
+class Command(BaseCommand):
+    help = "같은 행에 대한 동시 hit_count 증가의 처리량과 유실 건수를 측정합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=16, help="동시 요청 스레드 수")
+        parser.add_argument("--hits", type=int, default=200, help="스레드당 증가 횟수")
+        parser.add_argument("--flush-interval", type=float, default=1.0, help="buffered 모드 flush 주기(초)")
+
+    def handle(self, *args, **options):
+        workers, hits = options["workers"], options["hits"]
+        log = QnALog.objects.create(
+            question_text=f"{BENCH_PREFIX} 인기 질문",
+            title="bench",
+            ai_answer="bench",
+            is_verified=True,
+            notion_page_url="https://notion.so/bench",
+        )
+        try:
+            buffer = HitCountBuffer(flush_interval=options["flush_interval"], flush_size=10_000)
+            modes = {
+                "legacy": lambda: self._legacy_increment(log.id),
+                "atomic": lambda: increment_hit_count(log.id),
+                "buffered": lambda: buffer.add(log.id),
+            }
+            for name, increment in modes.items():
+                QnALog.objects.filter(pk=log.id).update(hit_count=0)
+                latencies, elapsed = self._run(increment, workers, hits)
+                if name == "buffered":
+                    buffer.stop()
+                log.refresh_from_db()
+
+                expected = workers * hits
+                stats = summarize(latencies)
+                self.stdout.write(
+                    f"{name:>8} | {expected / elapsed:9.0f} hits/s | p50 {stats['p50_ms']:6.2f}ms "
+                    f"p99 {stats['p99_ms']:7.2f}ms | 유실 {expected - log.hit_count}/{expected}"
+                )
+        finally:
+            QnALog.objects.filter(question_text__startswith=BENCH_PREFIX).delete()
+
+    def _legacy_increment(self, log_id):
+        log = QnALog.objects.get(pk=log_id)
+        log.hit_count += 1
+        log.save(update_fields=["hit_count"])
+
+    def _run(self, increment, workers, hits):
+        def worker():
+            latencies = []
+            try:
+                for _ in range(hits):
+                    with stopwatch() as timer:
+                        increment()
+                    latencies.append(timer["elapsed"])
+            finally:
+                connection.close()
+            return latencies
+
+        with stopwatch() as total:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = [f.result() for f in [pool.submit(worker) for _ in range(workers)]]
+        return [latency for result in results for latency in result], total["elapsed"]
@@ -0,0 +1,98 @@
+"""
+이미지 지각 해시 검색 벤치마크 (합성 256비트 해시)
+
+무작위 해시 --size개로 인덱스를 만들고, 저장된 해시에서 일부 비트를 뒤집은 질의(같은 스크린샷을 다시 찍은 경우)로
+선형 탐색 / BK-tree / 다중 인덱스 해싱(archiver.image_index.MultiIndexHash)의 검색 시간과 재현율을 비교합니다
+
+    python manage.py bench_image_index --size 100000 --queries 200 --radius 8 16
+"""
+
+import random
+
+from django.core.management.base import BaseCommand
+
+from archiver.image_index import MultiIndexHash
+from archiver.images import DHASH_BITS, hamming_distance
+
+from ._bench import stopwatch, summarize
+
+
+class BKTree:
+    """비교용 BK-tree (노드: [해시, id, {거리: 자식}])"""
+
+    def __init__(self, items):
+        self.root = None
+        for value, item_id in items:
+            self.add(value, item_id)
+
+    def add(self, value, item_id):
+        if self.root is None:
+            self.root = [value, item_id, {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming_distance(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, item_id, {}]
+                return
+            node = child
+
+    def search(self, value, radius):
+        found, stack = [], [self.root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= radius:
+                found.append((distance, node[1]))
+            stack.extend(child for d, child in node[2].items() if distance - radius <= d <= distance + radius)
+        return found
+
+
+class Command(BaseCommand):
+    help = "합성 해시로 이미지 해시 인덱스 방식별 검색 시간과 재현율을 비교합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=100_000, help="인덱스에 넣을 해시 수")
+        parser.add_argument("--queries", type=int, default=200, help="질의 수")
+        parser.add_argument("--radius", type=int, nargs="+", default=[8, 16], help="검색 반경(해밍 거리)")
+        parser.add_argument("--linear-queries", type=int, default=20, help="선형 탐색은 느리므로 이 수만큼만 측정")
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        items = [(rng.getrandbits(DHASH_BITS), item_id) for item_id in range(options["size"])]
+
+        with stopwatch() as timer:
+            bk_tree = BKTree(items)
+        self.stdout.write(f"해시 {len(items)}개 | BK-tree 생성 {timer['elapsed']:.2f}s")
+
+        for radius in options["radius"]:
+            with stopwatch() as timer:
+                mih = MultiIndexHash(DHASH_BITS, radius, items)
+            self.stdout.write(f"반경 {radius} | 다중 인덱스 해싱 생성 {timer['elapsed']:.2f}s")
+
+            queries = []
+            for _ in range(options["queries"]):
+                value, item_id = rng.choice(items)
+                for bit in rng.sample(range(DHASH_BITS), rng.randint(0, radius)):
+                    value ^= 1 << bit
+                queries.append((value, item_id))
+
+            searchers = {
+                "linear": lambda q: [(hamming_distance(q, v), i) for v, i in items if hamming_distance(q, v) <= radius],
+                "bk-tree": lambda q: bk_tree.search(q, radius),
+                "multi-index": lambda q: mih.search(q),
+            }
+            for name, search in searchers.items():
+                sample = queries[: options["linear_queries"]] if name == "linear" else queries
+                latencies, hits = [], 0
+                for value, expected in sample:
+                    with stopwatch() as timer:
+                        found = search(value)
+                    latencies.append(timer["elapsed"])
+                    hits += any(item_id == expected for _, item_id in found)
+                stats = summarize(latencies)
+                self.stdout.write(
+                    f"  {name:>11} | p50 {stats['p50_ms']:8.3f}ms p99 {stats['p99_ms']:8.3f}ms | "
+                    f"재현율 {hits / len(sample):.2f}"
+                )
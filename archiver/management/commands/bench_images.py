@@ -0,0 +1,88 @@
+"""
+Gemini 전송 이미지 전처리 벤치마크 (보내는 바이트 수와 처리 시간)
+
+--corpus로 스크린샷 폴더를 지정하지 않으면 휴대폰/모니터 해상도의 가짜 스크린샷(코드 화면)을 만들어 사용합니다
+업로드 시간은 --uplink-mbps 대역폭 기준 추정치입니다
+
+    python manage.py bench_images --corpus ./samples --uplink-mbps 10
+"""
+
+import io
+import random
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from PIL import Image, ImageDraw
+
+from archiver.images import prepare_image
+
+from ._bench import stopwatch, summarize
+
+SCREEN_SIZES = [(1170, 2532), (1080, 2400), (1920, 1080), (2560, 1440), (3024, 1964)]
+
+
+def synthetic_screenshot(rng: random.Random, size, fmt: str) -> bytes:
+    """어두운 배경에 코드 줄이 있는 스크린샷 흉내 이미지"""
+    img = Image.new("RGB", size, (30, 30, 30))
+    draw = ImageDraw.Draw(img)
+    y = 20
+    while y < size[1] - 20:
+        x = 20 + rng.randrange(0, 6) * 24
+        for _ in range(rng.randrange(2, 12)):
+            width = rng.randrange(20, 160)
+            color = rng.choice([(220, 220, 220), (86, 156, 214), (206, 145, 120), (106, 153, 85)])
+            draw.rectangle([x, y, min(x + width, size[0] - 20), y + 14], fill=color)
+            x += width + 12
+            if x > size[0] - 40:
+                break
+        y += 28
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, **({"quality": 95} if fmt == "JPEG" else {}))
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = "이미지 전처리 전후의 전송 바이트와 처리/업로드 시간을 비교합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corpus", type=Path, help="샘플 스크린샷 폴더 (없으면 합성 이미지 사용)")
+        parser.add_argument("--count", type=int, default=20, help="합성 이미지 수")
+        parser.add_argument("--uplink-mbps", type=float, default=10.0, help="업로드 대역폭 추정치(Mbps)")
+        parser.add_argument("--max-edge", type=int, nargs="+", default=[1024, 1568, 2048], help="비교할 긴 변 상한")
+        parser.add_argument("--format", default="WEBP", help="재인코딩 형식 (WEBP/JPEG/PNG)")
+
+    def handle(self, *args, **options):
+        corpus = self._load_corpus(options)
+        bytes_per_second = options["uplink_mbps"] * 1_000_000 / 8
+        original = sum(len(raw) for raw in corpus)
+        self.stdout.write(
+            f"샘플 {len(corpus)}개 | 원본 평균 {original / len(corpus) / 1024:8.1f}KB | "
+            f"업로드 추정 {original / len(corpus) / bytes_per_second * 1000:7.1f}ms"
+        )
+
+        for max_edge in options["max_edge"]:
+            with override_settings(IMAGE_MAX_EDGE=max_edge, IMAGE_FORMAT=options["format"]):
+                latencies, sent = [], 0
+                for raw in corpus:
+                    with stopwatch() as timer:
+                        prepared = prepare_image(raw)
+                    latencies.append(timer["elapsed"])
+                    sent += len(prepared.data) if prepared else 0
+
+            stats = summarize(latencies)
+            self.stdout.write(
+                f"{options['format']:>4} {max_edge:>5}px | 평균 {sent / len(corpus) / 1024:8.1f}KB "
+                f"({sent / original * 100:5.1f}%) | 전처리 p50 {stats['p50_ms']:6.1f}ms p99 {stats['p99_ms']:6.1f}ms | "
+                f"업로드 추정 {sent / len(corpus) / bytes_per_second * 1000:7.1f}ms"
+            )
+
+    def _load_corpus(self, options):
+        if options["corpus"]:
+            paths = sorted(p for p in options["corpus"].iterdir() if p.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp"))
+            return [path.read_bytes() for path in paths]
+        rng = random.Random(7)
+        return [
+            synthetic_screenshot(rng, SCREEN_SIZES[i % len(SCREEN_SIZES)], "PNG" if i % 2 else "JPEG")
+            for i in range(options["count"])
+        ]
@@ -0,0 +1,96 @@
+"""
+신규 질문 처리 지연시간 비교: 노션 업로드를 요청 경로에서 수행(inline) vs 워커로 위임(deferred)
+
+가짜 노션 서버(archiver.fakes.FakeNotionServer)에 지연시간을 주고 p50/p99를 측정합니다
+deferred 모드로 쌓인 업로드는 측정이 끝난 뒤 워커 태스크를 직접 실행해 처리 결과까지 확인합니다
+
+    python manage.py bench_notion_deferral --questions 100 --notion-latency 0.4
+"""
+
+import time
+import uuid
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django_q.models import OrmQ
+
+from archiver.adapters import NotionAdapter
+from archiver.fakes import FakeNotionServer
+from archiver.models import QnALog
+from archiver.services import QnAService
+from archiver.tasks import task_drain_notion_outbox
+
+from ._bench import fake_gemini_class, summarize
+
+BENCH_PREFIX = "[bench-notion]"
+
+
+class Command(BaseCommand):
+    help = "노션 업로드 inline/deferred 처리 시 신규 질문 응답 지연시간(p50/p99)을 비교합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=100, help="모드별 질문 수")
+        parser.add_argument("--notion-latency", type=float, default=0.4, help="가짜 노션 응답 지연(초)")
+
+    def handle(self, *args, **options):
+        total = options["questions"]
+
+        with FakeNotionServer(latency=options["notion_latency"]) as server, override_settings(
+            GEMINI_API_KEY="bench",
+            NOTION_TOKEN="bench",
+            NOTION_DB_ID="bench",
+            NOTION_API_URL=server.base_url,
+            # 워커 timeout이 없으므로 디스패처 한 번에 끝까지 업로드
+            NOTION_TASK_TIME_BUDGET=float("inf"),
+        ), patch("archiver.services.GeminiAdapter", fake_gemini_class()):
+            last_queued = OrmQ.objects.order_by("-id").values_list("id", flat=True).first() or 0
+            try:
+                inline = self._run_inline(total)
+                deferred, created_ids = self._run_deferred(total)
+
+                # 워커가 하는 일(outbox 디스패처)을 그대로 실행해 업로드 결과 확인
+                uploads_before = len(server.requests)
+                task_drain_notion_outbox()
+                uploaded = QnALog.objects.filter(
+                    id__in=created_ids, notion_page_url__isnull=False
+                ).count()
+            finally:
+                OrmQ.objects.filter(id__gt=last_queued).delete()
+                QnALog.objects.filter(question_text__startswith=BENCH_PREFIX).delete()
+
+        self.stdout.write(f"질문 {total}건, 노션 지연 {options['notion_latency']:.2f}s")
+        for name, stats in (("inline", inline), ("deferred", deferred)):
+            self.stdout.write(
+                f"{name:>8}: p50 {stats['p50_ms']:7.1f}ms | p99 {stats['p99_ms']:7.1f}ms | "
+                f"mean {stats['mean_ms']:7.1f}ms"
+            )
+        self.stdout.write(
+            f"워커 처리: 노션 요청 {len(server.requests) - uploads_before}건, URL 저장 {uploaded}/{total}건"
+        )
+
+    def _question(self):
+        return f"{BENCH_PREFIX} {uuid.uuid4().hex}"
+
+    def _run_inline(self, total):
+        """기존 방식: 응답 전에 노션 페이지를 생성하고 URL을 저장"""
+        latencies = []
+        with patch("archiver.models.dispatch_notion_outbox"):
+            for _ in range(total):
+                start = time.perf_counter()
+                log_obj = QnAService().process_question_flow(self._question())
+                log_obj.notion_page_url = NotionAdapter().create_qna_page(log_obj)
+                log_obj.save(update_fields=["notion_page_url"])
+                latencies.append(time.perf_counter() - start)
+        return summarize(latencies)
+
+    def _run_deferred(self, total):
+        """현재 방식: 질문과 outbox 항목을 함께 저장하고 즉시 반환"""
+        latencies = []
+        created_ids = []
+        for _ in range(total):
+            start = time.perf_counter()
+            log_obj = QnAService().process_question_flow(self._question())
+            latencies.append(time.perf_counter() - start)
+            created_ids.append(log_obj.id)
+        return summarize(latencies), created_ids
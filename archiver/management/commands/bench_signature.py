@@ -0,0 +1,209 @@
+"""
+유사 질문 검색 대상 컬럼(SIMILARITY_FIELD)별 지연시간/판정 품질 벤치마크
+
+traceback을 붙여넣은 질문으로 라벨된 데이터를 만들어 두 방식을 비교합니다
+  - question_text: 원문 전체를 trigram으로 비교 (길이에 비례해 느리고, 경로/줄 번호가 점수를 좌우함)
+  - question_signature: 경로/줄 번호/주소/시각을 지우고 길이를 제한한 서명으로 비교
+
+검증된 질문(주제별 1건)과 채움용 질문을 저장한 뒤,
+  - positive: 같은 주제를 다른 환경(경로/줄 번호/시각)에서 다시 붙여넣은 질문 → 해당 질문을 찾아야 함
+  - negative: 같은 프레임워크 traceback이지만 다른 에러인 질문 → 아무것도 찾지 않아야 함
+으로 검색해 정확도를 집계합니다
+
+    python manage.py bench_signature --rows 20000 --variants 5
+"""
+
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from archiver.db import ensure_similarity_threshold
+from archiver.fingerprints import question_signature
+from archiver.models import QnALog
+from archiver.services import QnAService
+
+from ._bench import stopwatch, summarize
+
+BENCH_TITLE = "[bench-sig]"
+
+# 여러 주제의 traceback에 공통으로 등장하는 프레임
+COMMON_FRAMES = [
+    ("django/core/handlers/exception.py", "inner", "response = get_response(request)"),
+    ("django/core/handlers/base.py", "_get_response", "response = wrapped_callback(request, *callback_args, **callback_kwargs)"),
+    ("django/views/generic/base.py", "view", "return self.dispatch(request, *args, **kwargs)"),
+    ("django/db/backends/utils.py", "_execute", "return self.cursor.execute(sql, params)"),
+    ("django/db/models/query.py", "__iter__", "self._fetch_all()"),
+]
+
+# (질문 표현들, 마지막 예외 메시지) - 저장되는 주제
+TOPICS = [
+    (["마이그레이션 적용하면 에러가 납니다", "migrate 하니까 테이블이 없다고 나와요"],
+     'django.db.utils.ProgrammingError: relation "archiver_qnalog" does not exist'),
+    (["모듈을 못 찾는다고 나옵니다", "import 에러가 계속 떠요"],
+     "ModuleNotFoundError: No module named 'rest_framework'"),
+    (["템플릿을 못 찾는다고 합니다", "render 하면 템플릿 에러가 나요"],
+     "django.template.exceptions.TemplateDoesNotExist: archiver/index.html"),
+    (["디비 연결이 안 됩니다", "postgres 접속이 거부돼요"],
+     'django.db.utils.OperationalError: connection to server at "127.0.0.1", port 5432 failed: Connection refused'),
+    (["csrf 에러가 나요", "post 요청이 403으로 막힙니다"],
+     "django.middleware.csrf.CsrfViewMiddleware: Forbidden (CSRF token missing.)"),
+    (["정적 파일이 안 보입니다", "collectstatic 후에도 css가 안 나와요"],
+     "ValueError: Missing staticfiles manifest entry for 'css/base.css'"),
+    (["시리얼라이저 저장이 안 돼요", "serializer.save()에서 에러납니다"],
+     "AssertionError: You cannot call `.save()` on a serializer with invalid data."),
+    (["쿼리셋 인덱싱에서 에러가 나요", "음수 인덱스를 쓰면 에러가 납니다"],
+     "ValueError: Negative indexing is not supported."),
+    (["외래키 삭제가 안 됩니다", "부모 객체를 지우면 무결성 에러가 나요"],
+     'django.db.utils.IntegrityError: update or delete on table "archiver_qnalog" violates foreign key constraint'),
+    (["비동기 뷰에서 orm을 못 써요", "async 함수에서 쿼리하면 에러납니다"],
+     "django.core.exceptions.SynchronousOnlyOperation: You cannot call this from an async context - use a thread or sync_to_async."),
+]
+
+# 저장되지 않는 주제 (같은 프레임워크 프레임을 공유하므로 원문 비교에서는 오탐이 나기 쉬움)
+NEGATIVE_TOPICS = [
+    (["마이그레이션 충돌이 납니다"], "CommandError: Conflicting migrations detected; multiple leaf nodes in the migration graph"),
+    (["모델 필드 기본값 에러가 나요"], "django.db.utils.IntegrityError: null value in column \"title\" violates not-null constraint"),
+    (["쿼리셋이 너무 느려요"], "django.db.utils.OperationalError: canceling statement due to statement timeout"),
+    (["url 패턴을 못 찾습니다"], "django.urls.exceptions.NoReverseMatch: Reverse for 'qna_bot' not found."),
+    (["json 응답이 깨집니다"], "TypeError: Object of type datetime is not JSON serializable"),
+]
+
+FILLER_WORDS = (
+    "django orm queryset migration model view template url python list dict "
+    "import error module git commit push merge branch docker postgres index "
+    "설치 오류 실행 안됩니다 경로 설정 가상환경 패키지 버전 충돌 배포 서버"
+).split()
+
+
+def fake_environment(rng):
+    """질문마다 다른 실행 환경 (프로젝트 경로, 시각, 주소)"""
+    user = rng.choice(["kim", "lee", "park", "choi", "student01", "dev"])
+    project = rng.choice(["qna", "mysite", "final_project", "backend", "bot"])
+    root = rng.choice([
+        f"/home/{user}/{project}/venv/lib/python3.{rng.randint(10, 13)}/site-packages",
+        f"C:\\Users\\{user}\\{project}\\.venv\\Lib\\site-packages",
+        f"/usr/local/lib/python3.{rng.randint(10, 13)}/site-packages",
+        f"/Users/{user}/workspace/{project}/.venv/lib/python3.{rng.randint(10, 13)}/site-packages",
+    ])
+    return {
+        "root": root,
+        "app": root.split("venv")[0].rstrip("/\\.") + "/archiver/views.py",
+        "time": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+        "addr": f"0x{rng.getrandbits(48):012x}",
+        "pid": rng.randint(10000, 99999),
+    }
+
+
+def pasted_question(rng, phrasing, exception):
+    """질문 한 줄 + 붙여넣은 traceback"""
+    env = fake_environment(rng)
+    lines = [phrasing, f"[{env['time']}] pid {env['pid']}", "Traceback (most recent call last):"]
+    for module, func, code in rng.sample(COMMON_FRAMES, rng.randint(3, len(COMMON_FRAMES))):
+        sep = "\\" if "\\" in env["root"] else "/"
+        lines.append(f'  File "{env["root"]}{sep}{module.replace("/", sep)}", line {rng.randint(20, 900)}, in {func}')
+        lines.append(f"    {code}")
+        lines.append("    " + "^" * rng.randint(10, 40))
+    lines.append(f'  File "{env["app"]}", line {rng.randint(5, 200)}, in post')
+    lines.append(f"    handler = <object at {env['addr']}>")
+    lines.append(exception)
+    return "\n".join(lines)
+
+
+class Command(BaseCommand):
+    help = "traceback이 붙은 라벨 데이터로 원문/서명 trigram 검색의 지연시간과 정확도를 비교합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20_000, help="채움용 질문 수 (5건마다 1건 검증 완료)")
+        parser.add_argument("--variants", type=int, default=5, help="주제별 검색 질문 수")
+        parser.add_argument("--threshold", type=float, default=None, help="유사도 기준 (기본 SIMILARITY_THRESHOLD)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(19)
+        threshold = options["threshold"] if options["threshold"] is not None else settings.SIMILARITY_THRESHOLD
+        with override_settings(GEMINI_API_KEY="bench"):
+            service = QnAService()
+
+        try:
+            expected_ids = self._insert_rows(rng, options["rows"])
+            queries = self._labeled_queries(rng, expected_ids, options["variants"])
+            ensure_similarity_threshold(threshold)
+
+            text_length = sum(len(text) for text, _ in queries) / len(queries)
+            signature_length = sum(len(question_signature(text)) for text, _ in queries) / len(queries)
+            self.stdout.write(
+                f"검색 질문 {len(queries)}건 (positive {sum(1 for _, e in queries if e)}), "
+                f"평균 길이 원문 {text_length:.0f}자 / 서명 {signature_length:.0f}자, threshold {threshold}"
+            )
+            for field in ("question_text", "question_signature"):
+                with override_settings(SIMILARITY_FIELD=field):
+                    self._report(field, service, queries, threshold)
+        finally:
+            QnALog.objects.filter(title=BENCH_TITLE).delete()
+
+    def _insert_rows(self, rng, filler_rows):
+        """주제별 검증된 질문과 채움용 질문을 저장하고 {주제 번호: id}를 반환합니다"""
+        max_length = settings.QUESTION_SIGNATURE_MAX_LENGTH
+        logs = []
+        for phrasings, exception in TOPICS:
+            text = pasted_question(rng, phrasings[0], exception)
+            logs.append(self._row(text, True, max_length))
+        for i in range(filler_rows):
+            words = " ".join(rng.sample(FILLER_WORDS, 6))
+            exception = f"ValueError: {' '.join(rng.sample(FILLER_WORDS, 4))}"
+            text = pasted_question(rng, words, exception) if i % 2 else words
+            logs.append(self._row(text, i % 5 == 0, max_length))
+        created = QnALog.objects.bulk_create(logs, batch_size=2000)
+        self.stdout.write(f"라벨 데이터 {len(TOPICS)}건 + 채움용 {filler_rows}건 저장")
+        return {index: created[index].id for index in range(len(TOPICS))}
+
+    @staticmethod
+    def _row(text, verified, max_length):
+        # bulk_create는 save()를 거치지 않으므로 서명을 직접 채움
+        return QnALog(
+            title=BENCH_TITLE,
+            question_text=text,
+            question_signature=question_signature(text, max_length),
+            ai_answer="bench",
+            is_verified=verified,
+            notion_page_url="https://notion.so/bench" if verified else None,
+        )
+
+    @staticmethod
+    def _labeled_queries(rng, expected_ids, variants):
+        """(검색 질문, 찾아야 하는 id 또는 None) 목록"""
+        queries = []
+        for index, (phrasings, exception) in enumerate(TOPICS):
+            for _ in range(variants):
+                queries.append((pasted_question(rng, rng.choice(phrasings), exception), expected_ids[index]))
+        for phrasings, exception in NEGATIVE_TOPICS:
+            for _ in range(variants):
+                queries.append((pasted_question(rng, rng.choice(phrasings), exception), None))
+        rng.shuffle(queries)
+        return queries
+
+    def _report(self, field, service, queries, threshold):
+        latencies = []
+        correct = wrong = missed = false_positive = 0
+        for text, expected in queries:
+            with stopwatch() as timer:
+                found = service._similar_queryset(text, threshold).first()
+            latencies.append(timer["elapsed"])
+            if expected is None:
+                false_positive += found is not None
+            elif found is None:
+                missed += 1
+            elif found.id == expected:
+                correct += 1
+            else:
+                wrong += 1
+
+        positives = sum(1 for _, expected in queries if expected)
+        returned = correct + wrong + false_positive
+        stats = summarize(latencies)
+        self.stdout.write(
+            f"{field:>18} | p50 {stats['p50_ms']:7.1f}ms p99 {stats['p99_ms']:7.1f}ms | "
+            f"정확도 {correct / returned if returned else 0:.2f} 재현율 {correct / positives:.2f} "
+            f"(오답 {wrong}, 놓침 {missed}, 오탐 {false_positive})"
+        )
@@ -0,0 +1,130 @@
+"""
+유사 질문 검색(check_similarity) 규모별 지연시간 벤치마크
+
+합성 질문을 단계적으로 늘려가며(기본 10k → 100k → 1M) 두 방식의 검색 시간을 비교합니다
+  - legacy: TrigramSimilarity를 전체 행에 계산한 뒤 similarity > threshold 필터 (순차 스캔)
+  - indexed: % 연산자 + 검증된 행에 대한 부분 GIN 인덱스 (현재 check_similarity)
+
+    python manage.py bench_similarity --sizes 10000 100000 1000000 --lookups 50
+"""
+
+import random
+import time
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+
+from archiver.db import ensure_similarity_threshold
+from archiver.models import QnALog
+from archiver.services import QnAService
+
+from ._bench import summarize
+
+BENCH_PREFIX = "[bench-trgm]"
+
+# 질문 텍스트 생성을 위한 단어 목록 (실제 질문과 비슷한 분포를 흉내냄)
+WORDS = (
+    "django orm queryset migration model view template url python list dict "
+    "import error module git commit push merge branch rebase linux permission "
+    "docker compose postgres index query select join flask fastapi pydantic "
+    "async await request response json timeout 설치 오류 실행 안됩니다 "
+    "경로 설정 가상환경 패키지 버전 충돌 배포 서버 로그 테스트"
+).split()
+
+
+class Command(BaseCommand):
+    help = "행 수를 늘려가며 유사 질문 검색 지연시간을 측정합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+        )
+        parser.add_argument("--lookups", type=int, default=50, help="규모별 검색 횟수")
+        parser.add_argument(
+            "--verified-ratio", type=int, default=5, help="N행마다 1행을 검증 완료로 생성"
+        )
+        parser.add_argument("--keep", action="store_true", help="종료 후 합성 데이터를 남겨둠")
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        with override_settings(GEMINI_API_KEY="bench"):
+            service = QnAService()
+        threshold = settings.SIMILARITY_THRESHOLD
+
+        try:
+            current = QnALog.objects.filter(question_text__startswith=BENCH_PREFIX).count()
+            for size in sorted(options["sizes"]):
+                if size > current:
+                    self._insert_rows(current, size, options["verified_ratio"])
+                    current = size
+
+                queries = self._sample_queries(rng, options["lookups"])
+                legacy = self._measure(lambda q: self._legacy_lookup(q, threshold), queries)
+                ensure_similarity_threshold(threshold)
+                indexed = self._measure(
+                    lambda q: service._similar_queryset(q, threshold).first(), queries
+                )
+                self.stdout.write(
+                    f"{size:>9} rows | legacy p50 {legacy['p50_ms']:8.1f}ms "
+                    f"p99 {legacy['p99_ms']:8.1f}ms | indexed p50 {indexed['p50_ms']:7.1f}ms "
+                    f"p99 {indexed['p99_ms']:7.1f}ms"
+                )
+            self.stdout.write(self._explain(queries[0], threshold, service))
+        finally:
+            if not options["keep"]:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "DELETE FROM archiver_qnalog WHERE question_text LIKE %s",
+                        [BENCH_PREFIX + "%"],
+                    )
+
+    def _insert_rows(self, start, end, verified_ratio):
+        """generate_series로 합성 질문을 빠르게 삽입합니다"""
+        # 합성 질문에는 경로/숫자 같은 지울 토큰이 없으므로 서명은 소문자 변환만 적용
+        sql = """
+            INSERT INTO archiver_qnalog
+                (category, title, question_text, question_signature, ai_answer, is_verified, hit_count,
+                 keywords, created_at, updated_at)
+            SELECT 'General', 'bench', q, lower(q), 'bench', (g %% %s = 0), 0, '', now(), now()
+            FROM (
+                SELECT g, %s || ' ' || w[1 + (g * 7) %% n] || ' ' || w[1 + (g * 13) %% n] || ' '
+                        || w[1 + (g * 31) %% n] || ' ' || w[1 + (g * 101) %% n] || ' ' || md5(g::text) AS q
+                FROM generate_series(%s, %s) AS g,
+                     (SELECT %s::text[] AS w, cardinality(%s::text[]) AS n) AS vocab
+            ) AS rows
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [verified_ratio, BENCH_PREFIX, start + 1, end, WORDS, WORDS])
+            cursor.execute("ANALYZE archiver_qnalog")
+        self.stdout.write(f"합성 데이터 {end - start}건 추가 (총 {end}건)")
+
+    def _sample_queries(self, rng, count):
+        queries = []
+        for _ in range(count):
+            queries.append(" ".join(rng.sample(WORDS, 4)))
+        return queries
+
+    def _legacy_lookup(self, question_text, threshold):
+        return (
+            QnALog.objects.annotate(
+                similarity=TrigramSimilarity("question_text", question_text)
+            )
+            .filter(is_verified=True, similarity__gt=threshold)
+            .order_by("-similarity")
+            .first()
+        )
+
+    def _measure(self, lookup, queries):
+        latencies = []
+        for question_text in queries:
+            start = time.perf_counter()
+            lookup(question_text)
+            latencies.append(time.perf_counter() - start)
+        return summarize(latencies)
+
+    def _explain(self, question_text, threshold, service):
+        ensure_similarity_threshold(threshold)
+        return service._similar_queryset(question_text, threshold)[:1].explain()
@@ -0,0 +1,76 @@
+"""
+추측 Gemini 호출(SPECULATIVE_DISPATCH) 정책별 응답 지연/낭비 호출 벤치마크
+
+검증된 질문을 미리 만들어 두고, 기존 질문(hit)과 새 질문(miss)을 섞어 QnABotAPIView로 보냅니다
+Gemini는 지정한 지연시간만큼 대기하는 가짜 어댑터로 대체합니다
+
+    python manage.py bench_speculation --questions 200 --hit-ratio 0.5 --latency 0.3
+"""
+
+import random
+import uuid
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from archiver import speculation
+from archiver.fingerprints import question_fingerprint
+from archiver.models import QnALog
+
+from ._bench import fake_gemini_class, stopwatch, summarize
+
+BENCH_PREFIX = "[bench-spec]"
+
+
+class Command(BaseCommand):
+    help = "추측 호출 정책별로 신규/기존 질문의 응답 지연과 낭비된 Gemini 호출 수를 비교합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=200, help="정책별 질문 수")
+        parser.add_argument("--hit-ratio", type=float, default=0.5, help="기존(검증된) 질문의 비율")
+        parser.add_argument("--latency", type=float, default=0.3, help="가짜 Gemini 응답 지연(초)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        url = reverse("archiver:qna_bot")
+        client = Client()
+        known = [f"{BENCH_PREFIX} 검증된 질문 {uuid.uuid4().hex}" for _ in range(20)]
+
+        with override_settings(GEMINI_API_KEY="bench", GEMINI_CACHE_ENABLED=False), patch(
+            "archiver.services.GeminiAdapter", fake_gemini_class(options["latency"])
+        ), patch("archiver.services._qna_service", None), patch("archiver.models.dispatch_notion_outbox"):
+            try:
+                for text in known:
+                    QnALog.objects.create(
+                        question_text=text,
+                        title="bench",
+                        ai_answer="bench",
+                        is_verified=True,
+                        notion_page_url="https://notion.so/bench",
+                        question_fingerprint=question_fingerprint(text),
+                    )
+
+                for policy in speculation.POLICIES:
+                    speculation.stats.reset()
+                    latencies = {"hit": [], "miss": []}
+                    with override_settings(SPECULATIVE_DISPATCH=policy):
+                        for _ in range(options["questions"]):
+                            if rng.random() < options["hit_ratio"]:
+                                kind, text = "hit", rng.choice(known)
+                            else:
+                                kind, text = "miss", f"{BENCH_PREFIX} {uuid.uuid4().hex}"
+                            with stopwatch() as timer:
+                                client.post(url, {"question_text": text}, content_type="application/json")
+                            latencies[kind].append(timer["elapsed"])
+
+                    hit, miss = summarize(latencies["hit"]), summarize(latencies["miss"])
+                    spec = speculation.stats.snapshot()
+                    self.stdout.write(
+                        f"{policy:>16} | miss p50 {miss['p50_ms']:7.1f}ms p99 {miss['p99_ms']:7.1f}ms | "
+                        f"hit p50 {hit['p50_ms']:6.1f}ms | 추측 {spec['started']}건 "
+                        f"(낭비 {spec['wasted']}, 평균 단축 {spec['saved_ms_avg']:.1f}ms)"
+                    )
+            finally:
+                QnALog.objects.filter(question_text__startswith=BENCH_PREFIX).delete()
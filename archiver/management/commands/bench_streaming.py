@@ -0,0 +1,69 @@
+"""
+스트리밍(SSE) 엔드포인트와 기존 비동기 엔드포인트의 첫 응답 시간(TTFT) 비교 벤치마크
+
+Gemini는 지정한 지연시간을 조각 수만큼 나눠 응답하는 가짜 어댑터로 대체합니다
+기존 엔드포인트는 전체 답변이 끝나야 응답하므로 TTFT가 전체 처리 시간과 같습니다
+
+    python manage.py bench_streaming --questions 50 --latency 2.0 --chunks 20
+"""
+
+import json
+import uuid
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from archiver.models import QnALog
+
+from ._bench import fake_gemini_class, stopwatch, summarize
+
+BENCH_PREFIX = "[bench-stream]"
+
+
+class Command(BaseCommand):
+    help = "신규 질문의 첫 응답까지 걸린 시간과 전체 처리 시간을 스트리밍 여부별로 비교합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=50, help="모드별 질문 수")
+        parser.add_argument("--latency", type=float, default=2.0, help="가짜 Gemini 전체 응답 시간(초)")
+        parser.add_argument("--chunks", type=int, default=20, help="스트리밍 응답 조각 수")
+
+    def handle(self, *args, **options):
+        client = Client()
+        fake = fake_gemini_class(options["latency"], options["chunks"])
+
+        with override_settings(GEMINI_API_KEY="bench", GEMINI_CACHE_ENABLED=False), patch(
+            "archiver.services.GeminiAdapter", fake
+        ), patch("archiver.services._qna_service", None), patch("archiver.models.dispatch_notion_outbox"):
+            try:
+                for mode in ("async", "stream"):
+                    ttfts, totals = [], []
+                    for _ in range(options["questions"]):
+                        text = f"{BENCH_PREFIX} {uuid.uuid4().hex}"
+                        if mode == "async":
+                            with stopwatch() as timer:
+                                client.post(
+                                    reverse("archiver:qna_bot_async"), {"question_text": text}, content_type="application/json"
+                                )
+                            ttfts.append(timer["elapsed"])
+                            totals.append(timer["elapsed"])
+                            continue
+
+                        # 테스트 클라이언트는 스트리밍 응답을 모두 받은 뒤 돌려주므로 TTFT는 서버가 잰 값을 사용
+                        response = client.post(
+                            reverse("archiver:qna_bot_stream"), {"question_text": text}, content_type="application/json"
+                        )
+                        body = b"".join(response.streaming_content).decode()
+                        result = json.loads(body.strip().split("\n\n")[-1].split("data: ", 1)[1])
+                        ttfts.append(result["ttft_ms"] / 1000)
+                        totals.append(result["total_ms"] / 1000)
+
+                    ttft, total = summarize(ttfts), summarize(totals)
+                    self.stdout.write(
+                        f"{mode:>6} | TTFT p50 {ttft['p50_ms']:7.1f}ms p99 {ttft['p99_ms']:7.1f}ms | "
+                        f"전체 p50 {total['p50_ms']:7.1f}ms p99 {total['p99_ms']:7.1f}ms"
+                    )
+            finally:
+                QnALog.objects.filter(question_text__startswith=BENCH_PREFIX).delete()
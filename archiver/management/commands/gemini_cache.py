@@ -0,0 +1,34 @@
+"""
+Gemini 응답 캐시 상태 확인/비우기
+
+    python manage.py gemini_cache          # 적중/미적중 횟수와 저장된 항목 수
+    python manage.py gemini_cache --clear  # 캐시와 카운터 초기화
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from archiver.llm_cache import get_response_cache
+
+
+class Command(BaseCommand):
+    help = "Gemini 응답 캐시의 적중률을 출력하거나 캐시를 비웁니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clear", action="store_true", help="저장된 응답과 카운터를 모두 삭제")
+
+    def handle(self, *args, **options):
+        cache = get_response_cache()
+        if cache is None:
+            raise CommandError("GEMINI_CACHE_ENABLED가 꺼져 있습니다")
+
+        if options["clear"]:
+            cache.clear()
+            self.stdout.write(self.style.SUCCESS("Gemini 응답 캐시를 비웠습니다"))
+            return
+
+        stats = cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups * 100 if lookups else 0.0
+        self.stdout.write(
+            f"항목 {stats['entries']}개 | 적중 {stats['hits']} / 미적중 {stats['misses']} ({hit_rate:.1f}%)"
+        )
@@ -0,0 +1,55 @@
+"""
+검증 완료 & 노션 링크가 없는 질문을 한 번에 노션에 업로드합니다
+(관리자 일괄 업로드 액션과 같은 경로: outbox 항목을 만들어 가져간 뒤 스레드 풀로 업로드하고 bulk_update로 기록)
+실패로 끝난 업로드도 시도 횟수를 초기화해 다시 시도합니다
+
+    python manage.py publish_notion --workers 4
+    python manage.py publish_notion --ids 12 15 20
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from archiver.models import QnALog
+from archiver.tasks import publish_notion_batch, schedule_outbox_retry
+
+
+class Command(BaseCommand):
+    help = "노션에 올라가지 않은 검증된 질문을 스레드 풀로 일괄 업로드합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ids", type=int, nargs="+", help="업로드할 질문 id (없으면 대상 전체)")
+        parser.add_argument("--workers", type=int, default=None, help="동시 업로드 수 (기본 NOTION_POOL_SIZE)")
+        parser.add_argument("--batch-size", type=int, default=None, help="한 번에 가져갈 항목 수 (기본 NOTION_OUTBOX_BATCH_SIZE)")
+
+    def handle(self, *args, **options):
+        rows = QnALog.objects.filter(is_verified=True).filter(
+            Q(notion_page_url__isnull=True) | Q(notion_page_url="")
+        )
+        if options["ids"]:
+            rows = rows.filter(id__in=options["ids"])
+        log_ids = list(rows.order_by("id").values_list("id", flat=True))
+        if not log_ids:
+            self.stdout.write("업로드할 질문이 없습니다")
+            return
+
+        workers = options["workers"] or settings.NOTION_POOL_SIZE
+        self.stdout.write(f"노션 일괄 업로드 시작: {len(log_ids)}건 (동시 {workers}개, 초당 {settings.NOTION_RATE_LIMIT}건 제한)")
+        result = publish_notion_batch(
+            log_ids, batch_size=options["batch_size"], workers=workers, progress=self._progress
+        )
+        self.stdout.write("")
+        schedule_outbox_retry()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"노션 일괄 업로드 완료: 성공 {result['uploaded']}건, 실패 {result['failed']}건, "
+                f"건너뜀 {result['skipped']}건 (다른 워커가 처리 중)"
+            )
+        )
+        if result["failed"]:
+            self.stdout.write(self.style.WARNING("실패한 질문은 outbox 디스패처가 백오프 후 다시 시도합니다"))
+
+    def _progress(self, done, total):
+        self.stdout.write(f"\r진행 {done}/{total}", ending="")
@@ -0,0 +1,39 @@
+"""
+검증된 질문 전체로 임베딩 인덱스를 다시 만듭니다
+(hybrid 모드를 처음 켤 때, 임베딩 백엔드를 바꿨을 때 사용)
+
+    python manage.py rebuild_embedding_index --batch-size 100
+"""
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from archiver.embeddings import get_embedding_backend, get_embedding_index
+from archiver.models import QnALog
+
+
+class Command(BaseCommand):
+    help = "검증된 QnALog 전체로 임베딩 인덱스를 재생성합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="한 번에 임베딩할 질문 수")
+
+    def handle(self, *args, **options):
+        backend = get_embedding_backend()
+        batch_size = options["batch_size"]
+        rows = QnALog.objects.filter(is_verified=True).order_by("id").values_list("id", "question_text")
+
+        ids, chunks, batch = [], [], []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) == batch_size:
+                chunks.append(backend.embed([text for _, text in batch]))
+                ids.extend(log_id for log_id, _ in batch)
+                batch = []
+        if batch:
+            chunks.append(backend.embed([text for _, text in batch]))
+            ids.extend(log_id for log_id, _ in batch)
+
+        vectors = np.vstack(chunks) if chunks else np.empty((0, backend.dim), dtype=np.float32)
+        get_embedding_index().rebuild(ids, vectors)
+        self.stdout.write(self.style.SUCCESS(f"임베딩 인덱스 재생성 완료: {len(ids)}건"))
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 02:15
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0003_remove_category_choices"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="qnalog",
+            name="qna_question_tgrm_idx",
+        ),
+        migrations.AddIndex(
+            model_name="qnalog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                condition=models.Q(("is_verified", True)),
+                fields=["question_text"],
+                name="qna_verified_tgrm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
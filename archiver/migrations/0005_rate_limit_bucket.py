@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0004_verified_trigram_partial_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RateLimitBucket",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("tokens", models.FloatField(verbose_name="남은 토큰")),
+                ("updated_at", models.DateTimeField(verbose_name="마지막 충전 시각")),
+            ],
+            options={
+                "verbose_name": "Rate Limit Bucket",
+                "verbose_name_plural": "API 호출 제한 버킷",
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-18 02:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0005_rate_limit_bucket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InflightQuestion",
+            fields=[
+                (
+                    "fingerprint",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("started_at", models.DateTimeField(verbose_name="처리 시작 시각")),
+            ],
+            options={
+                "verbose_name": "Inflight Question",
+                "verbose_name_plural": "처리 중인 질문",
+            },
+        ),
+        migrations.AddField(
+            model_name="qnalog",
+            name="question_fingerprint",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=64,
+                null=True,
+                verbose_name="질문 지문",
+            ),
+        ),
+    ]
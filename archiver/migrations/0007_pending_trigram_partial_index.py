@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-18 02:24
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0006_question_singleflight"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="qnalog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                condition=models.Q(
+                    ("is_verified", False), ("parent_question__isnull", True)
+                ),
+                fields=["question_text"],
+                name="qna_pending_tgrm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 6.0 on 2026-10-18 02:30
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0007_pending_trigram_partial_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QnAJob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("question_text", models.TextField()),
+                (
+                    "image",
+                    models.ImageField(blank=True, null=True, upload_to="qna_jobs/"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "대기"),
+                            ("running", "처리 중"),
+                            ("done", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        default="queued",
+                        max_length=10,
+                        verbose_name="상태",
+                    ),
+                ),
+                (
+                    "result",
+                    models.JSONField(blank=True, null=True, verbose_name="응답 데이터"),
+                ),
+                (
+                    "error",
+                    models.TextField(
+                        blank=True, default="", verbose_name="오류 메세지"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="생성일"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="수정일"),
+                ),
+                (
+                    "qna_log",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="jobs",
+                        to="archiver.qnalog",
+                        verbose_name="생성된 질문",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "QnA Job",
+                "verbose_name_plural": "QnA 처리 작업",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
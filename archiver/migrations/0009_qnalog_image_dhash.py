@@ -0,0 +1,65 @@
+# Generated by Django 6.0 on 2026-10-18 02:39
+
+import logging
+
+from django.db import migrations, models
+
+from archiver.images import dhash_hex, prepare_image
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+
+def backfill_image_hashes(apps, schema_editor):
+    """
+    이미지가 첨부된 기존 질문의 지각 해시를 채웁니다 (배포 직후부터 같은 스크린샷 재질문을 찾도록)
+    파일이 없거나 읽을 수 없는 이미지는 건너뛰며, 나중에 backfill_image_hashes 명령으로 다시 시도할 수 있음
+    """
+    QnALog = apps.get_model("archiver", "QnALog")
+    rows = (
+        QnALog.objects.filter(image_dhash__isnull=True)
+        .exclude(image="")
+        .exclude(image__isnull=True)
+        .only("id", "image")
+        .order_by("id")
+    )
+    batch, skipped = [], 0
+    for log in rows.iterator(chunk_size=BATCH_SIZE):
+        try:
+            with log.image.open("rb") as f:
+                prepared = prepare_image(f.read())
+        except OSError as e:
+            logger.warning(f"이미지를 열 수 없습니다 ({log.id}): {e}")
+            prepared = None
+        if not prepared:
+            skipped += 1
+            continue
+        log.image_dhash = dhash_hex(prepared.dhash)
+        batch.append(log)
+        if len(batch) == BATCH_SIZE:
+            QnALog.objects.bulk_update(batch, ["image_dhash"])
+            batch = []
+    QnALog.objects.bulk_update(batch, ["image_dhash"])
+    if skipped:
+        logger.warning(
+            f"이미지 해시를 계산하지 못한 질문 {skipped}건 (backfill_image_hashes로 다시 시도)"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0008_qna_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qnalog",
+            name="image_dhash",
+            field=models.CharField(
+                blank=True, max_length=64, null=True, verbose_name="이미지 해시"
+            ),
+        ),
+        migrations.RunPython(backfill_image_hashes, migrations.RunPython.noop),
+    ]
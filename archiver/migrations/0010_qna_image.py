@@ -0,0 +1,66 @@
+# Generated by Django 6.0 on 2026-10-18 02:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0009_qnalog_image_dhash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QnAImage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("image", models.ImageField(upload_to="qna_images/")),
+                (
+                    "position",
+                    models.PositiveSmallIntegerField(default=1, verbose_name="순서"),
+                ),
+                (
+                    "image_dhash",
+                    models.CharField(
+                        blank=True, max_length=64, null=True, verbose_name="이미지 해시"
+                    ),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="extra_images",
+                        to="archiver.qnajob",
+                        verbose_name="작업",
+                    ),
+                ),
+                (
+                    "qna_log",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="extra_images",
+                        to="archiver.qnalog",
+                        verbose_name="질문",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "QnA Image",
+                "verbose_name_plural": "추가 첨부 이미지",
+                "ordering": ["position"],
+            },
+        ),
+    ]
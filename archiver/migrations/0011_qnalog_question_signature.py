@@ -0,0 +1,67 @@
+# Generated by Django 6.0 on 2026-10-18 02:47
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+from archiver.fingerprints import question_signature
+
+BATCH_SIZE = 1000
+
+
+def backfill_signatures(apps, schema_editor):
+    """
+    기존 질문의 서명을 채웁니다 (SIMILARITY_FIELD=question_signature 기본값이 배포 직후부터 기존 질문을 찾도록)
+    정규화 규칙을 바꾼 뒤 다시 계산할 때는 backfill_question_signatures --all 명령을 사용
+    """
+    QnALog = apps.get_model("archiver", "QnALog")
+    rows = QnALog.objects.filter(question_signature="").exclude(question_text="")
+    batch = []
+    for log in (
+        rows.only("id", "question_text").order_by("id").iterator(chunk_size=BATCH_SIZE)
+    ):
+        log.question_signature = question_signature(
+            log.question_text, settings.QUESTION_SIGNATURE_MAX_LENGTH
+        )
+        batch.append(log)
+        if len(batch) == BATCH_SIZE:
+            QnALog.objects.bulk_update(batch, ["question_signature"])
+            batch = []
+    QnALog.objects.bulk_update(batch, ["question_signature"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0010_qna_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qnalog",
+            name="question_signature",
+            field=models.TextField(blank=True, default="", verbose_name="질문 서명"),
+        ),
+        # 인덱스를 만들기 전에 채움 (GIN 인덱스를 행마다 갱신하지 않도록)
+        migrations.RunPython(backfill_signatures, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="qnalog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                condition=models.Q(("is_verified", True)),
+                fields=["question_signature"],
+                name="qna_verified_sig_tgrm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="qnalog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                condition=models.Q(
+                    ("is_verified", False), ("parent_question__isnull", True)
+                ),
+                fields=["question_signature"],
+                name="qna_pending_sig_tgrm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
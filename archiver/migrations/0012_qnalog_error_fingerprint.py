@@ -0,0 +1,57 @@
+# Generated by Django 6.0 on 2026-10-18 02:51
+
+from django.db import migrations, models
+
+from archiver.fingerprints import error_fingerprint
+
+BATCH_SIZE = 1000
+
+
+def backfill_error_fingerprints(apps, schema_editor):
+    """
+    기존 질문의 에러 지문을 채웁니다 (배포 직후부터 같은 에러의 검증된 질문을 바로 찾도록)
+    에러가 없는 질문은 비어 있는 그대로 둠
+    """
+    QnALog = apps.get_model("archiver", "QnALog")
+    rows = QnALog.objects.filter(error_fingerprint__isnull=True).exclude(
+        question_text=""
+    )
+    batch = []
+    for log in (
+        rows.only("id", "question_text").order_by("id").iterator(chunk_size=BATCH_SIZE)
+    ):
+        log.error_fingerprint = error_fingerprint(log.question_text)
+        if log.error_fingerprint is None:
+            continue
+        batch.append(log)
+        if len(batch) == BATCH_SIZE:
+            QnALog.objects.bulk_update(batch, ["error_fingerprint"])
+            batch = []
+    QnALog.objects.bulk_update(batch, ["error_fingerprint"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0011_qnalog_question_signature"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qnalog",
+            name="error_fingerprint",
+            field=models.CharField(
+                blank=True, max_length=64, null=True, verbose_name="에러 지문"
+            ),
+        ),
+        # 인덱스를 만들기 전에 채움
+        migrations.RunPython(backfill_error_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="qnalog",
+            index=models.Index(
+                condition=models.Q(("is_verified", True)),
+                fields=["error_fingerprint"],
+                name="qna_verified_error_fp_idx",
+            ),
+        ),
+    ]
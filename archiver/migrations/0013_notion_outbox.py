@@ -0,0 +1,144 @@
+# Generated by Django 6.0 on 2026-10-18 02:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_notion_sync_state(apps, schema_editor):
+    """업로드된 질문은 done, 업로드를 기다리던 검증된 질문은 outbox에 등록"""
+    QnALog = apps.get_model("archiver", "QnALog")
+    NotionOutbox = apps.get_model("archiver", "NotionOutbox")
+
+    QnALog.objects.exclude(notion_page_url__isnull=True).exclude(
+        notion_page_url=""
+    ).update(notion_sync_state="done")
+    waiting = list(
+        QnALog.objects.filter(is_verified=True, notion_sync_state="").values_list(
+            "id", flat=True
+        )
+    )
+    NotionOutbox.objects.bulk_create(
+        [
+            NotionOutbox(qna_log_id=log_id, idempotency_key=f"qna:{log_id}:create")
+            for log_id in waiting
+        ],
+        ignore_conflicts=True,
+    )
+    QnALog.objects.filter(id__in=waiting).update(notion_sync_state="pending")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0012_qnalog_error_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qnalog",
+            name="notion_sync_state",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("", "대상 아님"),
+                    ("pending", "대기"),
+                    ("in_flight", "업로드 중"),
+                    ("done", "완료"),
+                    ("failed", "실패"),
+                ],
+                default="",
+                max_length=10,
+                verbose_name="노션 동기화 상태",
+            ),
+        ),
+        migrations.CreateModel(
+            name="NotionOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "idempotency_key",
+                    models.CharField(
+                        max_length=100, unique=True, verbose_name="중복 방지 키"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("", "대상 아님"),
+                            ("pending", "대기"),
+                            ("in_flight", "업로드 중"),
+                            ("done", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="상태",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="시도 횟수"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True, default="", verbose_name="마지막 오류"
+                    ),
+                ),
+                (
+                    "available_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="처리 가능 시각"
+                    ),
+                ),
+                (
+                    "claimed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="가져간 시각"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="생성일"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="수정일"),
+                ),
+                (
+                    "qna_log",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notion_outbox",
+                        to="archiver.qnalog",
+                        verbose_name="질문",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Notion Outbox",
+                "verbose_name_plural": "노션 업로드 대기열",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status__in", ["pending", "in_flight"])),
+                        fields=["available_at"],
+                        name="notion_outbox_ready_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_notion_sync_state, migrations.RunPython.noop),
+    ]
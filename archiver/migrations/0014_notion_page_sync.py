@@ -0,0 +1,104 @@
+# Generated by Django 6.0 on 2026-10-18 03:00
+
+import hashlib
+
+from django.db import migrations, models
+
+SYNC_SCHEDULE = "notion-page-sync"
+
+
+def create_sync_schedule(apps, schema_editor):
+    """
+    노션 페이지 주기 동기화 스케줄 등록 (주기는 관리자 화면의 Scheduled tasks에서 변경)
+    이미 올라간 페이지는 생성 이후 바뀐 질문횟수만 한 번 반영하도록 동기화 대상으로 표시
+    (지금 DB 값으로 만든 속성을 보낸 값으로 기록해 두어, 노션에서 고친 이름/답변 등을 덮어쓰지 않음)
+    """
+    Schedule = apps.get_model("django_q", "Schedule")
+    QnALog = apps.get_model("archiver", "QnALog")
+
+    Schedule.objects.update_or_create(
+        name=SYNC_SCHEDULE,
+        defaults={
+            "func": "archiver.tasks.task_sync_notion_pages",
+            "schedule_type": "I",
+            "minutes": 5,
+            "repeats": -1,
+        },
+    )
+    published = QnALog.objects.exclude(notion_page_url__isnull=True).exclude(
+        notion_page_url=""
+    )
+    batch = []
+    for log in published.iterator():
+        log.notion_synced_properties = _synced_properties(log)
+        log.notion_dirty = True
+        batch.append(log)
+    QnALog.objects.bulk_update(
+        batch, ["notion_synced_properties", "notion_dirty"], batch_size=500
+    )
+
+
+def _synced_properties(log):
+    """
+    archiver.adapters.notion_snapshot 에서 질문횟수를 뺀 값 (본문 서명 포함)
+    (마이그레이션은 앱 코드가 바뀌어도 같은 결과를 내야 하므로 이 시점의 규칙을 그대로 옮겨 둠)
+    """
+    properties = {
+        "이름": {"title": [{"text": {"content": (log.title or "질문")[:100]}}]},
+        "질문내용": {
+            "rich_text": [
+                {"text": {"content": (log.question_text or "내용 없음")[:1990]}}
+            ]
+        },
+        "AI답변": {
+            "rich_text": [
+                {"text": {"content": (log.ai_answer or "답변 대기 중")[:1990]}}
+            ]
+        },
+        "카테고리": {"select": {"name": log.category or "General"}},
+    }
+    keywords = [
+        item.strip() for item in (log.keywords or "").split(",") if item.strip()
+    ]
+    if keywords:
+        properties["키워드"] = {"multi_select": [{"name": kw[:50]} for kw in keywords]}
+    body = f"{log.question_text or ''}\0{log.ai_answer or ''}"
+    properties["_body"] = hashlib.blake2b(body.encode(), digest_size=16).hexdigest()
+    return properties
+
+
+def delete_sync_schedule(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.filter(name=SYNC_SCHEDULE).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0013_notion_outbox"),
+        ("django_q", "0019_alter_task_options_alter_ormq_key_alter_ormq_lock_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qnalog",
+            name="notion_dirty",
+            field=models.BooleanField(default=False, verbose_name="노션 동기화 필요"),
+        ),
+        migrations.AddField(
+            model_name="qnalog",
+            name="notion_synced_properties",
+            field=models.JSONField(
+                blank=True, default=dict, verbose_name="노션 반영 속성"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="qnalog",
+            index=models.Index(
+                condition=models.Q(("notion_dirty", True)),
+                fields=["id"],
+                name="qna_notion_dirty_idx",
+            ),
+        ),
+        migrations.RunPython(create_sync_schedule, delete_sync_schedule),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 6.0 on 2026-10-18 03:05
+
+import re
+
+from django.db import migrations, models
+
+REVERSE_SYNC_SCHEDULE = "notion-reverse-sync"
+
+
+def backfill_page_ids(apps, schema_editor):
+    """업로드된 질문의 노션 페이지 id를 URL에서 채우고 역동기화 스케줄을 등록"""
+    QnALog = apps.get_model("archiver", "QnALog")
+    Schedule = apps.get_model("django_q", "Schedule")
+
+    logs, seen = [], set()
+    for log in (
+        QnALog.objects.exclude(notion_page_url__isnull=True)
+        .only("id", "notion_page_url")
+        .order_by("id")
+    ):
+        match = re.search(r"([0-9a-fA-F]{32})/?(?:[?#].*)?$", log.notion_page_url)
+        # 같은 페이지를 가리키는 행이 여럿이면 먼저 만든 행에만 채움 (unique)
+        if match and match.group(1).lower() not in seen:
+            log.notion_page_id = match.group(1).lower()
+            seen.add(log.notion_page_id)
+            logs.append(log)
+    QnALog.objects.bulk_update(logs, ["notion_page_id"], batch_size=1000)
+
+    Schedule.objects.update_or_create(
+        name=REVERSE_SYNC_SCHEDULE,
+        defaults={
+            "func": "archiver.tasks.task_pull_notion_edits",
+            "schedule_type": "I",
+            "minutes": 5,
+            "repeats": -1,
+        },
+    )
+
+
+def delete_reverse_sync_schedule(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.filter(name=REVERSE_SYNC_SCHEDULE).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0014_notion_page_sync"),
+        ("django_q", "0019_alter_task_options_alter_ormq_key_alter_ormq_lock_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotionSyncCursor",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                (
+                    "last_edited_time",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="마지막으로 반영한 수정 시각",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="수정일"),
+                ),
+            ],
+            options={
+                "verbose_name": "Notion Sync Cursor",
+                "verbose_name_plural": "노션 역동기화 기준점",
+            },
+        ),
+        migrations.AddField(
+            model_name="qnalog",
+            name="notion_page_id",
+            field=models.CharField(
+                blank=True,
+                max_length=32,
+                null=True,
+                unique=True,
+                verbose_name="노션 페이지 id",
+            ),
+        ),
+        migrations.RunPython(backfill_page_ids, delete_reverse_sync_schedule),
+    ]
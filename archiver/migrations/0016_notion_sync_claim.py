@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 03:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("archiver", "0015_notion_reverse_sync"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qnalog",
+            name="notion_sync_claimed_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="노션 동기화 시작 시각"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="qnalog",
+            index=models.Index(
+                condition=models.Q(("notion_sync_claimed_at__isnull", False)),
+                fields=["notion_sync_claimed_at"],
+                name="qna_notion_sync_claim_idx",
+            ),
+        ),
+    ]
@@ -1,7 +1,26 @@
+import uuid
+
+from django.conf import settings
 from django.contrib.postgres.indexes import GinIndex
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 from django_q.tasks import async_task
 
+from .fingerprints import error_fingerprint, question_signature
+
+
+class NotionSyncState(models.TextChoices):
+    """질문별 노션 업로드 상태 (QnALog.notion_sync_state, NotionOutbox.status)"""
+
+    NONE = "", "대상 아님"
+    PENDING = "pending", "대기"
+    IN_FLIGHT = "in_flight", "업로드 중"
+    DONE = "done", "완료"
+    FAILED = "failed", "실패"
+
 
 class QnALog(models.Model):
     category = models.CharField(
@@ -29,9 +48,37 @@ class QnALog(models.Model):
     notion_page_url = models.URLField(
         max_length=500, null=True, blank=True, verbose_name="노션 페이지 링크"
     )
+    # 노션 페이지 id (URL 끝 32자리) - 노션에서 수정된 페이지를 질문으로 되찾을 때 사용 (tasks.task_pull_notion_edits)
+    notion_page_id = models.CharField(
+        max_length=32, null=True, blank=True, unique=True, verbose_name="노션 페이지 id"
+    )
     keywords = models.TextField(
          blank=True, null=True, verbose_name="세부 키워드"
     )
+    # 노션 업로드 진행 상태 (NotionOutbox 항목 상태를 목록/필터용으로 옮겨 둔 값)
+    notion_sync_state = models.CharField(
+        max_length=10,
+        choices=NotionSyncState.choices,
+        blank=True,
+        default=NotionSyncState.NONE,
+        verbose_name="노션 동기화 상태",
+    )
+    # 노션에 올라간 뒤 노션에 보이는 필드(NOTION_FIELDS)가 바뀌었는지 - 주기 동기화(tasks.task_sync_notion_pages) 대상
+    notion_dirty = models.BooleanField(default=False, verbose_name="노션 동기화 필요")
+    # 마지막으로 노션 페이지에 반영한 속성 값 - 이 값과 다른 속성만 PATCH
+    notion_synced_properties = models.JSONField(default=dict, blank=True, verbose_name="노션 반영 속성")
+    # 주기 동기화가 가져간 시각 - 끝나면 비우고, NOTION_SYNC_CLAIM_TIMEOUT이 지나도록 남아 있으면 다시 가져감
+    notion_sync_claimed_at = models.DateTimeField(null=True, blank=True, verbose_name="노션 동기화 시작 시각")
+    # 정규화한 질문(+이미지)의 sha256 - 동일 질문 동시 처리 합치기에 사용 (archiver.fingerprints)
+    question_fingerprint = models.CharField(
+        max_length=64, null=True, blank=True, db_index=True, verbose_name="질문 지문"
+    )
+    # 경로/줄 번호/시각 등을 지우고 길이를 제한한 정규화 질문 - trigram 유사도 검색 대상 (archiver.fingerprints)
+    question_signature = models.TextField(blank=True, default="", verbose_name="질문 서명")
+    # 붙여넣은 에러의 지문 (예외 타입 + 메시지 + 안쪽 프레임) - 같은 에러는 유사도 계산 없이 바로 찾음
+    error_fingerprint = models.CharField(max_length=64, null=True, blank=True, verbose_name="에러 지문")
+    # 첨부 이미지의 256비트 dHash (16진수) - 같은 스크린샷 재질문 검색에 사용 (archiver.image_index)
+    image_dhash = models.CharField(max_length=64, null=True, blank=True, verbose_name="이미지 해시")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
 
@@ -41,21 +88,316 @@ class QnALog(models.Model):
         ordering = ["-created_at"]
 
         indexes = [
+            # 유사도 검색은 검증된 질문만 대상으로 하므로 부분 인덱스로 유지
+            GinIndex(
+                fields=["question_text"],
+                name="qna_verified_tgrm_idx",
+                opclasses=["gin_trgm_ops"],
+                condition=Q(is_verified=True),
+            ),
+            # 검토 대기 중인 원본 질문 (동일 질문에 저장된 답변을 재사용하기 위함)
             GinIndex(
                 fields=["question_text"],
-                name="qna_question_tgrm_idx",
+                name="qna_pending_tgrm_idx",
                 opclasses=["gin_trgm_ops"],
+                condition=Q(is_verified=False, parent_question__isnull=True),
+            ),
+            # 검증된 질문의 에러 지문 동등 비교 (유사도 검색 전에 조회)
+            models.Index(
+                fields=["error_fingerprint"],
+                name="qna_verified_error_fp_idx",
+                condition=Q(is_verified=True),
+            ),
+            # SIMILARITY_FIELD=question_signature일 때 사용하는 서명 인덱스 (위 두 인덱스와 같은 조건)
+            GinIndex(
+                fields=["question_signature"],
+                name="qna_verified_sig_tgrm_idx",
+                opclasses=["gin_trgm_ops"],
+                condition=Q(is_verified=True),
+            ),
+            GinIndex(
+                fields=["question_signature"],
+                name="qna_pending_sig_tgrm_idx",
+                opclasses=["gin_trgm_ops"],
+                condition=Q(is_verified=False, parent_question__isnull=True),
+            ),
+            # 노션 주기 동기화가 바뀐 질문만 조회
+            models.Index(
+                fields=["id"],
+                name="qna_notion_dirty_idx",
+                condition=Q(notion_dirty=True),
+            ),
+            # 끝나지 않은(워커가 죽었을 수 있는) 주기 동기화 조회
+            models.Index(
+                fields=["notion_sync_claimed_at"],
+                name="qna_notion_sync_claim_idx",
+                condition=Q(notion_sync_claimed_at__isnull=False),
             ),
         ]
 
+    # 노션 페이지 속성으로 보이는 필드 (adapters.NotionAdapter.build_properties)
+    NOTION_FIELDS = ("title", "question_text", "ai_answer", "category", "keywords", "hit_count")
+
     def __str__(self):
         return f"[{self.category}] {self.title} (빈도: {self.hit_count})"
 
-    # 검증되고 노션 url이 없는 경우에만 워커 호출
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._embedding_state = instance._current_embedding_state()
+        instance._notion_state = instance._current_notion_state()
+        return instance
+
+    def _current_embedding_state(self):
+        # 임베딩 인덱스에 영향을 주는 필드 (deferred 필드는 비교하지 않음)
+        return (self.__dict__.get("is_verified"), self.__dict__.get("question_text"))
+
+    def _current_notion_state(self):
+        return tuple(self.__dict__.get(field) for field in self.NOTION_FIELDS)
+
+    # 검증되고 노션 url이 없는 경우에만 노션 업로드 예약 (outbox, 같은 트랜잭션에서 기록)
     def save(self, *args, **kwargs):
-        if self.is_verified and not self.notion_page_url:
-            super().save(*args, **kwargs)
-            async_task("archiver.tasks.task_process_question", self.id)
+        # 질문 내용을 저장할 때만 서명/에러 지문을 다시 계산 (hit_count 등만 저장하는 경우 제외)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "question_text" in update_fields:
+            self.question_signature = question_signature(self.question_text, settings.QUESTION_SIGNATURE_MAX_LENGTH)
+            self.error_fingerprint = error_fingerprint(self.question_text)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "question_signature", "error_fingerprint"}
+        self._mark_notion_dirty_if_changed(kwargs)
+        if self.is_verified and not self.notion_page_url and self.notion_sync_state == NotionSyncState.NONE:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                self.enqueue_notion_upload()
         else:
             super().save(*args, **kwargs)
+        self._sync_embedding_if_changed()
+
+    def _mark_notion_dirty_if_changed(self, save_kwargs):
+        """
+        노션에 올라간 질문의 노션에 보이는 필드가 읽어온 값과 달라졌으면 notion_dirty를 켭니다
+        (어떤 속성을 보낼지는 동기화할 때 notion_synced_properties와 비교해 정함)
+        """
+        state = self._current_notion_state()
+        previous = getattr(self, "_notion_state", None)
+        self._notion_state = state
+        if self._state.adding or not self.notion_page_url or state == previous:
+            return
+        self.notion_dirty = True
+        if save_kwargs.get("update_fields") is not None:
+            save_kwargs["update_fields"] = {*save_kwargs["update_fields"], "notion_dirty"}
+
+    def enqueue_notion_upload(self) -> bool:
+        """
+        노션 업로드를 outbox에 기록합니다 (호출한 쪽의 트랜잭션과 함께 커밋/롤백)
+        idempotency_key가 유일하므로 몇 번을 저장하거나 동시에 호출해도 업로드는 한 번만 예약되며,
+        커밋된 뒤에 디스패처 태스크를 등록합니다 (새로 예약했으면 True)
+        """
+        with transaction.atomic():
+            entry, created = NotionOutbox.objects.get_or_create(
+                idempotency_key=NotionOutbox.upload_key(self.pk), defaults={"qna_log": self}
+            )
+            # 예약 전에 읽어 둔 인스턴스를 저장한 경우에도 상태는 outbox 항목을 따름
+            if self.notion_sync_state != entry.status:
+                QnALog.objects.filter(pk=self.pk).update(notion_sync_state=entry.status)
+                self.notion_sync_state = entry.status
+        if created:
+            transaction.on_commit(dispatch_notion_outbox)
+        return created
+
+    def _sync_embedding_if_changed(self):
+        """
+        검증 상태나 질문 내용이 바뀐 경우에만 임베딩 갱신을 워커에 맡깁니다
+        (hit_count 갱신 등 다른 저장에서는 다시 계산하지 않음)
+        """
+        state = self._current_embedding_state()
+        previous = getattr(self, "_embedding_state", (False, None))
+        self._embedding_state = state
+        if settings.SIMILARITY_MODE != "hybrid" or state == previous:
+            return
+        if state[0] or previous[0]:
+            async_task("archiver.tasks.task_sync_embedding", self.id)
+
+
+@receiver(post_delete, sender=QnALog)
+def remove_embedding_on_delete(sender, instance, **kwargs):
+    """삭제된 질문은 임베딩 인덱스에서도 제거"""
+    if settings.SIMILARITY_MODE == "hybrid" and instance.__dict__.get("is_verified"):
+        async_task("archiver.tasks.task_sync_embedding", instance.id)
+
+
+class NotionOutbox(models.Model):
+    """
+    노션 업로드 outbox
+    질문 저장과 같은 트랜잭션에서 기록하고, 커밋 후 디스패처(tasks.task_drain_notion_outbox)가
+    SELECT ... FOR UPDATE SKIP LOCKED로 꺼내 처리하므로 워커가 여러 개여도 한 항목은 한 번만 업로드됩니다
+    """
+
+    qna_log = models.ForeignKey(
+        QnALog, on_delete=models.CASCADE, related_name="notion_outbox", verbose_name="질문"
+    )
+    idempotency_key = models.CharField(max_length=100, unique=True, verbose_name="중복 방지 키")
+    status = models.CharField(
+        max_length=10, choices=NotionSyncState.choices, default=NotionSyncState.PENDING, verbose_name="상태"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="시도 횟수")
+    last_error = models.TextField(blank=True, default="", verbose_name="마지막 오류")
+    # 재시도 대기: 이 시각 이후에 다시 처리
+    available_at = models.DateTimeField(default=timezone.now, verbose_name="처리 가능 시각")
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name="가져간 시각")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
+
+    class Meta:
+        verbose_name = "Notion Outbox"
+        verbose_name_plural = "노션 업로드 대기열"
+        ordering = ["id"]
+        indexes = [
+            # 디스패처가 처리할 차례가 된 항목만 조회
+            models.Index(
+                fields=["available_at"],
+                name="notion_outbox_ready_idx",
+                condition=Q(status__in=["pending", "in_flight"]),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.idempotency_key} ({self.status})"
+
+    @staticmethod
+    def upload_key(log_id: int) -> str:
+        return f"qna:{log_id}:create"
+
+
+def dispatch_notion_outbox():
+    """커밋된 outbox 항목을 처리하도록 디스패처 태스크를 워커 대기열에 등록합니다"""
+    async_task("archiver.tasks.task_drain_notion_outbox")
+
 
+class QnAJob(models.Model):
+    """
+    job 모드로 접수된 질문
+    웹 요청은 작업만 저장하고 202로 바로 응답하며, Gemini 호출은 Django-Q 워커가 수행합니다
+    봇은 상태 조회 API(qna/jobs/<id>/)로 결과를 받아갑니다
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "대기"
+        RUNNING = "running", "처리 중"
+        DONE = "done", "완료"
+        FAILED = "failed", "실패"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    question_text = models.TextField()
+    image = models.ImageField(upload_to="qna_jobs/", null=True, blank=True)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED, verbose_name="상태"
+    )
+    result = models.JSONField(null=True, blank=True, verbose_name="응답 데이터")
+    error = models.TextField(blank=True, default="", verbose_name="오류 메세지")
+    qna_log = models.ForeignKey(
+        QnALog,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs",
+        verbose_name="생성된 질문",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
+
+    class Meta:
+        verbose_name = "QnA Job"
+        verbose_name_plural = "QnA 처리 작업"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.id} ({self.status})"
+
+
+class QnAImage(models.Model):
+    """
+    질문에 함께 첨부된 추가 이미지 (첫 번째 이미지는 QnALog.image / QnAJob.image에 저장)
+    job 모드로 접수된 이미지는 job에, 처리된 질문의 이미지는 qna_log에 연결됩니다
+    """
+
+    qna_log = models.ForeignKey(
+        QnALog,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="extra_images",
+        verbose_name="질문",
+    )
+    job = models.ForeignKey(
+        QnAJob,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="extra_images",
+        verbose_name="작업",
+    )
+    image = models.ImageField(upload_to="qna_images/")
+    position = models.PositiveSmallIntegerField(default=1, verbose_name="순서")
+    image_dhash = models.CharField(max_length=64, null=True, blank=True, verbose_name="이미지 해시")
+
+    class Meta:
+        verbose_name = "QnA Image"
+        verbose_name_plural = "추가 첨부 이미지"
+        ordering = ["position"]
+
+    def __str__(self):
+        return f"{self.image.name} ({self.position})"
+
+
+class InflightQuestion(models.Model):
+    """
+    Gemini 응답을 기다리는 중인 질문 표시 (archiver.singleflight)
+    같은 지문의 질문이 동시에 들어오면 이 행을 먼저 만든 요청만 Gemini를 호출합니다
+    """
+
+    fingerprint = models.CharField(max_length=64, primary_key=True)
+    started_at = models.DateTimeField(verbose_name="처리 시작 시각")
+
+    class Meta:
+        verbose_name = "Inflight Question"
+        verbose_name_plural = "처리 중인 질문"
+
+    def __str__(self):
+        return f"{self.fingerprint[:12]} ({self.started_at})"
+
+
+class NotionSyncCursor(models.Model):
+    """
+    노션 → DB 역동기화의 기준점 (tasks.task_pull_notion_edits)
+    지금까지 반영한 페이지 중 가장 늦은 last_edited_time을 저장해 두고 그 이후에 수정된 페이지만 조회합니다
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    last_edited_time = models.DateTimeField(null=True, blank=True, verbose_name="마지막으로 반영한 수정 시각")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
+
+    class Meta:
+        verbose_name = "Notion Sync Cursor"
+        verbose_name_plural = "노션 역동기화 기준점"
+
+    def __str__(self):
+        return f"{self.name} ({self.last_edited_time})"
+
+
+class RateLimitBucket(models.Model):
+    """
+    여러 워커 프로세스가 공유하는 토큰 버킷 (외부 API 호출 속도 제한용)
+    행 잠금(select_for_update)으로 갱신하므로 별도 서비스 없이 Postgres만으로 동작합니다
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    tokens = models.FloatField(verbose_name="남은 토큰")
+    updated_at = models.DateTimeField(verbose_name="마지막 충전 시각")
+
+    class Meta:
+        verbose_name = "Rate Limit Bucket"
+        verbose_name_plural = "API 호출 제한 버킷"
+
+    def __str__(self):
+        return f"{self.name} ({self.tokens:.2f})"
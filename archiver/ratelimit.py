@@ -0,0 +1,45 @@
+"""
+Postgres 기반 토큰 버킷
+
+Django-Q 워커 여러 개가 같은 외부 API(노션 등)를 호출할 때 전체 호출 속도를 맞추기 위해 사용합니다
+버킷 행을 select_for_update로 잠근 채 충전/차감하므로 프로세스가 몇 개든 한 버킷을 공유합니다
+"""
+
+import logging
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+
+def reserve_token(name: str, rate: float, capacity: int) -> float:
+    """
+    토큰 하나를 예약하고, 호출 전에 기다려야 하는 시간(초)을 반환합니다
+    토큰이 부족하면 잔량을 음수로 남겨 두어 뒤에 온 요청일수록 더 오래 기다리게 합니다
+    (대기는 트랜잭션 밖에서 하므로 행 잠금은 짧게 유지됨)
+    """
+    with transaction.atomic():
+        bucket, created = RateLimitBucket.objects.select_for_update().get_or_create(
+            name=name, defaults={"tokens": capacity, "updated_at": timezone.now()}
+        )
+        # 시각은 잠금을 얻은 뒤에 읽음 (잠금을 기다리는 동안 다른 워커가 더 늦은 시각으로 충전했을 수 있음)
+        # 워커 간 시계 차이로 updated_at이 더 늦어도 버킷의 시각이 거꾸로 가지 않게 함
+        now = max(timezone.now(), bucket.updated_at)
+        elapsed = (now - bucket.updated_at).total_seconds()
+        bucket.tokens = min(float(capacity), bucket.tokens + elapsed * rate) - 1
+        bucket.updated_at = now
+        bucket.save(update_fields=["tokens", "updated_at"])
+    return max(0.0, -bucket.tokens / rate)
+
+
+def acquire_token(name: str, rate: float, capacity: int) -> float:
+    """토큰을 얻을 때까지 대기합니다 (대기한 시간 반환)"""
+    wait = reserve_token(name, rate, capacity)
+    if wait > 0:
+        logger.debug(f"[{name}] 호출 제한으로 {wait:.2f}초 대기")
+        time.sleep(wait)
+    return wait
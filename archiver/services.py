@@ -1,13 +1,30 @@
+import asyncio
 import logging
+import threading
+from datetime import timedelta
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.postgres.search import TrigramSimilarity
 from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+from django_q.tasks import async_task
 
-from .adapters import GeminiAdapter, NotionAdapter
-from .models import QnALog
-from common.exceptions import AIResponseParsingError, DatabaseOperationError, ValidationError
-from typing import Optional
-from .adapters import qna_model_to_response_dto
+from .adapters import GeminiAdapter
+from .db import ensure_similarity_threshold
+from .embeddings import search_similar
+from .fingerprints import error_fingerprint, question_fingerprint, question_signature
+from .hitcounter import record_hit
+from .image_index import get_image_index
+from .images import PreparedImage, aprepare_image, dhash_hex, prepare_image
+from .singleflight import ajoin_or_lead, join_or_lead, release
+from . import speculation as speculative
+from .speculation import Speculation
+from .models import QnAImage, QnAJob, QnALog
+from common.exceptions import AIResponseParsingError, DatabaseOperationError, LLMServiceError, ValidationError
+from typing import List, Optional, Sequence
+from .adapters import create_qna_dto_from_ai_response, qna_model_to_response_dto
 
 logger = logging.getLogger(__name__)
 
@@ -16,36 +33,203 @@ class QnAService:
 
     def __init__(self):
         self.gemini = GeminiAdapter()
-        self.notion = NotionAdapter()
 
-    def check_similarity(self, question_text: str, threshold=0.6):
+    def check_similarity(self, question_text: str, threshold=None, images: Sequence[UploadedFile] = ()):
         """
         PostgreSQL의 pg_trgm을 사용하여 기존 질문들과 유사도 비교
+        붙여넣은 에러가 있으면 먼저 검증된 질문의 에러 지문과 동등 비교하고(인덱스 조회 한 번),
+        이미지가 있으면 검증된 질문의 스크린샷과 지각 해시로 비교합니다
         """
         logger.debug("============== PostgreSQL 유사도 체크 시작 ==============")
 
-        # 1. TrigramSimilarity를 사용하여 유사도 계산 및 필터링
+        error_match = self._error_match(question_text)
+        if error_match:
+            return self._found(error_match)
 
-        similar_log = (
-            QnALog.objects.annotate(
-                similarity=TrigramSimilarity("question_text", question_text)
-            )
-            .filter(is_verified=True, similarity__gt=threshold)
-            .order_by("-similarity")
-            .first()
-        )
+        image_match = self._image_match(self._prepare_uploads(images))
+        if image_match:
+            return self._found(image_match)
+        if not question_text:
+            # 글 없이 스크린샷만 올린 질문은 이미지 해시로만 비교
+            return {'status': 'not_found', 'data': None}
+
+        threshold = threshold if threshold is not None else settings.SIMILARITY_THRESHOLD
+        ensure_similarity_threshold(threshold)
+        similar_log = self._similar_queryset(question_text, threshold).first()
+        if not similar_log and settings.SIMILARITY_MODE == "hybrid":
+            similar_log = self._semantic_match(question_text)
+
+        if not similar_log:
+            # 아직 검토 전인 최근 질문과 같으면 저장된 AI 답변을 재사용 (Gemini 재호출 방지)
+            pending_log = self._pending_queryset(question_text, threshold).first()
+            if pending_log:
+                return self._duplicate_result(pending_log, question_text)
+            return {
+                'status': 'not_found',
+                'data': None
+            }
+
+        return self._found(similar_log)
+
+    async def acheck_similarity(self, question_text: str, threshold=None, images: Sequence[UploadedFile] = ()):
+        """
+        check_similarity의 비동기 버전 (async ORM 사용)
+        """
+        error_match = await self._error_match_queryset(question_text).afirst()
+        if error_match:
+            return await sync_to_async(self._found)(error_match)
 
+        image_match = await sync_to_async(self._image_match)(await self._aprepare_uploads(images))
+        if image_match:
+            return await sync_to_async(self._found)(image_match)
+        if not question_text:
+            return {'status': 'not_found', 'data': None}
+
+        threshold = threshold if threshold is not None else settings.SIMILARITY_THRESHOLD
+        await sync_to_async(ensure_similarity_threshold)(threshold)
+        similar_log = await self._similar_queryset(question_text, threshold).afirst()
+        if not similar_log and settings.SIMILARITY_MODE == "hybrid":
+            similar_log = await sync_to_async(self._semantic_match)(question_text)
 
         if not similar_log:
+            pending_log = await self._pending_queryset(question_text, threshold).afirst()
+            if pending_log:
+                return await sync_to_async(self._duplicate_result)(pending_log, question_text)
             return {
                 'status': 'not_found',
                 'data': None
             }
 
-        similar_log.hit_count += 1
-        similar_log.save(update_fields=["hit_count"])
+        return await sync_to_async(self._found)(similar_log)
+
+    @staticmethod
+    def _ensure_question(question_text: str, images: Sequence[UploadedFile]) -> None:
+        # 글 없이 스크린샷만 올린 질문도 받음 (이미지 해시로 같은 스크린샷의 검증된 질문을 찾음)
+        if not question_text and not images:
+            raise ValidationError("질문을 입력해주세요")
+
+    def _found(self, similar_log: QnALog) -> dict:
+        record_hit(similar_log.id)
+        similar_log.hit_count += 1  # 응답에 반영할 값 (DB는 원자적으로 증가)
         logger.info(f" 유사 질문 발견 (검토 대기중): {similar_log.id}")
 
+        return self._similar_found_result(similar_log)
+
+    @staticmethod
+    def _error_match_queryset(question_text: str):
+        # 에러 지문이 없는 질문은 조회하지 않음 (부분 B-tree 인덱스 qna_verified_error_fp_idx 사용)
+        fingerprint = error_fingerprint(question_text)
+        if not fingerprint:
+            return QnALog.objects.none()
+        return QnALog.objects.filter(error_fingerprint=fingerprint, is_verified=True).order_by("-hit_count")
+
+    def _error_match(self, question_text: str) -> Optional[QnALog]:
+        """같은 에러(예외 타입 + 메시지 + 안쪽 프레임)를 붙여넣은 검증된 질문을 찾습니다"""
+        log = self._error_match_queryset(question_text).first()
+        if log:
+            logger.info(f"같은 에러의 질문 발견: {log.id}")
+        return log
+
+    def _image_match(self, prepared_images: List[PreparedImage]) -> Optional[QnALog]:
+        """
+        지각 해시가 가까운 스크린샷이 첨부된 검증된 질문을 찾습니다 (여러 장이면 가장 가까운 것)
+        인덱스는 주기적으로만 갱신되므로 검증 상태는 DB에서 한 번 더 확인합니다
+        """
+        index = get_image_index()
+        candidates = sorted(hit for prepared in prepared_images for hit in index.search(prepared.dhash))
+        if not candidates:
+            return None
+        logs = QnALog.objects.filter(pk__in=[log_id for _, log_id in candidates], is_verified=True).in_bulk()
+        for distance, log_id in candidates:
+            if log_id in logs:
+                logger.info(f"같은 스크린샷의 질문 발견: {log_id} (distance={distance})")
+                return logs[log_id]
+        return None
+
+    @staticmethod
+    def _similarity_target(question_text: str):
+        """
+        trigram으로 비교할 컬럼과 값 (SIMILARITY_FIELD)
+        서명은 traceback의 경로/줄 번호 등을 지우고 길이를 제한하므로 긴 질문도 비교 비용이 일정합니다
+        """
+        if settings.SIMILARITY_FIELD == "question_text":
+            return "question_text", question_text
+        return "question_signature", question_signature(question_text, settings.QUESTION_SIGNATURE_MAX_LENGTH)
+
+    def _similar_queryset(self, question_text: str, threshold):
+        # % 연산자(trigram_similar)는 세션의 pg_trgm.similarity_threshold를 기준으로
+        # 부분 GIN 인덱스(qna_verified_sig_tgrm_idx / qna_verified_tgrm_idx)를 사용해 후보만 추리고,
+        # 유사도 계산/정렬은 후보에 대해서만 수행합니다
+        field, value = self._similarity_target(question_text)
+        return (
+            QnALog.objects.filter(is_verified=True, **{f"{field}__trigram_similar": value})
+            .annotate(similarity=TrigramSimilarity(field, value))
+            .filter(similarity__gt=threshold)
+            .order_by("-similarity")
+        )
+
+    def _pending_queryset(self, question_text: str, threshold):
+        # 검토 대기 중인 최근 원본 질문 (부분 GIN 인덱스 qna_pending_sig_tgrm_idx / qna_pending_tgrm_idx 사용)
+        since = timezone.now() - timedelta(days=settings.DUPLICATE_LOOKBACK_DAYS)
+        field, value = self._similarity_target(question_text)
+        return (
+            QnALog.objects.filter(
+                is_verified=False,
+                parent_question__isnull=True,
+                created_at__gte=since,
+                **{f"{field}__trigram_similar": value},
+            )
+            .exclude(ai_answer="")
+            .annotate(similarity=TrigramSimilarity(field, value))
+            .filter(similarity__gt=threshold)
+            .order_by("-similarity")
+        )
+
+    def _duplicate_result(self, pending_log: QnALog, question_text: str) -> dict:
+        """
+        검토 대기 중인 질문의 답변을 돌려주고, 새 질문은 하위 질문으로 연결해 기록합니다
+        (관리자가 원본 질문을 검증하면 함께 들어온 질문들을 확인할 수 있음)
+        """
+        QnALog.objects.create(
+            question_text=question_text,
+            title=pending_log.title,
+            ai_answer=pending_log.ai_answer,
+            category=pending_log.category,
+            keywords=pending_log.keywords,
+            parent_question=pending_log,
+            question_fingerprint=question_fingerprint(question_text),
+        )
+        record_hit(pending_log.id)
+        pending_log.hit_count += 1
+        logger.info(f" 검토 대기중인 동일 질문 발견: {pending_log.id}")
+
+        response_data = qna_model_to_response_dto(pending_log).model_dump()
+        response_data["status"] = "duplicate"
+        return {
+            'status': 'duplicate',
+            'data': response_data
+        }
+
+    def _semantic_match(self, question_text: str) -> Optional[QnALog]:
+        """
+        임베딩 인덱스에서 의미가 가까운 검증된 질문을 찾습니다 (표현만 다른 질문 대응)
+        인덱스는 워커가 갱신하므로 검증 상태는 DB에서 한 번 더 확인합니다
+        """
+        try:
+            candidates = search_similar(question_text)
+        except Exception as e:
+            logger.warning(f"임베딩 검색 실패, trigram 결과만 사용합니다: {e}")
+            return None
+        if not candidates:
+            return None
+        logs = QnALog.objects.filter(pk__in=[log_id for log_id, _ in candidates], is_verified=True).in_bulk()
+        for log_id, score in candidates:
+            if log_id in logs:
+                logger.info(f"임베딩 유사 질문 발견: {log_id} (score={score:.3f})")
+                return logs[log_id]
+        return None
+
+    def _similar_found_result(self, similar_log: QnALog) -> dict:
         # DTO 변환
         response_dto = qna_model_to_response_dto(similar_log)
         response_data = response_dto.model_dump()
@@ -58,38 +242,203 @@ class QnAService:
             'data': response_data
         }
 
-    def process_question_flow(self, question_text: str, image: Optional[UploadedFile] = None) -> QnALog:
+    def submit_job(self, question_text: str, images: Sequence[UploadedFile] = ()) -> QnAJob:
+        """
+        job 모드: 질문을 작업으로 저장하고 처리를 워커 대기열에 등록합니다 (Gemini 응답을 기다리지 않음)
+        작업 저장과 태스크 등록은 한 트랜잭션으로 커밋됩니다
+        """
+        self._ensure_question(question_text, images)
+        first, *extra = images or [None]
+        with transaction.atomic():
+            job = QnAJob.objects.create(question_text=question_text, image=first)
+            QnAImage.objects.bulk_create(
+                QnAImage(job=job, image=image, position=position) for position, image in enumerate(extra, start=1)
+            )
+            async_task("archiver.tasks.task_run_qna_job", str(job.id))
+        logger.info(f"질문 작업 대기열 등록: {job.id}")
+        return job
+
+    def _prepare_upload(self, image: Optional[UploadedFile]) -> Optional[PreparedImage]:
+        """
+        업로드 이미지를 전처리합니다 (축소/재인코딩/해시, images.prepare_image)
+        한 요청에서 유사도 검사/추측 호출/질문 처리가 모두 사용하므로 결과를 업로드 객체에 보관하고,
+        원본은 모델 저장에 그대로 사용하므로 읽은 뒤 위치를 되돌림
+        """
+        if not image:
+            return None
+        if not hasattr(image, "_prepared_image"):
+            # 업로드 파일(메모리 또는 임시 파일)을 바이트로 복사하지 않고 PIL이 직접 읽음
+            image._prepared_image = prepare_image(image)
+            image.seek(0)
+        return image._prepared_image
+
+    async def _aprepare_upload(self, image: Optional[UploadedFile]) -> Optional[PreparedImage]:
+        if not image:
+            return None
+        if not hasattr(image, "_prepared_image"):
+            image._prepared_image = await aprepare_image(image)
+            image.seek(0)
+        return image._prepared_image
+
+    def _prepare_uploads(self, images: Sequence[UploadedFile]) -> List[PreparedImage]:
+        """전처리에 성공한 이미지만 순서대로 (읽을 수 없는 이미지는 제외)"""
+        return [p for p in (self._prepare_upload(image) for image in images) if p]
+
+    async def _aprepare_uploads(self, images: Sequence[UploadedFile]) -> List[PreparedImage]:
+        prepared = await asyncio.gather(*(self._aprepare_upload(image) for image in images))
+        return [p for p in prepared if p]
+
+    def _read_images(self, images: Sequence[UploadedFile]) -> List[bytes]:
+        """Gemini 전송용으로 전처리한 이미지 바이트 목록"""
+        return [prepared.data for prepared in self._prepare_uploads(images)]
+
+    async def _aread_images(self, images: Sequence[UploadedFile]) -> List[bytes]:
+        return [prepared.data for prepared in await self._aprepare_uploads(images)]
+
+    def start_speculation(self, question_text: str, images: Sequence[UploadedFile] = ()) -> Optional[Speculation]:
+        """
+        SPECULATIVE_DISPATCH 정책에 따라 유사 질문 검색과 동시에 Gemini 호출을 시작합니다
+        검색에서 답을 찾으면 discard(), 새 질문이면 process_question_flow(speculation=...)로 결과를 사용합니다
+        """
+        if not (question_text or images) or speculative.policy() == "off":
+            return None
+        image_data = self._read_images(images)
+        fingerprint = question_fingerprint(question_text, image_data)
+        if not speculative.should_speculate(fingerprint, error_fingerprint(question_text)):
+            return None
+        return speculative.start(self.gemini.generate_answer, question_text, image_data)
+
+    async def astart_speculation(self, question_text: str, images: Sequence[UploadedFile] = ()) -> Optional[Speculation]:
+        """start_speculation의 비동기 버전 (Gemini 호출은 이벤트 루프의 태스크로 실행)"""
+        if not (question_text or images) or speculative.policy() == "off":
+            return None
+        image_data = await self._aread_images(images)
+        fingerprint = question_fingerprint(question_text, image_data)
+        if not await sync_to_async(speculative.should_speculate)(fingerprint, error_fingerprint(question_text)):
+            return None
+        return speculative.astart(self.gemini.agenerate_answer(question_text, image_data))
+
+    def process_question_flow(
+        self, question_text: str, images: Sequence[UploadedFile] = (), speculation: Optional[Speculation] = None
+    ) -> QnALog:
         """
         이미 생성된 log_obj를 받아서 AI 분석 결과로 업데이트
+        speculation이 있으면 미리 시작해 둔 Gemini 호출 결과를 사용합니다
         """
+        if speculation:
+            speculation.mark_checked()
         try:
-            if not question_text:
-                raise ValidationError("질문을 입력해주세요")
+            self._ensure_question(question_text, images)
 
-            image_data = None
-            if image:
-                image_data = image.read()
+            image_data = self._read_images(images)
 
-            dto = self.gemini.generate_answer(question_text, image_data)
+            # 같은 질문이 이미 처리 중이면 Gemini를 다시 호출하지 않고 그 결과를 기다림
+            fingerprint = question_fingerprint(question_text, image_data)
+            existing, is_leader = join_or_lead(fingerprint)
+            if existing:
+                if speculation:
+                    speculation.discard()
+                return self._reuse_inflight_result(existing)
 
+            try:
+                if speculation:
+                    dto = speculation.result()
+                else:
+                    dto = self.gemini.generate_answer(question_text, image_data)
+
+                log_obj = self._save_new_question(question_text, dto, images, fingerprint)
+            finally:
+                if is_leader:
+                    release(fingerprint)
 
+            return log_obj
 
+        except (AttributeError, TypeError, IndexError) as e:
+            logger.error(f"신규 질문 처리중 에러 발생 {e}")
+            if 'log_obj' in locals():
+                log_obj.title = "AI 응답 파싱 실패"
+                log_obj.save()
+            raise AIResponseParsingError("AI 응답 형식(키워드, 제목)이 형식에 맞지않습니다")
+        except AIResponseParsingError:
+            raise
+        except ValidationError:
+            raise
+        except LLMServiceError:
+            raise
+        except Exception as e:
+            logger.error(f"데이터베이스 저장 중 오류 발생: {e}", exc_info=True)
+            raise DatabaseOperationError("결과를 데이터베이스에 저장하는 중 문제가 발생했습니다")
+
+    def _reuse_inflight_result(self, log_obj: QnALog) -> QnALog:
+        """동시에 들어온 같은 질문: 먼저 처리한 요청의 결과를 그대로 돌려주고 빈도만 올림"""
+        record_hit(log_obj.id)
+        log_obj.hit_count += 1
+        logger.info(f"동일 질문 처리 결과 재사용: {log_obj.id}")
+        return log_obj
+
+    def _save_new_question(
+        self, question_text: str, dto, images: Sequence[UploadedFile] = (), fingerprint: Optional[str] = None
+    ) -> QnALog:
+        """
+        신규 질문을 저장하고 노션 업로드를 outbox에 기록합니다
+        질문 저장과 업로드 예약이 한 트랜잭션으로 커밋되고, 커밋 후 디스패처가 워커에서 업로드합니다
+        (노션 API 지연/장애가 봇 응답에 영향을 주지 않음)
+        """
+        first, *extra = images or [None]
+        with transaction.atomic():
             log_obj = QnALog.objects.create(
                 question_text=question_text,
                 title=dto.title,
                 ai_answer=dto.ai_answer,
                 category=dto.category,
                 keywords=dto.keywords,
-                image=image,
+                image=first,
+                question_fingerprint=fingerprint,
+                image_dhash=self._image_dhash(first),
+            )
+            QnAImage.objects.bulk_create(
+                QnAImage(qna_log=log_obj, image=image, position=position, image_dhash=self._image_dhash(image))
+                for position, image in enumerate(extra, start=1)
             )
+            log_obj.enqueue_notion_upload()
+        logger.info(f"노션 업로드 대기열 등록: {log_obj.id}")
+        return log_obj
+
+    def _image_dhash(self, image: Optional[UploadedFile]) -> Optional[str]:
+        prepared = self._prepare_upload(image)
+        return dhash_hex(prepared.dhash) if prepared else None
+
+    async def aprocess_question_flow(
+        self, question_text: str, images: Sequence[UploadedFile] = (), speculation: Optional[Speculation] = None
+    ) -> QnALog:
+        """
+        process_question_flow의 비동기 버전
+        Gemini 호출은 async SDK로, DB 저장은 async ORM으로 처리합니다
+        """
+        if speculation:
+            speculation.mark_checked()
+        try:
+            self._ensure_question(question_text, images)
+
+            image_data = await self._aread_images(images)
+
+            fingerprint = question_fingerprint(question_text, image_data)
+            existing, is_leader = await ajoin_or_lead(fingerprint)
+            if existing:
+                if speculation:
+                    speculation.discard()
+                return await sync_to_async(self._reuse_inflight_result)(existing)
 
             try:
-                notion_page_url = self.notion.create_qna_page(log_obj)
-                log_obj.notion_page_url = notion_page_url
-                log_obj.save(update_fields=["notion_page_url"])
-                logger.info(f"Notion 아카이빙 성공: {log_obj.id}, URL: {notion_page_url}")
-            except Exception as e:
-                logger.error(f"Notion 저장 실패 ID: {log_obj.id}: {e}", exc_info=True)
+                if speculation:
+                    dto = await speculation.aresult()
+                else:
+                    dto = await self.gemini.agenerate_answer(question_text, image_data)
+
+                log_obj = await sync_to_async(self._save_new_question)(question_text, dto, images, fingerprint)
+            finally:
+                if is_leader:
+                    await sync_to_async(release)(fingerprint)
 
             return log_obj
 
@@ -97,14 +446,69 @@ class QnAService:
             logger.error(f"신규 질문 처리중 에러 발생 {e}")
             if 'log_obj' in locals():
                 log_obj.title = "AI 응답 파싱 실패"
-                log_obj.save()
+                await log_obj.asave()
             raise AIResponseParsingError("AI 응답 형식(키워드, 제목)이 형식에 맞지않습니다")
         except AIResponseParsingError:
             raise
         except ValidationError:
             raise
+        except LLMServiceError:
+            raise
         except Exception as e:
             logger.error(f"데이터베이스 저장 중 오류 발생: {e}", exc_info=True)
             raise DatabaseOperationError("결과를 데이터베이스에 저장하는 중 문제가 발생했습니다")
 
+    async def astream_question_flow(self, question_text: str, images: Sequence[UploadedFile] = ()):
+        """
+        aprocess_question_flow의 스트리밍 버전
+        ("chunk", 텍스트 조각)을 Gemini가 생성하는 대로 yield하고,
+        전체 응답을 파싱/저장한 뒤 마지막에 ("result", QnALog)를 yield합니다
+        """
+        self._ensure_question(question_text, images)
+
+        image_data = await self._aread_images(images)
+        fingerprint = question_fingerprint(question_text, image_data)
+        existing, is_leader = await ajoin_or_lead(fingerprint)
+        if existing:
+            yield "result", await sync_to_async(self._reuse_inflight_result)(existing)
+            return
+
+        try:
+            parts = []
+            async for text in self.gemini.astream_answer(question_text, image_data):
+                parts.append(text)
+                yield "chunk", text
+
+            try:
+                dto = create_qna_dto_from_ai_response(question_text=question_text, ai_raw_text="".join(parts))
+            except (AttributeError, TypeError, IndexError) as e:
+                logger.error(f"신규 질문 처리중 에러 발생 {e}")
+                raise AIResponseParsingError("AI 응답 형식(키워드, 제목)이 형식에 맞지않습니다")
+
+            try:
+                log_obj = await sync_to_async(self._save_new_question)(question_text, dto, images, fingerprint)
+            except Exception as e:
+                logger.error(f"데이터베이스 저장 중 오류 발생: {e}", exc_info=True)
+                raise DatabaseOperationError("결과를 데이터베이스에 저장하는 중 문제가 발생했습니다")
+        finally:
+            if is_leader:
+                await sync_to_async(release)(fingerprint)
+
+        yield "result", log_obj
+
+
+_qna_service = None
+_qna_service_lock = threading.Lock()
+
 
+def get_qna_service() -> QnAService:
+    """
+    프로세스 공용 QnAService를 반환합니다 (처음 호출될 때 생성)
+    서비스와 어댑터는 요청별 상태를 갖지 않으므로 스레드/비동기 요청이 함께 사용해도 안전합니다
+    """
+    global _qna_service
+    if _qna_service is None:
+        with _qna_service_lock:
+            if _qna_service is None:
+                _qna_service = QnAService()
+    return _qna_service
@@ -0,0 +1,100 @@
+"""
+동일 질문 동시 처리 합치기 (singleflight)
+
+같은 질문이 거의 동시에 여러 번 들어오면 가장 먼저 표시(InflightQuestion 행)를 남긴 요청만
+Gemini를 호출하고(리더), 나머지는 리더가 저장한 QnALog를 기다렸다가 그대로 사용합니다(팔로워)
+표시는 Postgres 행이므로 gunicorn 워커/호스트가 달라도 동작하며,
+짧은 INSERT/DELETE만 사용하므로 Gemini 응답을 기다리는 동안 DB 잠금을 잡고 있지 않습니다
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import InflightQuestion, QnALog
+
+logger = logging.getLogger(__name__)
+
+# 팔로워가 리더의 결과를 확인하는 간격(초)
+POLL_INTERVAL = 0.2
+
+
+def claim(fingerprint: str) -> bool:
+    """
+    지문에 대한 리더 표시를 남깁니다 (성공하면 True)
+    리더가 비정상 종료되어 SINGLEFLIGHT_TIMEOUT보다 오래된 표시는 넘겨받습니다
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.SINGLEFLIGHT_TIMEOUT)
+    if InflightQuestion.objects.filter(pk=fingerprint, started_at__lt=stale_before).update(started_at=now):
+        logger.warning(f"응답 없는 리더의 질문 처리를 넘겨받음: {fingerprint[:12]}")
+        return True
+    _, created = InflightQuestion.objects.get_or_create(fingerprint=fingerprint, defaults={"started_at": now})
+    return created
+
+
+def release(fingerprint: str):
+    """리더 표시를 제거합니다 (이미 없으면 무시)"""
+    InflightQuestion.objects.filter(pk=fingerprint).delete()
+
+
+def recent_result(fingerprint: str) -> Optional[QnALog]:
+    """SINGLEFLIGHT_REUSE_WINDOW 안에 같은 지문으로 저장된 질문"""
+    since = timezone.now() - timedelta(seconds=settings.SINGLEFLIGHT_REUSE_WINDOW)
+    return (
+        QnALog.objects.filter(
+            question_fingerprint=fingerprint, parent_question__isnull=True, created_at__gte=since
+        )
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def _try_join(fingerprint: str) -> Tuple[Optional[QnALog], bool]:
+    """(이미 처리된 결과, 리더 여부) - 둘 다 없으면 다른 요청이 처리 중"""
+    log = recent_result(fingerprint)
+    if log:
+        return log, False
+    if not claim(fingerprint):
+        return None, False
+    # 확인과 표시 사이에 다른 리더가 끝냈을 수 있으므로 한 번 더 확인
+    log = recent_result(fingerprint)
+    if log:
+        release(fingerprint)
+        return log, False
+    return None, True
+
+
+def join_or_lead(fingerprint: str) -> Tuple[Optional[QnALog], bool]:
+    """
+    리더가 되면 (None, True), 다른 요청의 결과를 얻으면 (QnALog, False)를 반환합니다
+    SINGLEFLIGHT_TIMEOUT 동안 결과가 없으면 (None, False): 합치지 않고 직접 처리
+    """
+    deadline = time.monotonic() + settings.SINGLEFLIGHT_TIMEOUT
+    while True:
+        log, is_leader = _try_join(fingerprint)
+        if log or is_leader:
+            return log, is_leader
+        if time.monotonic() >= deadline:
+            logger.warning(f"동일 질문 대기 시간 초과, 직접 처리합니다: {fingerprint[:12]}")
+            return None, False
+        time.sleep(POLL_INTERVAL)
+
+
+async def ajoin_or_lead(fingerprint: str) -> Tuple[Optional[QnALog], bool]:
+    """join_or_lead의 비동기 버전 (대기 중에도 이벤트 루프를 막지 않음)"""
+    deadline = time.monotonic() + settings.SINGLEFLIGHT_TIMEOUT
+    while True:
+        log, is_leader = await sync_to_async(_try_join)(fingerprint)
+        if log or is_leader:
+            return log, is_leader
+        if time.monotonic() >= deadline:
+            logger.warning(f"동일 질문 대기 시간 초과, 직접 처리합니다: {fingerprint[:12]}")
+            return None, False
+        await asyncio.sleep(POLL_INTERVAL)
@@ -0,0 +1,201 @@
+"""
+추측(speculative) Gemini 호출
+
+유사 질문 검색과 동시에 Gemini 호출을 먼저 시작해 두고,
+검색에서 기존 답변을 찾으면 아직 시작하지 않은 호출(동기 경로의 대기 중인 스레드 작업)은 취소하고,
+이미 보낸 호출은 끝까지 두고 결과만 버립니다
+새 질문이면 DB 검색 시간만큼 응답이 빨라지고, 기존 질문이면 호출 한 번이 낭비됩니다
+(끝까지 간 낭비된 호출의 응답은 Gemini 응답 캐시에 저장되므로 같은 질문이 다시 오면 재사용됨)
+
+SPECULATIVE_DISPATCH
+  off               사용하지 않음
+  always            항상 동시에 시작
+  fingerprint_miss  같은 지문의 질문이 저장되어 있거나 처리 중이 아니고, 같은 에러의 검증된 질문도 없을 때만 시작
+                    (지문 인덱스 조회)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+
+from .models import InflightQuestion, QnALog
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("off", "always", "fingerprint_miss")
+
+
+class SpeculationStats:
+    """프로세스별 추측 호출 집계 (SPECULATIVE_STATS_LOG_EVERY건마다 로그로 남김)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = 0
+            self.used = 0
+            self.wasted = 0
+            self.saved_seconds = 0.0
+
+    def record_started(self):
+        with self._lock:
+            self.started += 1
+
+    def record_used(self, saved_seconds: float):
+        with self._lock:
+            self.used += 1
+            self.saved_seconds += saved_seconds
+        self._maybe_log()
+
+    def record_wasted(self):
+        with self._lock:
+            self.wasted += 1
+        self._maybe_log()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "used": self.used,
+                "wasted": self.wasted,
+                "saved_ms_total": self.saved_seconds * 1000,
+                "saved_ms_avg": self.saved_seconds * 1000 / self.used if self.used else 0.0,
+            }
+
+    def _maybe_log(self):
+        every = settings.SPECULATIVE_STATS_LOG_EVERY
+        snapshot = self.snapshot()
+        if every and (snapshot["used"] + snapshot["wasted"]) % every == 0:
+            logger.info(
+                f"추측 호출 통계: 사용 {snapshot['used']} / 낭비 {snapshot['wasted']} "
+                f"(평균 단축 {snapshot['saved_ms_avg']:.0f}ms)"
+            )
+
+
+stats = SpeculationStats()
+
+# 버린 비동기 호출 (이벤트 루프는 태스크를 약한 참조로만 들고 있어 끝나기 전에 GC되지 않도록 보관)
+_discarded_tasks = set()
+
+
+class Speculation:
+    """
+    진행 중인 추측 호출 하나
+    future는 concurrent.futures.Future(동기 경로) 또는 asyncio.Task(비동기 경로)
+    """
+
+    def __init__(self, future):
+        self.future = future
+        self.started_at = time.perf_counter()
+        self.checked_at = None
+        self.finished_at = None
+        self._settled = False
+        future.add_done_callback(self._on_done)
+        stats.record_started()
+
+    def _on_done(self, future):
+        self.finished_at = time.perf_counter()
+        # 버려진 호출의 예외가 "never retrieved" 경고로 남지 않도록 회수
+        if not future.cancelled():
+            future.exception()
+
+    def mark_checked(self):
+        """유사 질문 검색이 끝난 시점을 기록합니다 (단축 시간 계산용)"""
+        if self.checked_at is None:
+            self.checked_at = time.perf_counter()
+
+    def saved_seconds(self) -> float:
+        # 순차 처리 대비 단축 시간 = 검색과 Gemini 호출이 겹친 구간
+        if self.checked_at is None or self.finished_at is None:
+            return 0.0
+        return max(0.0, min(self.checked_at, self.finished_at) - self.started_at)
+
+    def result(self):
+        """동기 경로: Gemini 결과를 기다려 반환합니다 (호출 중 발생한 예외는 그대로 전달)"""
+        try:
+            return self.future.result()
+        finally:
+            self._settle_used()
+
+    async def aresult(self):
+        try:
+            return await self.future
+        finally:
+            self._settle_used()
+
+    def discard(self):
+        """기존 답변을 찾아 필요 없어진 호출의 결과를 버립니다 (시작 전인 스레드 작업만 취소)"""
+        if self._settled:
+            return
+        self._settled = True
+        if isinstance(self.future, asyncio.Future):
+            # 태스크는 이미 요청을 보내는 중이므로 취소하지 않고 끝까지 두어 응답이 캐시에 남게 함
+            _discarded_tasks.add(self.future)
+            self.future.add_done_callback(_discarded_tasks.discard)
+        else:
+            self.future.cancel()
+        stats.record_wasted()
+
+    def _settle_used(self):
+        if not self._settled:
+            self._settled = True
+            stats.record_used(self.saved_seconds())
+
+
+def policy() -> str:
+    value = settings.SPECULATIVE_DISPATCH
+    if value not in POLICIES:
+        logger.warning(f"알 수 없는 SPECULATIVE_DISPATCH 값: {value} (off로 처리)")
+        return "off"
+    return value
+
+
+def should_speculate(fingerprint: str, error_fingerprint: Optional[str] = None) -> bool:
+    """정책에 따라 이 질문에 추측 호출을 시작할지 결정합니다"""
+    current = policy()
+    if current == "always":
+        return True
+    if current == "fingerprint_miss":
+        # 같은 질문이 이미 있으면 검색에서 찾을 가능성이 높고, 처리 중이면 singleflight가 결과를 공유함
+        return not (
+            QnALog.objects.filter(question_fingerprint=fingerprint).exists()
+            or InflightQuestion.objects.filter(pk=fingerprint).exists()
+            # 에러 지문이 같은 검증된 질문은 check_similarity가 바로 찾음
+            or bool(
+                error_fingerprint
+                and QnALog.objects.filter(error_fingerprint=error_fingerprint, is_verified=True).exists()
+            )
+        )
+    return False
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.SPECULATIVE_MAX_WORKERS, thread_name_prefix="gemini-speculation"
+                )
+    return _executor
+
+
+def start(fn, *args) -> Speculation:
+    """동기 경로: 백그라운드 스레드에서 fn(*args)를 시작합니다"""
+    return Speculation(_get_executor().submit(fn, *args))
+
+
+def astart(coro) -> Speculation:
+    """비동기 경로: 현재 이벤트 루프에서 코루틴을 태스크로 시작합니다"""
+    return Speculation(asyncio.ensure_future(coro))
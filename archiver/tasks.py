@@ -1,8 +1,43 @@
 import logging
-from .adapters import NotionAdapter, qna_model_to_create_dto
-from .models import QnALog
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_q.models import Schedule
+from django_q.tasks import async_task
+
+from common.exceptions import BaseProjectError
+from .adapters import (
+    NOTION_BODY_KEY,
+    NOTION_EDITABLE_PROPERTIES,
+    NotionAdapter,
+    build_notion_blocks,
+    build_notion_properties,
+    changed_properties,
+    notion_body_signature,
+    notion_edits,
+    notion_page_id,
+    notion_property_value,
+    notion_snapshot,
+    qna_model_to_create_dto,
+    qna_model_to_response_dto,
+)
+from .embeddings import get_embedding_backend, get_embedding_index
+from .models import NotionOutbox, NotionSyncCursor, NotionSyncState, QnAJob, QnALog
 logger = logging.getLogger(__name__)
 
+NOTION_RETRY_SCHEDULE = "notion-outbox-retry"
+# 0014 마이그레이션에서 등록하는 노션 페이지 주기 동기화 스케줄
+NOTION_SYNC_SCHEDULE = "notion-page-sync"
+# 0015 마이그레이션에서 등록하는 노션 → DB 역동기화 스케줄과 기준점 이름
+NOTION_REVERSE_SYNC_SCHEDULE = "notion-reverse-sync"
+NOTION_REVERSE_SYNC_CURSOR = "qna-database"
+
 
 def task_process_question(log_id):
     """
@@ -12,17 +47,17 @@ def task_process_question(log_id):
     try:
         # DB에서 가져오기
         log = QnALog.objects.get(id=log_id)
-        create_dto = qna_model_to_create_dto(log)
-
-
-        # adapter 호출
-        adapter = NotionAdapter()
-        notion_url = adapter.create_qna_page(create_dto)
+        if log.notion_page_url:
+            # 이미 업로드된 질문 (outbox 디스패처가 먼저 처리한 경우 등)
+            return
 
         # 결과 저장
+        notion_url = upload_to_notion(log)
         if notion_url:
             log.notion_page_url = notion_url
-            log.save(update_fields=["notion_page_url"])
+            log.notion_page_id = notion_page_id(notion_url)
+            log.notion_sync_state = NotionSyncState.DONE
+            log.save(update_fields=["notion_page_url", "notion_page_id", "notion_sync_state"])
             logger.info(f"[worker] 노션 업로드 완료 (ID: {log.id})")
     except QnALog.DoesNotExist:
         logger.error(f"[worker] 해당 ID의 로그를 찾을 수 없음 (ID: {log_id})")
@@ -33,4 +68,500 @@ def task_process_question(log_id):
         raise e
 
 
+def upload_to_notion(log: QnALog) -> str:
+    """노션 페이지를 만들고 URL을 반환합니다"""
+    create_dto = qna_model_to_create_dto(log)
+    adapter = NotionAdapter()
+    return adapter.create_qna_page(create_dto)
+
+
+def task_drain_notion_outbox():
+    """
+    worker 비동기 태스크 (노션 outbox 디스패처)
+    처리할 차례가 된 outbox 항목을 NOTION_OUTBOX_BATCH_SIZE개씩 가져가(FOR UPDATE SKIP LOCKED) 업로드합니다
+    디스패처가 동시에 여러 개 실행되어도 같은 항목을 나눠 갖지 않으며, 처리한 항목 수를 반환합니다
+    NOTION_TASK_TIME_BUDGET이 지나면 멈추고 남은 항목은 새 디스패처 태스크가 이어서 처리합니다
+    """
+    deadline = time.monotonic() + settings.NOTION_TASK_TIME_BUDGET
+    processed = 0
+    while time.monotonic() < deadline:
+        entries = claim_outbox_entries(settings.NOTION_OUTBOX_BATCH_SIZE)
+        if not entries:
+            break
+        publish_outbox_batch(entries)
+        processed += len(entries)
+    else:
+        # 시간이 다 되어 멈춤 (워커 timeout에 걸리면 가져간 항목이 CLAIM_TIMEOUT까지 묶임)
+        async_task("archiver.tasks.task_drain_notion_outbox")
+    schedule_outbox_retry()
+    return processed
+
+
+def task_publish_notion_batch(log_ids, workers=None):
+    """
+    worker 비동기 태스크 (관리자 일괄 업로드)
+    선택한 검증된 질문들을 업로드하고 결과 집계를 반환합니다
+    NOTION_TASK_TIME_BUDGET 안에 끝내지 못한 질문은 같은 태스크를 새로 등록해 이어서 업로드합니다
+    """
+    deadline = time.monotonic() + settings.NOTION_TASK_TIME_BUDGET
+    result = publish_notion_batch(log_ids, workers=workers, progress=_log_progress, deadline=deadline)
+    if result["remaining"]:
+        async_task("archiver.tasks.task_publish_notion_batch", result["remaining"], workers)
+        logger.info(f"[worker] 노션 일괄 업로드 나머지 {len(result['remaining'])}건은 다음 작업에서 이어서 처리")
+    schedule_outbox_retry()
+    logger.info(
+        f"[worker] 노션 일괄 업로드 완료: 성공 {result['uploaded']}건, 실패 {result['failed']}건, "
+        f"건너뜀 {result['skipped']}건"
+    )
+    return result
+
+
+def _log_progress(done: int, total: int):
+    if done == total or done % 10 == 0:
+        logger.info(f"[worker] 노션 일괄 업로드 진행: {done}/{total}")
+
+
+def publish_notion_batch(log_ids, batch_size=None, workers=None, progress=None, deadline=None) -> dict:
+    """
+    검증된 질문들의 outbox 항목을 만들거나(실패한 항목은 다시 대기) 바로 가져가 업로드합니다
+    progress(처리한 수, 전체 수)로 진행 상황을 알리며, 다른 디스패처가 처리 중인 항목은 건너뜀
+    deadline(time.monotonic 기준)이 지나면 새 묶음을 가져가지 않고, 손대지 않은 질문 id를 remaining으로 돌려줍니다
+    """
+    total = ensure_outbox_entries(log_ids)
+    result = {"total": total, "uploaded": 0, "failed": 0, "skipped": 0, "remaining": []}
+    done, claimed_ids = 0, set()
+
+    def batch_progress(batch_done, batch_total):
+        if progress:
+            progress(done + batch_done, total)
+
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            result["remaining"] = [log_id for log_id in log_ids if log_id not in claimed_ids]
+            break
+        entries = claim_outbox_entries(batch_size or settings.NOTION_OUTBOX_BATCH_SIZE, log_ids=log_ids)
+        if not entries:
+            break
+        uploaded, failed = publish_outbox_batch(entries, workers=workers, progress=batch_progress)
+        result["uploaded"] += uploaded
+        result["failed"] += failed
+        done += len(entries)
+        claimed_ids.update(entry.qna_log_id for entry in entries)
+    result["skipped"] = max(0, total - done - len(result["remaining"]))
+    return result
+
+
+def ensure_outbox_entries(log_ids) -> int:
+    """
+    아직 업로드되지 않은 검증된 질문에 outbox 항목을 만들고, 실패로 끝난 항목은 시도 횟수를 초기화해 다시 대기시킵니다
+    바로 처리할 수 있는 항목 수를 반환합니다 (in_flight 항목은 그대로 둠)
+    """
+    ids = list(
+        QnALog.objects.filter(id__in=log_ids, is_verified=True)
+        .filter(Q(notion_page_url__isnull=True) | Q(notion_page_url=""))
+        .values_list("id", flat=True)
+    )
+    now = timezone.now()
+    with transaction.atomic():
+        NotionOutbox.objects.bulk_create(
+            [NotionOutbox(qna_log_id=log_id, idempotency_key=NotionOutbox.upload_key(log_id)) for log_id in ids],
+            ignore_conflicts=True,
+        )
+        waiting = NotionOutbox.objects.filter(
+            qna_log_id__in=ids, status__in=[NotionSyncState.PENDING, NotionSyncState.FAILED]
+        )
+        count = waiting.update(status=NotionSyncState.PENDING, attempts=0, available_at=now, updated_at=now)
+        QnALog.objects.filter(id__in=ids, notion_outbox__status=NotionSyncState.PENDING).update(
+            notion_sync_state=NotionSyncState.PENDING
+        )
+    return count
+
+
+def claim_outbox_entries(limit: int, log_ids=None) -> list:
+    """
+    대기 중인 항목(또는 NOTION_OUTBOX_CLAIM_TIMEOUT이 지나도록 끝나지 않은 항목)을 가져가 in_flight로 표시합니다
+    잠금은 이 짧은 트랜잭션 동안만 유지하고, 노션 호출은 트랜잭션 밖에서 합니다
+    log_ids를 주면 해당 질문의 항목만 가져갑니다
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.NOTION_OUTBOX_CLAIM_TIMEOUT)
+    queryset = NotionOutbox.objects.filter(
+        Q(status=NotionSyncState.PENDING, available_at__lte=now)
+        | Q(status=NotionSyncState.IN_FLIGHT, claimed_at__lt=stale)
+    )
+    if log_ids is not None:
+        queryset = queryset.filter(qna_log_id__in=log_ids)
+    with transaction.atomic():
+        entries = list(
+            queryset.select_for_update(skip_locked=True, of=("self",))
+            .select_related("qna_log")
+            .order_by("available_at", "id")[:limit]
+        )
+        ids = [entry.id for entry in entries]
+        if ids:
+            NotionOutbox.objects.filter(id__in=ids).update(
+                status=NotionSyncState.IN_FLIGHT, claimed_at=now, attempts=F("attempts") + 1, updated_at=now
+            )
+            QnALog.objects.filter(notion_outbox__id__in=ids).update(notion_sync_state=NotionSyncState.IN_FLIGHT)
+    for entry in entries:
+        entry.attempts += 1
+    return entries
+
+
+def publish_outbox_batch(entries, workers=None, progress=None) -> tuple:
+    """
+    가져간 outbox 항목들을 크기가 정해진 스레드 풀(NOTION_POOL_SIZE)로 나눠 업로드합니다
+    모든 스레드가 같은 어댑터(keep-alive 세션)와 공용 토큰 버킷을 쓰므로 전체 호출 속도는 NOTION_RATE_LIMIT를 넘지 않습니다
+    한 건이 실패해도 나머지는 계속 처리하고, 결과는 bulk_update로 한 번에 기록합니다 (성공 수, 실패 수 반환)
+    이미 URL이 있는 질문은 호출하지 않고 완료로 처리하며, 실패하면 지수 백오프 후 다시 대기(최대 NOTION_OUTBOX_MAX_ATTEMPTS회)
+    """
+    pending = [entry for entry in entries if not entry.qna_log.notion_page_url]
+    errors = {}
+    if pending:
+        try:
+            adapter = NotionAdapter()
+        except Exception as e:
+            errors = {entry.id: e for entry in pending}
+        else:
+            urls, failures = _run_in_pool(
+                lambda log: adapter.create_qna_page(qna_model_to_create_dto(log)),
+                [entry.qna_log for entry in pending],
+                workers or settings.NOTION_POOL_SIZE,
+                progress,
+            )
+            for index, url in urls.items():
+                log = pending[index].qna_log
+                log.notion_page_url = url
+                log.notion_page_id = notion_page_id(url)
+                # 생성할 때 보낸 속성과 본문 (이후 주기 동기화는 이 값과 달라진 것만 보냄)
+                log.notion_synced_properties = notion_snapshot(qna_model_to_create_dto(log))
+            errors = {pending[index].id: e for index, e in failures.items()}
+
+    now = timezone.now()
+    uploaded_logs, retry_ids, failed_ids = [], [], []
+    for entry in entries:
+        log = entry.qna_log
+        error = errors.get(entry.id)
+        entry.updated_at = now
+        if error is None:
+            entry.status, entry.last_error = NotionSyncState.DONE, ""
+            log.notion_sync_state = NotionSyncState.DONE
+            uploaded_logs.append(log)
+            continue
+        if entry.attempts >= settings.NOTION_OUTBOX_MAX_ATTEMPTS:
+            entry.status = NotionSyncState.FAILED
+            failed_ids.append(log.id)
+        else:
+            entry.status = NotionSyncState.PENDING
+            retry_ids.append(log.id)
+        entry.last_error = str(error)[:1000]
+        entry.available_at = now + timedelta(
+            seconds=settings.NOTION_OUTBOX_RETRY_DELAY * 2 ** (entry.attempts - 1)
+        )
+        logger.error(f"[worker] 노션 업로드 실패 (ID: {log.id}, {entry.attempts}회째, {entry.status}): {error}")
+
+    with transaction.atomic():
+        # save()를 거치지 않으므로 outbox 예약/임베딩 동기화가 다시 일어나지 않음
+        QnALog.objects.bulk_update(
+            uploaded_logs, ["notion_page_url", "notion_page_id", "notion_sync_state", "notion_synced_properties"]
+        )
+        QnALog.objects.filter(id__in=retry_ids).update(notion_sync_state=NotionSyncState.PENDING)
+        QnALog.objects.filter(id__in=failed_ids).update(notion_sync_state=NotionSyncState.FAILED)
+        NotionOutbox.objects.bulk_update(entries, ["status", "last_error", "available_at", "updated_at"])
+
+    for log in uploaded_logs:
+        logger.info(f"[worker] 노션 업로드 완료 (ID: {log.id})")
+    return len(uploaded_logs), len(errors)
+
+
+def _run_in_pool(fn, items, workers: int, progress=None) -> tuple:
+    """
+    items마다 fn(item)을 크기가 정해진 스레드 풀에서 실행합니다
+    ({순번: 결과}, {순번: 예외})를 반환하며, 한 건의 예외는 다른 건에 영향을 주지 않습니다
+    """
+
+    def call(item):
+        try:
+            return fn(item)
+        finally:
+            # 토큰 버킷 조회로 열린 스레드의 DB 연결을 정리
+            connection.close()
+
+    results, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="notion-pool") as pool:
+        futures = {pool.submit(call, item): index for index, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                errors[index] = e
+            if progress:
+                progress(done, len(futures))
+    return results, errors
+
+
+def task_sync_notion_pages():
+    """
+    worker 주기 태스크 (notion-page-sync 스케줄)
+    노션에 올라간 뒤 바뀐 질문(notion_dirty)만 가져와, 마지막으로 반영한 속성과 달라진 속성만 페이지당 PATCH 한 번으로 보냅니다
+    주기 사이에 여러 번 바뀐 값(질문횟수 등)은 마지막 값 하나로 합쳐지며, 갱신한 페이지 수를 반환합니다
+    NOTION_TASK_TIME_BUDGET이 지나면 새 묶음을 가져가지 않으며, 남은 질문은 다음 주기에 이어서 보냅니다
+    """
+    deadline = time.monotonic() + settings.NOTION_TASK_TIME_BUDGET
+    updated, failed_ids = 0, []
+    while time.monotonic() < deadline:
+        logs = claim_dirty_pages(settings.NOTION_SYNC_BATCH_SIZE)
+        if not logs:
+            break
+        batch_updated, batch_failed = sync_notion_pages(logs)
+        updated += batch_updated
+        failed_ids += batch_failed
+        QnALog.objects.filter(id__in=[log.id for log in logs if log.id not in batch_failed]).update(
+            notion_sync_claimed_at=None
+        )
+    if failed_ids:
+        # 이번 실행에서 반복하지 않도록 끝난 뒤에 다시 표시 (다음 주기에 재시도)
+        QnALog.objects.filter(id__in=failed_ids).update(notion_dirty=True, notion_sync_claimed_at=None)
+    return updated
+
+
+def claim_dirty_pages(limit: int) -> list:
+    """
+    바뀐 질문(또는 NOTION_SYNC_CLAIM_TIMEOUT이 지나도록 끝나지 않은 동기화)을 가져가면서 notion_dirty를 끄고 시작 시각을 기록합니다
+    (FOR UPDATE SKIP LOCKED) 동기화하는 동안 다시 바뀌면 플래그가 다시 켜져 다음 주기에 반영되며,
+    PATCH 전에 워커가 죽어도 시작 시각이 남아 있으므로 시간이 지나면 다시 가져갑니다
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.NOTION_SYNC_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        logs = list(
+            QnALog.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(notion_dirty=True, notion_sync_claimed_at__isnull=True) | Q(notion_sync_claimed_at__lt=stale)
+            )
+            .exclude(Q(notion_page_url__isnull=True) | Q(notion_page_url=""))
+            .only("id", "notion_page_url", "notion_synced_properties", *QnALog.NOTION_FIELDS)
+            .order_by("id")[:limit]
+        )
+        if logs:
+            QnALog.objects.filter(id__in=[log.id for log in logs]).update(
+                notion_dirty=False, notion_sync_claimed_at=now
+            )
+    return logs
+
+
+def sync_notion_pages(logs, workers=None) -> tuple:
+    """
+    질문별로 달라진 속성만 PATCH하고, 질문/답변 원문이 바뀐 페이지는 본문도 다시 씁니다
+    반영한 상태는 bulk_update로 기록하며 (갱신한 페이지 수, 실패한 질문 id 목록)을 반환합니다
+    """
+    changes = []
+    for log in logs:
+        dto = qna_model_to_create_dto(log)
+        synced = log.notion_synced_properties or {}
+        current = notion_snapshot(dto)
+        changed = changed_properties(build_notion_properties(dto), synced)
+        # 본문은 답변 전체가 들어 있는 유일한 사본이라 속성과 따로 비교 (속성에는 앞부분만 들어감)
+        body = build_notion_blocks(dto) if synced.get(NOTION_BODY_KEY) != current[NOTION_BODY_KEY] else None
+        page_id = notion_page_id(log.notion_page_url)
+        if not changed and body is None:
+            continue
+        if page_id is None:
+            logger.warning(f"[worker] 노션 페이지 id를 알 수 없어 동기화하지 않음 (ID: {log.id}, {log.notion_page_url})")
+            continue
+        changes.append((log, page_id, changed, body, current))
+    if not changes:
+        return 0, []
+
+    try:
+        adapter = NotionAdapter()
+    except Exception as e:
+        logger.error(f"[worker] 노션 페이지 동기화 실패: {e}")
+        return 0, [log.id for log, *_ in changes]
+
+    def sync_page(change):
+        _, page_id, changed, body, _ = change
+        if changed:
+            adapter.update_page_properties(page_id, changed)
+        if body is not None:
+            adapter.replace_page_body(page_id, body)
+
+    _, errors = _run_in_pool(sync_page, changes, workers or settings.NOTION_POOL_SIZE)
+
+    synced, failed_ids = [], []
+    for index, (log, _, changed, body, current) in enumerate(changes):
+        if index in errors:
+            logger.error(f"[worker] 노션 페이지 동기화 실패 (ID: {log.id}): {errors[index]}")
+            failed_ids.append(log.id)
+            continue
+        log.notion_synced_properties = current
+        synced.append(log)
+        names = [*changed, *(["본문"] if body is not None else [])]
+        logger.info(f"[worker] 노션 페이지 동기화 완료 (ID: {log.id}, {', '.join(names)})")
+    QnALog.objects.bulk_update(synced, ["notion_synced_properties"])
+    return len(synced), failed_ids
+
+
+def task_pull_notion_edits():
+    """
+    worker 주기 태스크 (notion-reverse-sync 스케줄)
+    마지막으로 반영한 last_edited_time 이후에 수정된 노션 페이지만 커서 페이지네이션으로 조회해,
+    노션에서 고친 속성(제목/AI답변/카테고리/키워드)을 질문에 반영합니다 (반영한 질문 수 반환)
+    """
+    if not settings.NOTION_TOKEN or not settings.NOTION_DB_ID:
+        # 노션을 연결하지 않은 환경 (로컬 개발 등)
+        return 0
+    cursor, _ = NotionSyncCursor.objects.get_or_create(name=NOTION_REVERSE_SYNC_CURSOR)
+    adapter = NotionAdapter()
+    applied = 0
+    for pages in adapter.query_edited_pages(edited_since=cursor.last_edited_time):
+        if not pages:
+            break
+        applied += apply_notion_edits(pages)
+        # 오름차순으로 받으므로 묶음마다 기준점을 올려 두면 중간에 실패해도 처리한 부분은 다시 받지 않음
+        # (노션의 last_edited_time은 분 단위라 같은 시각의 페이지는 다음 실행에서 한 번 더 비교됨)
+        latest = max(parse_datetime(page["last_edited_time"]) for page in pages)
+        if cursor.last_edited_time is None or latest > cursor.last_edited_time:
+            cursor.last_edited_time = latest
+            cursor.save(update_fields=["last_edited_time", "updated_at"])
+    if applied:
+        logger.info(f"[worker] 노션에서 수정된 질문 {applied}건 반영")
+    return applied
+
+
+def apply_notion_edits(pages) -> int:
+    """
+    조회한 페이지를 페이지 id로 질문과 연결하고, 마지막으로 보낸 속성과 달라진 속성만 필드에 반영합니다
+    이 서비스가 보낸 변경(업로드/주기 동기화)은 보낸 값과 같으므로 건너뛰며, 결과는 bulk_update로 한 번에 저장합니다
+    """
+    remote = {
+        page["id"].replace("-", "").lower(): page.get("properties", {})
+        for page in pages
+        if not page.get("archived") and not page.get("in_trash")
+    }
+    logs = QnALog.objects.filter(notion_page_id__in=list(remote)).only(
+        "id", "notion_page_id", "notion_synced_properties", "notion_dirty", *QnALog.NOTION_FIELDS
+    )
+
+    now = timezone.now()
+    edited_logs, edited_fields = [], set()
+    for log in logs:
+        synced = log.notion_synced_properties
+        if not synced:
+            # 보낸 속성이 기록되기 전의 페이지는 비교할 기준이 없음 (주기 동기화가 먼저 채움)
+            continue
+        edits = notion_edits(remote[log.notion_page_id], synced)
+        if not edits:
+            continue
+        for name, value in edits.items():
+            field = NOTION_EDITABLE_PROPERTIES[name]
+            if field == "ai_answer":
+                # 길어서 앞부분만 보냈던 답변이면 노션에서 고친 앞부분에 보내지 않은 뒷부분을 이어 붙임
+                full, sent = log.ai_answer or "", notion_property_value(synced.get(name))
+                if len(full) > len(sent) and full.startswith(sent):
+                    value += full[len(sent):]
+            setattr(log, field, value)
+            edited_fields.add(field)
+
+        current = build_notion_properties(qna_model_to_create_dto(log))
+        for name in edits:
+            if name in current:
+                synced[name] = current[name]
+            else:
+                synced.pop(name, None)
+        log.notion_synced_properties = synced
+        if synced.get(NOTION_BODY_KEY) != notion_body_signature(log):
+            # 고친 답변이 본문에는 아직 없으므로 주기 동기화가 본문을 다시 쓰도록 표시
+            log.notion_dirty = True
+        log.updated_at = now
+        edited_logs.append(log)
+        logger.info(f"[worker] 노션에서 수정된 질문 반영 (ID: {log.id}, {', '.join(edits)})")
+
+    if edited_logs:
+        # save()를 거치지 않으므로 속성만 고친 질문은 노션 주기 동기화 대상(notion_dirty)으로 표시되지 않음
+        QnALog.objects.bulk_update(
+            edited_logs, [*sorted(edited_fields), "notion_synced_properties", "notion_dirty", "updated_at"]
+        )
+    return len(edited_logs)
+
+
+def schedule_outbox_retry():
+    """재시도를 기다리는 항목이 있으면 가장 이른 처리 시각에 디스패처를 한 번 더 실행하도록 예약합니다"""
+    next_run = (
+        NotionOutbox.objects.filter(status=NotionSyncState.PENDING)
+        .order_by("available_at")
+        .values_list("available_at", flat=True)
+        .first()
+    )
+    if next_run is None:
+        return
+    Schedule.objects.update_or_create(
+        name=NOTION_RETRY_SCHEDULE,
+        defaults={
+            "func": "archiver.tasks.task_drain_notion_outbox",
+            "schedule_type": Schedule.ONCE,
+            "next_run": next_run,
+            "repeats": -1,
+        },
+    )
+
+
+def task_sync_embedding(log_id):
+    """
+    worker 비동기 태스크
+    QnALog의 현재 상태에 맞춰 임베딩 인덱스를 갱신합니다
+    검증된 질문이면 벡터를 계산해 추가/교체하고, 검증 해제되었거나 삭제되었으면 제거합니다
+    """
+    index = get_embedding_index()
+    log = QnALog.objects.filter(id=log_id).only("id", "is_verified", "question_text").first()
+
+    if log is None or not log.is_verified:
+        if index.remove(log_id):
+            logger.info(f"[worker] 임베딩 제거 완료 (ID: {log_id})")
+        return
+
+    vector = get_embedding_backend().embed([log.question_text])[0]
+    index.upsert(log.id, vector)
+    logger.info(f"[worker] 임베딩 등록 완료 (ID: {log.id})")
+
+
+def task_run_qna_job(job_id):
+    """
+    worker 비동기 태스크
+    job 모드로 접수된 질문을 처리(Gemini 호출 + 저장)하고 결과를 작업에 기록합니다
+    """
+    from .services import get_qna_service
+
+    job = QnAJob.objects.filter(id=job_id).first()
+    if job is None:
+        logger.error(f"[worker] 해당 ID의 작업을 찾을 수 없음 (ID: {job_id})")
+        return
+    QnAJob.objects.filter(id=job_id).update(status=QnAJob.Status.RUNNING)
+
+    try:
+        images = [job.image] if job.image else []
+        images += [extra.image for extra in job.extra_images.all()]
+        log = get_qna_service().process_question_flow(job.question_text, images=images)
+    except BaseProjectError as e:
+        # 입력/AI 응답 문제는 재시도해도 같으므로 실패로 기록만 함
+        logger.warning(f"[worker] 질문 작업 실패 (ID: {job_id}): {e.message}")
+        job.status = QnAJob.Status.FAILED
+        job.error = e.message
+        job.save(update_fields=["status", "error", "updated_at"])
+        return
+    except Exception as e:
+        logger.error(f"[worker] 질문 작업 중 알수없는 에러 (ID: {job_id}): {e}")
+        job.status = QnAJob.Status.FAILED
+        job.error = "알수없는 에러 발생"
+        job.save(update_fields=["status", "error", "updated_at"])
+        raise e
 
+    result = qna_model_to_response_dto(log).model_dump(mode="json")
+    result["status"] = "new"
+    result["message"] = "AI 분석이 끝났습니다"
+    job.status = QnAJob.Status.DONE
+    job.result = result
+    job.qna_log = log
+    job.save(update_fields=["status", "result", "qna_log", "updated_at"])
+    logger.info(f"[worker] 질문 작업 완료 (ID: {job_id}, 질문 ID: {log.id})")
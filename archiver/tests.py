@@ -4,10 +4,10 @@ import pytest
 import requests
 from django.test import TestCase, override_settings
 from django.urls import reverse
-from unittest.mock import patch, MagicMock, Mock
+from unittest.mock import patch, MagicMock, Mock, AsyncMock
 from config.settings import GEMINI_API_KEY, NOTION_DB_ID
 from .services import QnAService
-from .models import QnALog
+from .models import NotionSyncState, QnALog
 from .dto import QnACreateDTO, QnAResponseDTO
 from .tasks import task_process_question
 from .adapters import qna_model_to_create_dto, qna_model_to_response_dto, GeminiAdapter, NotionAdapter
@@ -37,7 +37,7 @@ def mock_gemini_adapter():
     GeminiAdapter 가짜로 대체하는 Fixture
     테스트 실행중 실제 AI API 호출을 방지합니다
     """
-    with patch("archiver.services.GeminiAdapter") as MockGemini:
+    with patch("archiver.services.GeminiAdapter") as MockGemini, patch("archiver.services._qna_service", None):
         mock_instance = MockGemini.return_value
         mock_dto = MagicMock()
         mock_dto.ai_answer = "테스트 AI 답변입니다"
@@ -46,16 +46,40 @@ def mock_gemini_adapter():
         mock_dto.title = "AI가 생성한 테스트 제목"
         mock_instance.generate_answer.return_value = mock_dto
         yield mock_instance
+
+
+@pytest.fixture
+def mock_genai_client():
+    """
+    프로세스 공용 Gemini 클라이언트(genai.Client)를 가짜로 대체하는 Fixture
+    GeminiAdapter 자체를 검증하면서 실제 AI API 호출은 막습니다
+    """
+    with patch("archiver.adapters._gemini_client", None), patch("archiver.adapters.genai.Client") as MockClient:
+        yield MockClient.return_value
+
+
 @pytest.fixture
 def mock_notion_adapter():
     """
     NotionAdapter를 가짜로 대체하는 Fixture
     테스트 실행중 실제 Notion API 호출을 방지
     """
-    with patch("archiver.services.NotionAdapter") as MockNotion:
+    with patch("archiver.tasks.NotionAdapter") as MockNotion:
         mock_instance = MockNotion.return_value
         mock_instance.create_qna_page.return_value = "https://notion.so/fake-page-123"
         yield mock_instance
+
+@pytest.fixture(autouse=True)
+def isolated_gemini_cache(tmp_path):
+    """테스트마다 빈 Gemini 응답 캐시 파일을 사용 (테스트끼리 캐시된 응답을 공유하지 않도록)"""
+    with override_settings(GEMINI_CACHE_PATH=str(tmp_path / "gemini_cache.sqlite3")):
+        yield
+
+@pytest.fixture
+def mock_async_task():
+    """서비스에서 Django-Q 대기열에 태스크를 등록하는 호출을 가짜로 대체하는 Fixture"""
+    with patch("archiver.services.async_task") as mock_task:
+        yield mock_task
         
 # ==================================================================================
 # 기능 테스트
@@ -64,7 +88,7 @@ def mock_notion_adapter():
 class TestQnABotAPI:
     """QnABotAPIVIEW의 주요 기능 흐름을 테스트합니다"""
 
-    def test_new_question_flow(self, api_client, qna_bot_url, mock_gemini_adapter, mock_notion_adapter):
+    def test_new_question_flow(self, api_client, qna_bot_url, mock_gemini_adapter, mock_notion_adapter, mock_async_task):
         """
         [통합 테스트/성공] 실규 질문 시, View-Service-DB 연동 및 AI 응답 처리 흐름을 검증
         """
@@ -94,7 +118,19 @@ class TestQnABotAPI:
         # 외부 서비스가 올바르게 호출되었는지 검증
         mock_gemini_adapter.generate_answer.assert_called_once()
 
-        mock_notion_adapter.create_qna_page.assert_called_once_with(created_log)
+        # 노션 업로드는 요청 경로가 아닌 outbox에 기록 (커밋 후 워커가 처리)
+        mock_notion_adapter.create_qna_page.assert_not_called()
+        assert created_log.notion_outbox.get().status == NotionSyncState.PENDING
+
+    def test_service_is_shared_across_requests(self, api_client, qna_bot_url, mock_gemini_adapter, mock_async_task):
+        """요청마다 서비스/어댑터를 새로 만들지 않고 프로세스 공용 객체를 사용한다"""
+        from .services import GeminiAdapter as PatchedGeminiAdapter
+
+        api_client.post(qna_bot_url, {"question_text": "파이썬 가상환경 설정"}, format="json")
+        api_client.post(qna_bot_url, {"question_text": "도커 컴포즈 포트 충돌"}, format="json")
+
+        PatchedGeminiAdapter.assert_called_once()
+        assert mock_gemini_adapter.generate_answer.call_count == 2
 
     def test_ai_response_parsing_failure(self, api_client, qna_bot_url, mock_gemini_adapter, mock_notion_adapter):
         """
@@ -112,9 +148,9 @@ class TestQnABotAPI:
         mock_notion_adapter.create_qna_page.assert_not_called()
 
 
-    def test_notion_api_failure(self, api_client, qna_bot_url, mock_gemini_adapter, mock_notion_adapter):
+    def test_notion_api_failure(self, api_client, qna_bot_url, mock_gemini_adapter, mock_notion_adapter, mock_async_task):
         """
-        [통합 테스트 성공] Notion 저장에 실패하더라도, 전체 흐름은 중단되지 않고 성공 응답을 반환하는지 검증
+        [통합 테스트 성공] Notion이 장애 상태여도 요청 경로에서는 호출하지 않으므로 성공 응답을 반환하는지 검증
         """
         mock_notion_adapter.create_qna_page.side_effect = Exception("Notion API 에러 발생")
         request_data = {"question_text": "Notion API 실패 테스트 질문"}
@@ -132,14 +168,14 @@ class TestQnABotAPI:
         assert log.title == "AI가 생성한 테스트 제목"
 
         mock_gemini_adapter.generate_answer.assert_called_once()
-        mock_notion_adapter.create_qna_page.assert_called_once()
+        mock_notion_adapter.create_qna_page.assert_not_called()
+        assert log.notion_outbox.get().status == NotionSyncState.PENDING
 @pytest.fixture
 def mock_qna_service():
     """Mock된 QnAService 인스턴스를 제공하는 Fixture"""
     with patch.object(QnAService, '__init__', lambda x: None):
         service = QnAService()
         service.gemini = MagicMock()
-        service.notion = MagicMock()
         yield service
 
 
@@ -170,11 +206,247 @@ class TestCheckSimilarity:
         existing.refresh_from_db()
         assert existing.hit_count == 6
 
+    def test_unverified_question_is_returned_as_duplicate(self, mock_qna_service):
+        """검토 전 질문은 similar_found가 아닌 duplicate로 저장된 답변을 돌려준다"""
+        pending = QnALog.objects.create(
+            question_text="Django ORM 사용법",
+            title="Django ORM",
+            ai_answer="ORM 사용법 답변",
+            is_verified=False,
+            hit_count=1,
+        )
+
+        result = mock_qna_service.check_similarity("Django ORM 사용법")
+
+        assert result["status"] == "duplicate"
+        assert result["data"]["ai_answer"] == "ORM 사용법 답변"
+        pending.refresh_from_db()
+        assert pending.hit_count == 2
+        child = QnALog.objects.get(parent_question=pending)
+        assert child.question_text == "Django ORM 사용법"
+        assert child.ai_answer == "ORM 사용법 답변"
+
+    def test_old_unverified_question_is_not_reused(self, mock_qna_service):
+        """DUPLICATE_LOOKBACK_DAYS보다 오래된 검토 전 질문은 재사용하지 않는다"""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        pending = QnALog.objects.create(
+            question_text="Django ORM 사용법",
+            title="Django ORM",
+            ai_answer="ORM 사용법 답변",
+        )
+        QnALog.objects.filter(pk=pending.pk).update(created_at=timezone.now() - timedelta(days=30))
+
+        result = mock_qna_service.check_similarity("Django ORM 사용법")
+
+        assert result["status"] == "not_found"
+
+    def test_verified_question_takes_precedence_over_pending(self, mock_qna_service):
+        """검증된 질문과 검토 전 질문이 모두 있으면 검증된 질문을 돌려준다"""
+        QnALog.objects.create(question_text="Django ORM 사용법", title="대기", ai_answer="대기 답변")
+        verified = QnALog.objects.create(
+            question_text="Django ORM 사용법",
+            title="Django ORM",
+            ai_answer="ORM 사용법 답변",
+            is_verified=True,
+            notion_page_url="https://notion.so/page",
+        )
+
+        result = mock_qna_service.check_similarity("Django ORM 사용법")
+
+        assert result["status"] == "similar_found"
+        assert result["data"]["id"] == verified.id
+
+    def test_custom_threshold_is_applied_to_session(self, mock_qna_service):
+        """기본값과 다른 threshold는 세션의 % 연산자 기준값으로 반영된다"""
+        from django.db import connection
+
+        QnALog.objects.create(
+            question_text="Django ORM 사용법",
+            title="Django ORM",
+            ai_answer="ORM 사용법 답변",
+            is_verified=True,
+        )
+
+        strict = mock_qna_service.check_similarity("Django ORM 사용법이 궁금합니다", threshold=0.95)
+        loose = mock_qna_service.check_similarity("Django ORM 사용법이 궁금합니다", threshold=0.3)
+
+        assert strict["status"] == "not_found"
+        assert loose["status"] == "similar_found"
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW pg_trgm.similarity_threshold")
+            assert float(cursor.fetchone()[0]) == 0.3
+
+
+def pasted_traceback(question, root, line, when):
+    """경로/줄 번호/시각만 다른 traceback 붙여넣기 질문"""
+    return (
+        f"{question}\n[{when}] Traceback (most recent call last):\n"
+        f'  File "{root}/django/db/backends/utils.py", line {line}, in _execute\n'
+        f"    return self.cursor.execute(sql, params)\n"
+        f"           ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^\n"
+        f'django.db.utils.ProgrammingError: relation "archiver_qnalog" does not exist at 0x7f3a2b1c{line}'
+    )
+
+
+class TestQuestionSignature:
+    """유사도 비교용 질문 서명(question_signature) 테스트"""
+
+    def test_volatile_tokens_are_removed(self):
+        """환경마다 다른 경로/줄 번호/주소/시각은 지우고 질문과 예외 메시지만 남긴다"""
+        from .fingerprints import question_signature
+
+        a = pasted_traceback("마이그레이션 에러", "/home/kim/venv/lib/python3.11/site-packages", 89, "2026-03-01 12:33:10")
+        b = pasted_traceback("마이그레이션  에러", "C:\\Users\\lee\\.venv\\Lib\\site-packages", 105, "2026-10-18T09:00:01")
+
+        assert question_signature(a) == question_signature(b)
+        assert question_signature(a) == (
+            '마이그레이션 에러 [ ] django.db.utils.programmingerror: relation "archiver_qnalog" does not exist at'
+        )
+
+    def test_long_text_keeps_head_and_tail(self):
+        """max_length를 넘으면 앞(질문)과 뒤(마지막 예외)만 남긴다"""
+        from .fingerprints import question_signature
+
+        signature = question_signature("질문 시작 " + "log message " * 500 + "KeyError: 'title'", max_length=100)
+
+        assert len(signature) <= 100
+        assert signature.startswith("질문 시작")
+        assert signature.endswith("keyerror: 'title'")
+
+    def test_signature_is_maintained_on_save(self):
+        """질문 내용을 저장할 때만 서명을 다시 계산한다"""
+        log = QnALog.objects.create(question_text="Django ORM 사용법은?", title="t", ai_answer="a")
+        assert log.question_signature == "django orm 사용법은?"
+
+        QnALog.objects.filter(pk=log.pk).update(question_signature="")
+        log.hit_count = 3
+        log.save(update_fields=["hit_count"])
+        assert QnALog.objects.get(pk=log.pk).question_signature == ""
+
+        log.question_text = "Django ORM 사용법 /home/kim/app/views.py"
+        log.save(update_fields=["question_text"])
+        assert QnALog.objects.get(pk=log.pk).question_signature == "django orm 사용법"
+
+    def test_repasted_traceback_matches_through_signature(self, mock_qna_service):
+        """다른 환경에서 같은 에러를 붙여넣어도 검증된 질문을 찾는다"""
+        existing = QnALog.objects.create(
+            question_text=pasted_traceback("마이그레이션 에러", "/home/kim/venv/lib/python3.11/site-packages", 89, "2026-03-01 12:33:10"),
+            title="relation does not exist",
+            ai_answer="migrate를 실행하세요",
+            is_verified=True,
+        )
+        question = pasted_traceback("마이그레이션 에러", "/usr/local/lib/python3.13/site-packages", 412, "2026-10-18 09:00:01")
+
+        with override_settings(SIMILARITY_FIELD="question_signature"):
+            result = mock_qna_service.check_similarity(question, threshold=0.9)
+
+        assert result["status"] == "similar_found"
+        assert result["data"]["id"] == existing.id
+
+    def test_backfill_command_fills_empty_signatures(self):
+        """backfill_question_signatures는 서명이 비어있는 행만 채운다"""
+        import io
+        from django.core.management import call_command
+
+        log = QnALog.objects.create(question_text="Docker 빌드 실패 0xdeadbeef", title="t", ai_answer="a")
+        QnALog.objects.filter(pk=log.pk).update(question_signature="")
+
+        call_command("backfill_question_signatures", stdout=io.StringIO())
+
+        assert QnALog.objects.get(pk=log.pk).question_signature == "docker 빌드 실패"
+
+    def test_migration_backfills_existing_signatures(self):
+        """서명 컬럼을 추가하는 마이그레이션이 기존 질문의 서명을 채운다 (배포 직후부터 서명으로 검색)"""
+        from importlib import import_module
+        from django.apps import apps
+
+        migration = import_module("archiver.migrations.0011_qnalog_question_signature")
+        log = QnALog.objects.create(question_text="Docker 빌드 실패 0xdeadbeef", title="t", ai_answer="a")
+        QnALog.objects.filter(pk=log.pk).update(question_signature="")
+
+        migration.backfill_signatures(apps, None)
+
+        assert QnALog.objects.get(pk=log.pk).question_signature == "docker 빌드 실패"
+
+
+class TestErrorFingerprint:
+    """붙여넣은 에러의 지문(error_fingerprint) 동등 비교 테스트"""
+
+    def test_same_error_from_other_environment_has_same_fingerprint(self):
+        """경로/줄 번호/시각/질문 문장이 달라도 같은 에러면 같은 지문이다"""
+        from .fingerprints import error_fingerprint
+
+        a = pasted_traceback("마이그레이션 에러", "/home/kim/venv/lib/python3.11/site-packages", 89, "2026-03-01 12:33:10")
+        b = pasted_traceback("migrate 하니까 이래요", "C:\\Users\\lee\\.venv\\Lib\\site-packages", 105, "2026-10-18 09:00:01")
+        other = a.replace("archiver_qnalog", "archiver_qnajob")
+
+        assert error_fingerprint(a) == error_fingerprint(b)
+        assert error_fingerprint(a) != error_fingerprint(other)
+        assert error_fingerprint("Django ORM 사용법이 궁금합니다") is None
+
+    def test_single_error_line_without_traceback(self):
+        """traceback 없이 에러 한 줄만 붙여넣어도 지문을 만든다"""
+        from .fingerprints import error_fingerprint
+
+        assert error_fingerprint("설치했는데\nModuleNotFoundError: No module named 'rest_framework'")
+        assert error_fingerprint("fatal: not a git repository (or any of the parent directories): .git")
+        assert error_fingerprint("ModuleNotFoundError: No module named 'a'") != error_fingerprint(
+            "ModuleNotFoundError: No module named 'b'"
+        )
+
+    def test_migration_backfills_existing_fingerprints(self):
+        """에러 지문 컬럼을 추가하는 마이그레이션이 에러가 있는 기존 질문의 지문을 채운다"""
+        from importlib import import_module
+        from django.apps import apps
+        from .fingerprints import error_fingerprint
+
+        migration = import_module("archiver.migrations.0012_qnalog_error_fingerprint")
+        text = pasted_traceback("마이그레이션 에러", "/home/kim/venv/lib/python3.11/site-packages", 89, "2026-03-01")
+        with_error = QnALog.objects.create(question_text=text, title="t", ai_answer="a")
+        plain = QnALog.objects.create(question_text="Django ORM 사용법이 궁금합니다", title="t", ai_answer="a")
+        QnALog.objects.update(error_fingerprint=None)
+
+        migration.backfill_error_fingerprints(apps, None)
+
+        assert QnALog.objects.get(pk=with_error.pk).error_fingerprint == error_fingerprint(text)
+        assert QnALog.objects.get(pk=plain.pk).error_fingerprint is None
+
+    def test_known_error_resolves_without_trigram_search(self, mock_qna_service):
+        """같은 에러의 검증된 질문이 있으면 유사도 검색 없이 바로 찾는다"""
+        existing = QnALog.objects.create(
+            question_text=pasted_traceback("마이그레이션 에러", "/home/kim/venv/lib/python3.11/site-packages", 89, "2026-03-01"),
+            title="relation does not exist",
+            ai_answer="migrate를 실행하세요",
+            is_verified=True,
+        )
+        assert existing.error_fingerprint
+        question = pasted_traceback("배포 서버에서 이런 게 떠요", "/usr/local/lib/python3.13/site-packages", 412, "2026-10-18")
+
+        with patch.object(QnAService, "_similar_queryset") as mock_trigram:
+            result = mock_qna_service.check_similarity(question)
+
+        assert result["status"] == "similar_found"
+        assert result["data"]["id"] == existing.id
+        mock_trigram.assert_not_called()
+
+    def test_unverified_error_is_not_matched(self, mock_qna_service):
+        """검토 전 질문은 에러 지문으로 찾지 않는다"""
+        QnALog.objects.create(
+            question_text="ValueError: Negative indexing is not supported.",
+            title="t",
+            ai_answer="a",
+        )
+
+        assert mock_qna_service._error_match("ValueError: Negative indexing is not supported.") is None
+
+
 @pytest.mark.django_db
 class TestProcessQuestionFlow:
     """신규 질문 처리 플로우 테스트"""
 
-    def test_creates_qna_log_with_ai_response(self, mock_qna_service):
+    def test_creates_qna_log_with_ai_response(self, mock_qna_service, mock_async_task):
         """AI 응답을 받아 QnALog 반환값 설정"""
         mock_dto = MagicMock()
         mock_dto.title = "pytest 기본 사용법"
@@ -183,13 +455,29 @@ class TestProcessQuestionFlow:
         mock_dto.ai_answer = "pytest는 Python 테스트 프레임워크입니다"
 
         mock_qna_service.gemini.generate_answer.return_value = mock_dto
-        mock_qna_service.notion.create_qna_page.return_value = "https://notion.so/page-123"
 
         result = mock_qna_service.process_question_flow("pytest 사용법")
 
         assert result.title == "pytest 기본 사용법"
-        assert result.notion_page_url == "https://notion.so/page-123"
+        assert result.notion_page_url is None
         mock_qna_service.gemini.generate_answer.assert_called_once()
+        assert result.notion_outbox.count() == 1
+        assert result.notion_sync_state == NotionSyncState.PENDING
+
+    def test_upload_is_enqueued_in_same_transaction(self, mock_qna_service):
+        """업로드 예약이 실패하면 질문 저장도 롤백되어 기록이 어긋나지 않는다"""
+        mock_dto = MagicMock()
+        mock_dto.title = "트랜잭션 테스트"
+        mock_dto.category = "General"
+        mock_dto.keywords = []
+        mock_dto.ai_answer = "답변"
+        mock_qna_service.gemini.generate_answer.return_value = mock_dto
+
+        with patch("archiver.models.NotionOutbox.objects.get_or_create", side_effect=Exception("db down")):
+            with pytest.raises(DatabaseOperationError):
+                mock_qna_service.process_question_flow("트랜잭션 질문")
+
+        assert QnALog.objects.count() == 0
 
     def test_raises_validation_error_when_empty_question(self, mock_qna_service):
         """빈 질문일떄 ValidationError 발생"""
@@ -273,6 +561,19 @@ class TestTaskProcessQuestion:
         mock_logger.info.assert_called_once()
         assert "노션 업로드 완료" in mock_logger.info.call_args[0][0]
 
+    @override_settings(NOTION_TOKEN="test-token", NOTION_DB_ID="test-db-id")
+    def test_uploads_to_notion_server_and_saves_url(self, sample_qna_log):
+        """워커가 노션 서버에 페이지를 생성하고 URL을 저장 (가짜 노션 서버)"""
+        from .fakes import FakeNotionServer
+
+        with FakeNotionServer() as server, override_settings(NOTION_API_URL=server.base_url):
+            task_process_question(sample_qna_log.id)
+
+        sample_qna_log.refresh_from_db()
+        assert sample_qna_log.notion_page_url.startswith("https://www.notion.so/")
+        assert len(server.requests) == 1
+        assert server.requests[0]["body"]["parent"] == {"database_id": "test-db-id"}
+
 class TestTaskProcessQustionFailure:
     """task_process_question 실패 케이스 테스트"""
 
@@ -301,6 +602,513 @@ class TestTaskProcessQustionFailure:
 
 
 
+class TestNotionOutbox:
+    """노션 업로드 outbox 디스패처(task_drain_notion_outbox) 테스트"""
+
+    @staticmethod
+    def _verified(title):
+        return QnALog.objects.create(question_text=f"{title} 질문", title=title, ai_answer="답변", is_verified=True)
+
+    @override_settings(NOTION_TOKEN="test-token", NOTION_DB_ID="test-db-id", NOTION_RATE_LIMIT=0)
+    def test_drain_uploads_each_entry_exactly_once(self):
+        """저장을 반복해도 질문마다 페이지는 하나만 만들고, 다시 실행해도 호출하지 않는다"""
+        from .fakes import FakeNotionServer
+        from .tasks import task_drain_notion_outbox
+
+        first, second = self._verified("첫 질문"), self._verified("두 번째 질문")
+        first.category = "Django"
+        first.save()
+        first.save(update_fields=["hit_count"])
+
+        with FakeNotionServer() as server, override_settings(NOTION_API_URL=server.base_url):
+            assert task_drain_notion_outbox() == 2
+            assert task_drain_notion_outbox() == 0
+
+        assert len(server.requests) == 2
+        for log in (first, second):
+            log.refresh_from_db()
+            assert log.notion_page_url.startswith("https://www.notion.so/")
+            assert log.notion_sync_state == NotionSyncState.DONE
+            assert log.notion_outbox.get().status == NotionSyncState.DONE
+
+    @override_settings(NOTION_OUTBOX_MAX_ATTEMPTS=2, NOTION_OUTBOX_RETRY_DELAY=60)
+    @patch("archiver.tasks.NotionAdapter")
+    def test_failed_upload_backs_off_then_fails(self, mock_adapter_class):
+        """실패하면 백오프 후 재시도를 예약하고, 최대 시도 횟수를 넘으면 failed로 남긴다"""
+        from django.utils import timezone
+        from django_q.models import Schedule
+        from .tasks import NOTION_RETRY_SCHEDULE, task_drain_notion_outbox
+
+        mock_adapter_class.return_value.create_qna_page.side_effect = NotionAPIError("노션 장애")
+        log = self._verified("실패할 질문")
+
+        task_drain_notion_outbox()
+
+        entry = log.notion_outbox.get()
+        assert (entry.status, entry.attempts) == (NotionSyncState.PENDING, 1)
+        assert entry.available_at > timezone.now()
+        assert "노션 장애" in entry.last_error
+        assert Schedule.objects.get(name=NOTION_RETRY_SCHEDULE).next_run == entry.available_at
+
+        entry.available_at = timezone.now()
+        entry.save(update_fields=["available_at"])
+        task_drain_notion_outbox()
+
+        entry.refresh_from_db()
+        assert (entry.status, entry.attempts) == (NotionSyncState.FAILED, 2)
+        assert QnALog.objects.get(pk=log.pk).notion_sync_state == NotionSyncState.FAILED
+
+    @patch("archiver.tasks.NotionAdapter")
+    def test_entry_for_uploaded_question_completes_without_call(self, mock_adapter_class):
+        """다른 경로로 이미 업로드된 질문은 노션을 호출하지 않고 완료 처리한다"""
+        from .tasks import task_drain_notion_outbox
+
+        log = self._verified("이미 올라간 질문")
+        QnALog.objects.filter(pk=log.pk).update(notion_page_url="https://notion.so/existing-page")
+
+        task_drain_notion_outbox()
+
+        mock_adapter_class.return_value.create_qna_page.assert_not_called()
+        assert log.notion_outbox.get().status == NotionSyncState.DONE
+
+    @patch("archiver.tasks.NotionAdapter")
+    def test_stale_in_flight_entry_is_reclaimed(self, mock_adapter_class):
+        """업로드 중에 워커가 죽어 오래 남은 in_flight 항목은 다시 가져간다"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from .models import NotionOutbox
+        from .tasks import claim_outbox_entries
+
+        log = self._verified("멈춘 질문")
+        NotionOutbox.objects.filter(qna_log=log).update(
+            status=NotionSyncState.IN_FLIGHT, claimed_at=timezone.now() - timedelta(hours=1), attempts=1
+        )
+        fresh = self._verified("방금 가져간 질문")
+        NotionOutbox.objects.filter(qna_log=fresh).update(status=NotionSyncState.IN_FLIGHT, claimed_at=timezone.now())
+
+        entries = claim_outbox_entries(10)
+
+        assert [entry.qna_log_id for entry in entries] == [log.id]
+        assert entries[0].attempts == 2
+
+
+class TestNotionBatchPublisher:
+    """노션 일괄 업로드(관리자 액션 / publish_notion 커맨드) 테스트"""
+
+    @staticmethod
+    def _verified(title):
+        return QnALog.objects.create(question_text=f"{title} 질문", title=title, ai_answer="답변", is_verified=True)
+
+    @override_settings(NOTION_TOKEN="test-token", NOTION_DB_ID="test-db-id", NOTION_RATE_LIMIT=0)
+    def test_publishes_rows_in_one_job_with_progress(self):
+        """선택한 질문을 풀로 나눠 업로드하고 진행 상황을 알린다"""
+        from .fakes import FakeNotionServer
+        from .tasks import publish_notion_batch
+
+        logs = [self._verified(f"일괄 질문 {i}") for i in range(5)]
+        progress = []
+
+        with FakeNotionServer(latency=0.05) as server, override_settings(NOTION_API_URL=server.base_url):
+            result = publish_notion_batch(
+                [log.id for log in logs], batch_size=3, workers=2, progress=lambda *p: progress.append(p)
+            )
+
+        assert result == {"total": 5, "uploaded": 5, "failed": 0, "skipped": 0, "remaining": []}
+        assert len(server.requests) == 5
+        assert progress[-1] == (5, 5)
+        assert not QnALog.objects.filter(notion_page_url__isnull=True).exists()
+        assert set(QnALog.objects.values_list("notion_sync_state", flat=True)) == {NotionSyncState.DONE}
+
+    @patch("archiver.tasks.NotionAdapter")
+    def test_one_failure_does_not_stop_the_batch(self, mock_adapter_class):
+        """한 건이 실패해도 나머지는 업로드하고, 실패한 질문만 다시 대기한다"""
+        from .tasks import publish_notion_batch
+
+        def create_page(dto):
+            if dto.title == "실패할 질문":
+                raise NotionAPIError("노션 장애")
+            return f"https://notion.so/{dto.title}"
+
+        mock_adapter_class.return_value.create_qna_page.side_effect = create_page
+        ok, bad, other = self._verified("성공 질문"), self._verified("실패할 질문"), self._verified("다른 질문")
+
+        result = publish_notion_batch([ok.id, bad.id, other.id])
+
+        assert (result["uploaded"], result["failed"]) == (2, 1)
+        assert mock_adapter_class.call_count == 1
+        bad.refresh_from_db()
+        assert bad.notion_page_url is None
+        assert bad.notion_sync_state == NotionSyncState.PENDING
+        assert "노션 장애" in bad.notion_outbox.get().last_error
+        assert QnALog.objects.get(pk=ok.pk).notion_page_url == "https://notion.so/성공 질문"
+
+    @patch("archiver.tasks.NotionAdapter")
+    def test_failed_upload_is_retried_from_scratch(self, mock_adapter_class):
+        """최대 시도 횟수를 넘겨 실패로 끝난 질문도 다시 업로드한다"""
+        from .models import NotionOutbox
+        from .tasks import publish_notion_batch
+
+        mock_adapter_class.return_value.create_qna_page.return_value = "https://notion.so/retried"
+        log = self._verified("실패했던 질문")
+        NotionOutbox.objects.filter(qna_log=log).update(status=NotionSyncState.FAILED, attempts=5)
+
+        result = publish_notion_batch([log.id])
+
+        assert result["uploaded"] == 1
+        entry = log.notion_outbox.get()
+        assert (entry.status, entry.attempts) == (NotionSyncState.DONE, 1)
+
+    @patch("archiver.tasks.async_task")
+    @patch("archiver.tasks.NotionAdapter")
+    def test_task_hands_over_rows_left_after_time_budget(self, mock_adapter_class, mock_async_task):
+        """작업 시간 안에 가져가지 못한 질문은 같은 태스크를 새로 등록해 넘긴다"""
+        from .tasks import task_publish_notion_batch
+
+        mock_adapter_class.return_value.create_qna_page.return_value = "https://notion.so/page"
+        log_ids = [self._verified(f"질문 {i}").id for i in range(3)]
+
+        with override_settings(NOTION_OUTBOX_BATCH_SIZE=1, NOTION_TASK_TIME_BUDGET=0):
+            result = task_publish_notion_batch(log_ids)
+
+        assert result["uploaded"] == 0
+        assert result["remaining"] == log_ids
+        mock_adapter_class.return_value.create_qna_page.assert_not_called()
+        mock_async_task.assert_any_call("archiver.tasks.task_publish_notion_batch", log_ids, None)
+
+    @patch("archiver.tasks.async_task")
+    def test_drain_hands_over_after_time_budget(self, mock_async_task):
+        """디스패처도 작업 시간이 지나면 멈추고 새 디스패처 태스크를 등록한다"""
+        from .tasks import task_drain_notion_outbox
+
+        with override_settings(NOTION_TASK_TIME_BUDGET=0):
+            assert task_drain_notion_outbox() == 0
+
+        mock_async_task.assert_called_once_with("archiver.tasks.task_drain_notion_outbox")
+
+    @patch("archiver.admin.async_task")
+    def test_admin_action_enqueues_single_job(self, mock_async_task):
+        """관리자 액션은 업로드 대상만 모아 작업 하나를 등록한다"""
+        from django.contrib import admin as django_admin
+        from .admin import QnALogAdmin
+
+        targets = [self._verified("대상 1"), self._verified("대상 2")]
+        QnALog.objects.create(question_text="미검증 질문", title="미검증", ai_answer="답변")
+        QnALog.objects.create(
+            question_text="업로드된 질문", title="완료", ai_answer="답변", is_verified=True,
+            notion_page_url="https://notion.so/done",
+        )
+        model_admin = QnALogAdmin(QnALog, django_admin.site)
+
+        with patch.object(model_admin, "message_user"):
+            model_admin.publish_to_notion(Mock(), QnALog.objects.all())
+
+        mock_async_task.assert_called_once()
+        func, log_ids = mock_async_task.call_args.args
+        assert func == "archiver.tasks.task_publish_notion_batch"
+        assert sorted(log_ids) == sorted(log.id for log in targets)
+
+    @patch("archiver.tasks.NotionAdapter")
+    def test_publish_notion_command(self, mock_adapter_class):
+        """publish_notion 커맨드는 업로드 결과를 집계해 출력한다"""
+        import io
+        from django.core.management import call_command
+
+        mock_adapter_class.return_value.create_qna_page.return_value = "https://notion.so/page"
+        self._verified("커맨드 질문 1")
+        self._verified("커맨드 질문 2")
+        out = io.StringIO()
+
+        call_command("publish_notion", "--workers", "2", stdout=out)
+
+        assert "성공 2건, 실패 0건" in out.getvalue()
+        assert QnALog.objects.filter(notion_sync_state=NotionSyncState.DONE).count() == 2
+
+
+class TestNotionPageSync:
+    """노션에 올라간 질문의 변경분 주기 동기화(task_sync_notion_pages) 테스트"""
+
+    PAGE_URL = "https://www.notion.so/Django-0123456789abcdef0123456789abcdef"
+
+    def _uploaded(self, **fields):
+        log = QnALog.objects.create(
+            question_text="업로드된 질문", title="업로드된 제목", ai_answer="답변", is_verified=True,
+            notion_page_url=self.PAGE_URL, **fields,
+        )
+        return QnALog.objects.get(pk=log.pk)
+
+    def test_editing_notion_fields_marks_row_dirty(self):
+        """노션에 보이는 필드를 바꿔 저장하면 동기화 대상이 되고, 다른 필드나 업로드 전 질문은 제외한다"""
+        log = self._uploaded()
+        assert log.notion_dirty is False
+
+        log.image_dhash = "0" * 64
+        log.save(update_fields=["image_dhash"])
+        assert QnALog.objects.get(pk=log.pk).notion_dirty is False
+
+        log.ai_answer = "관리자가 고친 답변"
+        log.save(update_fields=["ai_answer"])
+        assert QnALog.objects.get(pk=log.pk).notion_dirty is True
+
+        draft = QnALog.objects.create(question_text="검토 전 질문", title="검토 전", ai_answer="답변")
+        draft.category = "Django"
+        draft.save()
+        assert QnALog.objects.get(pk=draft.pk).notion_dirty is False
+
+    def test_hit_count_increment_marks_row_dirty(self):
+        """save()를 거치지 않는 hit_count 증가도 동기화 대상으로 표시한다"""
+        from .hitcounter import bulk_increment_hit_counts, increment_hit_count
+
+        first, second = self._uploaded(), self._uploaded()
+        increment_hit_count(first.id)
+        bulk_increment_hit_counts({second.id: 2})
+
+        assert QnALog.objects.filter(notion_dirty=True).count() == 2
+
+    def test_hit_count_increment_skips_unpublished_rows(self):
+        """노션 페이지가 아직 없는 질문은 hit_count만 올리고 동기화 대상으로 표시하지 않는다"""
+        from .hitcounter import bulk_increment_hit_counts, increment_hit_count
+
+        draft = QnALog.objects.create(question_text="검토 전 질문", title="검토 전", ai_answer="답변")
+        published = self._uploaded()
+        before = draft.hit_count
+        increment_hit_count(draft.id)
+        bulk_increment_hit_counts({draft.id: 2, published.id: 1})
+
+        draft.refresh_from_db()
+        assert draft.hit_count == before + 3
+        assert draft.notion_dirty is False
+        assert QnALog.objects.get(pk=published.pk).notion_dirty is True
+
+    @override_settings(NOTION_TOKEN="test-token", NOTION_DB_ID="test-db-id", NOTION_RATE_LIMIT=0)
+    def test_sync_patches_only_changed_properties_once_per_page(self):
+        """여러 번 바뀐 질문도 페이지당 PATCH 한 번, 달라진 속성만 보낸다"""
+        from .adapters import notion_page_id
+        from .fakes import FakeNotionServer
+        from .hitcounter import increment_hit_count
+        from .tasks import task_drain_notion_outbox, task_sync_notion_pages
+
+        log = QnALog.objects.create(question_text="질문", title="제목", ai_answer="답변", is_verified=True)
+        untouched = QnALog.objects.create(question_text="다른 질문", title="다른 제목", ai_answer="답변", is_verified=True)
+
+        with FakeNotionServer() as server, override_settings(NOTION_API_URL=server.base_url):
+            task_drain_notion_outbox()
+            for _ in range(3):
+                increment_hit_count(log.id)
+            log = QnALog.objects.get(pk=log.pk)
+            log.category = "Django"
+            log.save()
+
+            assert task_sync_notion_pages() == 1
+            assert task_sync_notion_pages() == 0
+
+        patches = [request for request in server.requests if request["method"] == "PATCH"]
+        page_id = notion_page_id(log.notion_page_url)
+        assert len(patches) == 1
+        assert patches[0]["path"] == f"/v1/pages/{page_id}"
+        assert set(patches[0]["body"]["properties"]) == {"카테고리", "질문횟수"}
+        assert server.pages[page_id]["질문횟수"] == {"number": 3}
+        assert not QnALog.objects.filter(notion_dirty=True).exists()
+        assert QnALog.objects.get(pk=untouched.pk).notion_synced_properties["질문횟수"] == {"number": 1}
+
+    @patch("archiver.tasks.NotionAdapter")
+    def test_failed_patch_is_retried_next_run(self, mock_adapter_class):
+        """PATCH가 실패하면 이번 실행에서 반복하지 않고 다음 주기에 다시 시도한다"""
+        from .hitcounter import increment_hit_count
+        from .tasks import task_sync_notion_pages
+
+        mock_adapter_class.return_value.update_page_properties.side_effect = NotionAPIError("노션 장애")
+        log = self._uploaded()
+        increment_hit_count(log.id)
+
+        assert task_sync_notion_pages() == 0
+
+        mock_adapter_class.return_value.update_page_properties.assert_called_once()
+        log.refresh_from_db()
+        assert log.notion_dirty is True
+        assert log.notion_synced_properties == {}
+
+    @patch("archiver.tasks.NotionAdapter")
+    def test_stale_claim_is_reclaimed(self, mock_adapter_class):
+        """가져간 뒤 끝나지 않은(워커가 죽은) 동기화는 시간이 지나면 다시 보내고, 진행 중인 것은 건드리지 않는다"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from .tasks import task_sync_notion_pages
+
+        crashed, running = self._uploaded(), self._uploaded()
+        QnALog.objects.filter(pk=crashed.pk).update(notion_sync_claimed_at=timezone.now() - timedelta(minutes=10))
+        QnALog.objects.filter(pk=running.pk).update(notion_sync_claimed_at=timezone.now())
+
+        assert task_sync_notion_pages() == 1
+
+        mock_adapter_class.return_value.update_page_properties.assert_called_once()
+        assert QnALog.objects.get(pk=crashed.pk).notion_sync_claimed_at is None
+        assert QnALog.objects.get(pk=running.pk).notion_sync_claimed_at is not None
+
+    @patch("archiver.tasks.NotionAdapter")
+    def test_run_stops_after_time_budget(self, mock_adapter_class):
+        """작업 시간이 지나면 새 묶음을 가져가지 않고 남은 질문은 다음 주기로 넘긴다"""
+        from .hitcounter import increment_hit_count
+        from .tasks import task_sync_notion_pages
+
+        log = self._uploaded()
+        increment_hit_count(log.id)
+
+        with override_settings(NOTION_TASK_TIME_BUDGET=0):
+            assert task_sync_notion_pages() == 0
+
+        mock_adapter_class.return_value.update_page_properties.assert_not_called()
+        assert QnALog.objects.get(pk=log.pk).notion_dirty is True
+
+    @patch("archiver.tasks.NotionAdapter")
+    def test_backfill_pushes_only_hit_count_to_existing_pages(self, mock_adapter_class):
+        """마이그레이션으로 동기화 대상이 된 기존 페이지는 질문횟수만 보내 노션에서 고친 값을 덮어쓰지 않는다"""
+        from importlib import import_module
+
+        from django.apps import apps
+
+        from .tasks import task_sync_notion_pages
+
+        migration = import_module("archiver.migrations.0014_notion_page_sync")
+        log = self._uploaded(keywords="orm, queryset", category="Django", hit_count=4)
+
+        migration.create_sync_schedule(apps, None)
+
+        assert task_sync_notion_pages() == 1
+        mock_adapter_class.return_value.update_page_properties.assert_called_once_with(
+            "0123456789abcdef0123456789abcdef", {"질문횟수": {"number": 4}}
+        )
+        mock_adapter_class.return_value.replace_page_body.assert_not_called()
+
+    @override_settings(NOTION_TOKEN="test-token", NOTION_DB_ID="test-db-id", NOTION_RATE_LIMIT=0)
+    def test_answer_change_rebuilds_page_body(self):
+        """답변이 바뀌면 본문 블록을 모두 지우고 새 답변으로 다시 쓰며, 다른 속성만 바뀌면 본문은 건드리지 않는다"""
+        from .fakes import FakeNotionServer
+        from .tasks import task_drain_notion_outbox, task_sync_notion_pages
+
+        log = QnALog.objects.create(question_text="질문", title="제목", ai_answer="처음 답변", is_verified=True)
+        answer = "\n\n".join(f"{i}. 고친 설명" for i in range(150))
+
+        with FakeNotionServer() as server, override_settings(NOTION_API_URL=server.base_url):
+            task_drain_notion_outbox()
+            log = QnALog.objects.get(pk=log.pk)
+            old_ids = {block["id"] for block in server.blocks[log.notion_page_id]}
+
+            log.ai_answer = answer
+            log.save()
+            server.requests.clear()
+            assert task_sync_notion_pages() == 1
+            rebuild = list(server.requests)
+
+            log = QnALog.objects.get(pk=log.pk)
+            log.category = "Django"
+            log.save()
+            server.requests.clear()
+            assert task_sync_notion_pages() == 1
+
+        blocks = server.blocks[log.notion_page_id]
+        assert not old_ids & {block["id"] for block in blocks}
+        assert [block["paragraph"]["rich_text"][0]["text"]["content"] for block in blocks[3:]] == answer.split("\n\n")
+        # 속성 PATCH 1번 + 본문 조회 1번 + 기존 블록 4개 삭제 + 새 블록 153개를 100개씩 2번 추가
+        assert [request["method"] for request in rebuild] == ["PATCH", "GET", *["DELETE"] * 4, "PATCH", "PATCH"]
+        assert [request["path"] for request in server.requests] == [f"/v1/pages/{log.notion_page_id}"]
+
+    def test_changed_properties_clears_removed_keywords(self):
+        """노션에 반영한 값과 다른 속성만 고르고, 없어진 키워드는 비운다"""
+        from .adapters import build_notion_properties, changed_properties
+
+        synced = build_notion_properties(QnACreateDTO(question_text="질문", title="제목", keywords=["orm"], hit_count=2))
+        current = build_notion_properties(QnACreateDTO(question_text="질문", title="제목", keywords=[], hit_count=5))
+
+        assert changed_properties(current, synced) == {"질문횟수": {"number": 5}, "키워드": {"multi_select": []}}
+        assert changed_properties(synced, synced) == {}
+
+
+class TestNotionReverseSync:
+    """노션에서 고친 속성을 질문에 되가져오는 역동기화(task_pull_notion_edits) 테스트"""
+
+    @staticmethod
+    def _rich_text(content):
+        return {"rich_text": [{"type": "text", "plain_text": content, "text": {"content": content}}]}
+
+    @staticmethod
+    def _published(server, *answers):
+        """검증된 질문을 가짜 노션 서버에 업로드하고 다시 읽어 반환합니다"""
+        from .tasks import task_drain_notion_outbox
+
+        logs = [
+            QnALog.objects.create(question_text=f"질문 {i}", title=f"제목 {i}", ai_answer=answer, is_verified=True)
+            for i, answer in enumerate(answers)
+        ]
+        with override_settings(NOTION_API_URL=server.base_url):
+            task_drain_notion_outbox()
+        return [QnALog.objects.get(pk=log.pk) for log in logs]
+
+    @override_settings(NOTION_TOKEN="test-token", NOTION_DB_ID="test-db-id", NOTION_RATE_LIMIT=0)
+    def test_applies_only_edits_made_in_notion(self):
+        """노션에서 고친 페이지만 반영하고, 다음 실행은 기준점 이후에 수정된 페이지만 조회한다"""
+        from .models import NotionSyncCursor
+        from .tasks import task_pull_notion_edits, task_sync_notion_pages
+
+        from .fakes import FakeNotionServer
+
+        with FakeNotionServer() as server, override_settings(NOTION_API_URL=server.base_url):
+            edited, untouched = self._published(server, "원래 답변", "다른 답변")
+            # 처음 실행: 업로드한 페이지는 보낸 값과 같으므로 반영할 것이 없음
+            assert task_pull_notion_edits() == 0
+
+            server.edit_page(
+                edited.notion_page_id,
+                {"AI답변": self._rich_text("노션에서 고친 답변"), "카테고리": {"select": {"name": "Django"}}},
+            )
+            server.requests.clear()
+            assert task_pull_notion_edits() == 1
+            # 속성은 이미 노션 값과 같으므로 다시 보내지 않고, 고친 답변이 들어가도록 본문만 다시 씀
+            assert task_sync_notion_pages() == 1
+
+        queries = [request for request in server.requests if request["path"].endswith("/query")]
+        assert len(queries) == 1
+        assert "on_or_after" in queries[0]["body"]["filter"]["last_edited_time"]
+        assert not [request for request in server.requests if request["path"].startswith("/v1/pages/")]
+        body_text = [block["paragraph"]["rich_text"][0]["text"]["content"] for block in server.blocks[edited.notion_page_id] if block["type"] == "paragraph"]
+        assert body_text == ["질문 0", "노션에서 고친 답변"]
+
+        edited.refresh_from_db()
+        assert (edited.ai_answer, edited.category) == ("노션에서 고친 답변", "Django")
+        assert edited.notion_dirty is False
+        assert edited.notion_synced_properties["AI답변"]["rich_text"][0]["text"]["content"] == "노션에서 고친 답변"
+        assert QnALog.objects.get(pk=untouched.pk).ai_answer == "다른 답변"
+        assert NotionSyncCursor.objects.get().last_edited_time is not None
+
+    @override_settings(NOTION_TOKEN="test-token", NOTION_DB_ID="test-db-id", NOTION_RATE_LIMIT=0)
+    def test_edit_to_truncated_answer_keeps_unsent_tail(self):
+        """앞부분만 보냈던 긴 답변은 노션에서 고친 앞부분 뒤에 나머지를 이어 붙인다"""
+        from .tasks import task_pull_notion_edits
+
+        from .fakes import FakeNotionServer
+
+        answer = "가" * 1990 + "나" * 1000
+        with FakeNotionServer() as server, override_settings(NOTION_API_URL=server.base_url):
+            (log,) = self._published(server, answer)
+            server.edit_page(log.notion_page_id, {"AI답변": self._rich_text("다" + "가" * 1989)})
+            task_pull_notion_edits()
+
+        log.refresh_from_db()
+        assert log.ai_answer == "다" + "가" * 1989 + "나" * 1000
+
+    @override_settings(NOTION_TOKEN="test-token", NOTION_DB_ID="test-db-id", NOTION_RATE_LIMIT=0)
+    def test_query_follows_cursor_pagination(self):
+        """has_more인 동안 next_cursor로 이어서 조회한다"""
+        from .fakes import FakeNotionServer
+
+        with FakeNotionServer() as server, override_settings(NOTION_API_URL=server.base_url):
+            self._published(server, "답변 1", "답변 2", "답변 3")
+            server.requests.clear()
+            batches = list(NotionAdapter().query_edited_pages(page_size=2))
+
+        assert [len(batch) for batch in batches] == [2, 1]
+        assert [request["body"].get("start_cursor") for request in server.requests] == [None, "2"]
+
+
 class TestQnAModelToCreateDTO:
     """QnALog -> QnACreateDTO 변환 테스트"""
 
@@ -461,9 +1269,8 @@ class TestQnAModelToResponseDTO:
 class TestGeminiAdapter:
     """GeminiAdapter 단위 테스트"""
 
-    @patch("archiver.adapters.genai")
     @override_settings(Gemini_API_KEY= 'test-api-key')
-    def test_generate_answer_success(self, mock_genai):
+    def test_generate_answer_success(self, mock_genai_client):
         """AI 응답 성공시 QnACreateDTO 반환"""
 
         mock_response = MagicMock()
@@ -475,9 +1282,7 @@ class TestGeminiAdapter:
 1. **문제 요약**: N+1 쿼리 문제      
 """
 
-        mock_model = MagicMock()
-        mock_model.generate_content.return_value = mock_response
-        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai_client.models.generate_content.return_value = mock_response
 
         adapter = GeminiAdapter()
         result = adapter.generate_answer("Django ORM 최적화 방법")
@@ -486,54 +1291,82 @@ class TestGeminiAdapter:
         assert result.title == "Django ORM 최적화"
         assert result.category == "Django"
 
-    @patch("archiver.adapters.genai")
     @override_settings(GEMINI_API_KEY='test-api-key')
-    def test_generate_answer_blocked_response(self, mock_genai):
+    def test_generate_answer_blocked_response(self, mock_genai_client):
         """AI 응답이 차단되면 LLMServiceError 발생"""
 
         mock_response = MagicMock()
         mock_response.prompt_feedback.block_reason = "SAFETY"
 
-        mock_model = MagicMock()
-        mock_model.generate_content.return_value = mock_response
-        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai_client.models.generate_content.return_value = mock_response
 
         adapter = GeminiAdapter()
 
         with pytest.raises(LLMServiceError, match="차단"):
             adapter.generate_answer("테스트 질문")
 
-    @patch("archiver.adapters.genai")
     @override_settings(GEMINI_API_KEY='test-api-key')
-    def test_generate_answer_empty_response(self, mock_genai):
+    def test_generate_answer_empty_response(self, mock_genai_client):
         """AI 응답이 비어있으면 LLMServiceError 발생"""
         mock_response = MagicMock()
-        mock_response.prompt_feedback.block_reason = None
+        mock_response.prompt_feedback = None
         mock_response.text = None
         mock_response.candidates = []
 
-        mock_model = MagicMock()
-        mock_model.generate_content.return_value = mock_response
-        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai_client.models.generate_content.return_value = mock_response
 
         adapter = GeminiAdapter()
 
         with pytest.raises(LLMServiceError, match="비어있습니다"):
             adapter.generate_answer("테스트 질문")
 
-    @patch("archiver.adapters.genai")
     @override_settings(GEMINI_API_KEY="test-api-key")
-    def test_generate_answer_quota_exceeded(self, mock_genai):
+    def test_generate_answer_quota_exceeded(self, mock_genai_client):
         """API 할달량 초과시 LLMServiceError 발생"""
-        mock_model = MagicMock()
-        mock_model.generate_content.side_effect = Exception("quota exceeded")
-        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai_client.models.generate_content.side_effect = Exception("quota exceeded")
 
         adapter = GeminiAdapter()
 
         with pytest.raises(LLMServiceError, match= "할달량 초과"):
             adapter.generate_answer("테스트 질문")
 
+    @override_settings(GEMINI_API_KEY="test-api-key", GEMINI_CACHE_ENABLED=False)
+    def test_client_is_reused_across_adapters(self, mock_genai_client):
+        """genai.Client는 프로세스에서 한 번만 만들어 재사용한다"""
+        from google import genai
+
+        mock_response = MagicMock()
+        mock_response.prompt_feedback.block_reason = None
+        mock_response.text = "제목: 재사용\n카테고리: General\n키워드: a, b, c"
+        mock_genai_client.models.generate_content.return_value = mock_response
+
+        GeminiAdapter().generate_answer("첫 번째 질문")
+        GeminiAdapter().generate_answer("두 번째 질문")
+
+        genai.Client.assert_called_once()
+        assert genai.Client.call_args.kwargs["api_key"] == "test-api-key"
+        assert mock_genai_client.models.generate_content.call_count == 2
+        assert mock_genai_client.models.generate_content.call_args.kwargs["model"] == "models/gemini-2.5-flash"
+
+    @override_settings(GEMINI_API_KEY="test-api-key", GEMINI_CACHE_ENABLED=False)
+    def test_image_is_sent_as_inline_part(self, mock_genai_client):
+        """전처리한 이미지 바이트는 형식을 붙인 Part로 프롬프트 앞에 보낸다"""
+        from google.genai import types
+
+        png = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+        mock_response = MagicMock()
+        mock_response.prompt_feedback.block_reason = None
+        mock_response.text = "제목: 이미지\n카테고리: General\n키워드: a, b, c"
+        mock_genai_client.models.generate_content.return_value = mock_response
+
+        GeminiAdapter().generate_answer("이미지 질문", png)
+
+        image_part, prompt = mock_genai_client.models.generate_content.call_args.kwargs["contents"]
+        assert isinstance(image_part, types.Part)
+        assert image_part.inline_data.data == png
+        assert image_part.inline_data.mime_type == "image/png"
+        assert "이미지 질문" in prompt
+
     @override_settings(GEMINI_API_KEY=None)
     def test_init_witout_api_key_raises_error(self):
         """API 키가 없으면 LLMServiceError 발생"""
@@ -542,10 +1375,95 @@ class TestGeminiAdapter:
 
 
 
+class TestGeminiResponseCache:
+    """Gemini 응답 캐시 테스트"""
+
+    @pytest.fixture
+    def mock_model(self, mock_genai_client):
+        mock_response = MagicMock()
+        mock_response.prompt_feedback.block_reason = None
+        mock_response.text = "제목: 캐시 테스트\n카테고리: Django\n키워드: 캐시, 테스트, 응답\n\n1. **문제 요약**: 캐시"
+        mock_model = mock_genai_client.models
+        mock_model.generate_content.return_value = mock_response
+        yield mock_model
+
+    @override_settings(GEMINI_API_KEY="test-api-key")
+    def test_identical_input_is_served_from_cache(self, mock_model):
+        """같은 질문/이미지는 두 번째부터 모델을 호출하지 않는다"""
+        from .llm_cache import get_response_cache
+
+        adapter = GeminiAdapter()
+        first = adapter.generate_answer("캐시 질문", b"image-bytes")
+        second = GeminiAdapter().generate_answer("캐시 질문", b"image-bytes")
+
+        assert mock_model.generate_content.call_count == 1
+        assert second.title == first.title == "캐시 테스트"
+        assert get_response_cache().stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    @override_settings(GEMINI_API_KEY="test-api-key")
+    def test_different_image_is_a_miss(self, mock_model):
+        """이미지가 다르면 같은 질문이라도 다시 호출한다"""
+        adapter = GeminiAdapter()
+        adapter.generate_answer("캐시 질문", b"image-a")
+        adapter.generate_answer("캐시 질문", b"image-b")
+
+        assert mock_model.generate_content.call_count == 2
+
+    @override_settings(GEMINI_API_KEY="test-api-key", GEMINI_CACHE_TTL=0)
+    def test_expired_entry_is_not_used(self, mock_model):
+        """TTL이 지난 응답은 사용하지 않는다"""
+        adapter = GeminiAdapter()
+        adapter.generate_answer("캐시 질문")
+        adapter.generate_answer("캐시 질문")
+
+        assert mock_model.generate_content.call_count == 2
+
+    def test_least_recently_used_entry_is_evicted(self, tmp_path):
+        """최대 개수를 넘으면 가장 오래 안 쓰인 항목부터 지운다"""
+        from .llm_cache import ResponseCache
+
+        cache = ResponseCache(tmp_path / "lru.sqlite3", ttl=3600, max_entries=2)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        assert cache.get("a") == "A"
+        cache.set("c", "C")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.get("c") == "C"
+
+    def test_lookup_does_not_take_write_lock(self, tmp_path):
+        """다른 프로세스가 쓰기 잠금을 잡고 있어도 조회는 기다리지 않고 값을 읽는다"""
+        import sqlite3
+        from .llm_cache import ResponseCache
+
+        cache = ResponseCache(tmp_path / "read.sqlite3", ttl=3600, max_entries=10)
+        cache.set("a", "A")
+        writer = sqlite3.connect(tmp_path / "read.sqlite3", isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            assert cache.get("a") == "A"
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+
+    @override_settings(GEMINI_API_KEY="test-api-key")
+    def test_cache_errors_fall_back_to_gemini(self, mock_model):
+        """캐시 파일 오류(잠금 대기 초과 등)는 요청을 실패시키지 않고 캐시 없이 모델을 호출한다"""
+        import sqlite3
+        from .llm_cache import ResponseCache
+
+        with patch.object(ResponseCache, "_connection", side_effect=sqlite3.OperationalError("database is locked")):
+            dto = GeminiAdapter().generate_answer("잠긴 캐시 질문")
+
+        assert dto.title == "캐시 테스트"
+        assert mock_model.generate_content.call_count == 1
+
+
 class TestNotionAdapter:
     """NotionAdapter 단위 테스트"""
 
-    @patch("archiver.adapters.requests.post")
+    @patch("archiver.adapters.requests.Session.request")
     @override_settings(NOTION_TOKEN='test-token', NOTION_DB_ID='test-db-id')
     def test_create_qna_page_success(self, mock_post):
         """노션 페이지 생성 성공시 URL 반환"""
@@ -570,7 +1488,7 @@ class TestNotionAdapter:
         assert result == "https://notion.so/test-page-123"
         mock_post.assert_called_once()
 
-    @patch("archiver.adapters.requests.post")
+    @patch("archiver.adapters.requests.Session.request")
     @override_settings(NOTION_TOKEN='test-token', NOTION_DB_ID='test-db-id')
     def test_create_qna_page_api_error(self, mock_post):
         """노션 API 에러 시 NOtionAPIError 발생"""
@@ -594,7 +1512,7 @@ class TestNotionAdapter:
         with pytest.raises(NotionAPIError, match="노션 API 에러"):
             adapter.create_qna_page(dto)
 
-    @patch("archiver.adapters.requests.post")
+    @patch("archiver.adapters.requests.Session.request")
     @override_settings(NOTION_TOKEN='test-token', NOTION_DB_ID='test-db-id')
     def test_create_qna_page_network_error(self, mock_post):
         """네트워크 오류 시 NotionAPIError 발생"""
@@ -614,6 +1532,100 @@ class TestNotionAdapter:
         with pytest.raises(NotionAPIError, match="연결 실패"):
             adapter.create_qna_page(dto)
 
+    @patch("archiver.adapters.time.sleep")
+    @patch("archiver.adapters.requests.Session.request")
+    @override_settings(NOTION_TOKEN='test-token', NOTION_DB_ID='test-db-id', NOTION_RATE_LIMIT=0)
+    def test_create_page_is_not_retried_on_server_error(self, mock_request, mock_sleep):
+        """페이지 생성은 5xx에 재시도하지 않고(중복 생성 방지), JSON이 아닌 에러 본문도 NotionAPIError로 알린다"""
+        mock_response = MagicMock(status_code=502, text="<html>Bad Gateway</html>")
+        mock_response.json.side_effect = ValueError("Expecting value")
+        mock_request.return_value = mock_response
+
+        dto = QnACreateDTO(question_text="질문", title="제목", ai_answer="답변", category="General", keywords=[], hit_count=1)
+
+        with pytest.raises(NotionAPIError, match="HTTP 502"):
+            NotionAdapter().create_qna_page(dto)
+        assert mock_request.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("archiver.adapters.time.sleep")
+    @patch("archiver.adapters.requests.Session.request")
+    @override_settings(NOTION_TOKEN='test-token', NOTION_DB_ID='test-db-id', NOTION_RATE_LIMIT=0)
+    def test_property_update_is_retried_on_server_error(self, mock_request, mock_sleep):
+        """속성 수정처럼 다시 보내도 결과가 같은 요청은 5xx 뒤에 재시도한다"""
+        unavailable = MagicMock(status_code=503, headers={})
+        ok = MagicMock(status_code=200)
+        ok.json.return_value = {"id": "page-1"}
+        mock_request.side_effect = [unavailable, ok]
+
+        NotionAdapter().update_page_properties("page-1", {"이름": {"title": []}})
+
+        assert mock_request.call_count == 2
+        assert mock_sleep.call_count == 1
+
+    @override_settings(NOTION_TOKEN='test-token', NOTION_DB_ID='test-db-id', NOTION_RATE_LIMIT=0)
+    def test_reuses_keep_alive_connection(self):
+        """여러 번 호출해도 프로세스 공용 세션의 연결 하나를 재사용한다"""
+        from .fakes import FakeNotionServer
+
+        dto = QnACreateDTO(question_text="질문", title="제목", ai_answer="답변", category="General", keywords=[], hit_count=1)
+        with FakeNotionServer() as server, override_settings(NOTION_API_URL=server.base_url):
+            for _ in range(3):
+                NotionAdapter().create_qna_page(dto)
+
+        assert len(server.requests) == 3
+        assert server.connections == 1
+
+    @override_settings(NOTION_TOKEN='test-token', NOTION_DB_ID='test-db-id', NOTION_RATE_LIMIT=0)
+    def test_retries_after_rate_limited_response(self):
+        """429 응답은 Retry-After만큼 기다린 뒤 재시도해서 성공한다"""
+        from .fakes import FakeNotionServer
+
+        dto = QnACreateDTO(question_text="질문", title="제목", ai_answer="답변", category="General", keywords=[], hit_count=1)
+        with FakeNotionServer(rate_limit=10, burst=1) as server, override_settings(NOTION_API_URL=server.base_url):
+            urls = [NotionAdapter().create_qna_page(dto) for _ in range(3)]
+
+        assert all(url.startswith("https://www.notion.so/") for url in urls)
+        assert server.rate_limited > 0
+
+    @override_settings(NOTION_TOKEN='test-token', NOTION_DB_ID='test-db-id', NOTION_RATE_LIMIT=0)
+    def test_short_answer_is_created_in_one_request(self):
+        """본문 블록이 100개 이하면 페이지 생성 요청 하나로 끝난다"""
+        from .fakes import FakeNotionServer
+
+        answer = "1. **문제 요약**: 설명\n\n```py\nprint('hi')\n```\n\n2. 정리"
+        dto = QnACreateDTO(question_text="질문", title="제목", ai_answer=answer, category="General", keywords=[], hit_count=1)
+        with FakeNotionServer() as server, override_settings(NOTION_API_URL=server.base_url):
+            NotionAdapter().create_qna_page(dto)
+
+        assert len(server.requests) == 1
+        blocks = server.requests[0]["body"]["children"]
+        assert [block["type"] for block in blocks] == ["heading_2", "paragraph", "heading_2", "paragraph", "code", "paragraph"]
+        assert blocks[4]["code"] == {"rich_text": [{"type": "text", "text": {"content": "print('hi')"}}], "language": "python"}
+
+    @override_settings(NOTION_TOKEN='test-token', NOTION_DB_ID='test-db-id', NOTION_RATE_LIMIT=0)
+    def test_long_answer_is_written_in_full_with_batched_appends(self):
+        """긴 답변은 잘리지 않고 블록 제한에 맞춰 나뉘며, 100개씩 최소 횟수로 이어 붙인다"""
+        from .adapters import notion_page_id
+        from .fakes import FakeNotionServer
+
+        code = "\n".join(f"    print('line {i}')  # {'x' * 40}" for i in range(4000))
+        paragraphs = "\n\n".join(f"{i}. 설명 문단" for i in range(230))
+        answer = f"{paragraphs}\n\n```python\n{code}\n```\n\n마지막 문단"
+        dto = QnACreateDTO(question_text="질문", title="제목", ai_answer=answer, category="General", keywords=[], hit_count=1)
+
+        with FakeNotionServer() as server, override_settings(NOTION_API_URL=server.base_url):
+            url = NotionAdapter().create_qna_page(dto)
+
+        blocks = server.blocks[notion_page_id(url)]
+        # 제목 2개 + 질문 1개 + 문단 230개 + 코드 2개(rich_text 100개 초과) + 마지막 문단 = 236개 → 생성 1번 + 추가 2번
+        assert len(blocks) == 236
+        assert [request["method"] for request in server.requests] == ["POST", "PATCH", "PATCH"]
+        code_blocks = [block["code"] for block in blocks if block["type"] == "code"]
+        assert len(code_blocks) == 2
+        assert "".join(text["text"]["content"] for block in code_blocks for text in block["rich_text"]) == code
+        assert blocks[-1]["paragraph"]["rich_text"][0]["text"]["content"] == "마지막 문단"
+
     @override_settings(NOTION_TOKEN=None, NOTION_DB_ID='tset-db-id')
     def test_init_without_token_raises_error(self):
         """NOTION_TOKEN이 없으면 NotionAPIError 발생"""
@@ -649,9 +1661,8 @@ class TestProcessQuestionFlowFailure:
 class  TestQnALogModel:
     """QnALog 모델 테스트"""
 
-    @patch("archiver.models.async_task")
-    def test_save_calls_async_task_when_verified_without_notion_url(self, mock_async_task):
-        """is_verified=Ture이고 notion_url이 없으면 async_task 호출"""
+    def test_verifying_writes_one_outbox_entry(self):
+        """is_verified=True이고 notion_url이 없으면 outbox에 업로드를 한 번 기록"""
         # Given
         log = QnALog.objects.create(
             question_text="테스트 질문",
@@ -664,14 +1675,45 @@ class  TestQnALogModel:
         log.save()
 
         # Then
-        mock_async_task.assert_called_once_with(
-            "archiver.tasks.task_process_question",
-            log.id
+        entry = log.notion_outbox.get()
+        assert entry.status == NotionSyncState.PENDING
+        assert entry.idempotency_key == f"qna:{log.id}:create"
+        assert QnALog.objects.get(pk=log.pk).notion_sync_state == NotionSyncState.PENDING
+
+    def test_repeated_saves_do_not_enqueue_again(self):
+        """목록 수정/hit_count 저장/다른 인스턴스 저장을 반복해도 업로드 예약은 하나"""
+        log = QnALog.objects.create(
+            question_text="테스트 질문",
+            title="테스트 제목",
+            ai_answer="테스트 답변",
+            is_verified=True,
         )
+        stale = QnALog.objects.get(pk=log.pk)
+        stale.notion_sync_state = NotionSyncState.NONE  # 예약 전에 읽어 둔 인스턴스
 
-    @patch("archiver.models.async_task")
-    def test_save_does_not_call_async_task_when_not_verified(self, mock_async_task):
-        """is_verified=False이면 async_task 호출 안됨"""
+        log.category = "Django"
+        log.save()
+        log.hit_count += 1
+        log.save(update_fields=["hit_count"])
+        stale.save()
+
+        assert log.notion_outbox.count() == 1
+        assert QnALog.objects.get(pk=log.pk).notion_sync_state == NotionSyncState.PENDING
+
+    def test_dispatcher_is_enqueued_only_after_commit(self, django_capture_on_commit_callbacks):
+        """디스패처 태스크는 트랜잭션이 커밋된 뒤에 등록된다"""
+        with patch("archiver.models.async_task") as mock_async_task:
+            with django_capture_on_commit_callbacks(execute=True) as callbacks:
+                QnALog.objects.create(
+                    question_text="테스트 질문", title="테스트 제목", ai_answer="테스트 답변", is_verified=True
+                )
+                mock_async_task.assert_not_called()
+
+        assert len(callbacks) == 1
+        mock_async_task.assert_called_once_with("archiver.tasks.task_drain_notion_outbox")
+
+    def test_save_does_not_enqueue_when_not_verified(self):
+        """is_verified=False이면 outbox에 기록하지 않음"""
         log = QnALog.objects.create(
             question_text="테스트 질문",
             title="테스트 제목",
@@ -679,11 +1721,11 @@ class  TestQnALogModel:
             is_verified = False
         )
 
-        mock_async_task.assert_not_called()
+        assert not log.notion_outbox.exists()
+        assert log.notion_sync_state == NotionSyncState.NONE
 
-    @patch("archiver.models.async_task")
-    def test_save_does_not_call_async_task_when_notion_url_exists(self, mock_async_task):
-        """notion_page_url 이 이미 있으면 async_task 호출 안됨"""
+    def test_save_does_not_enqueue_when_notion_url_exists(self):
+        """notion_page_url 이 이미 있으면 outbox에 기록하지 않음"""
         log = QnALog.objects.create(
             question_text="테스트 질문",
             title="테스트 제목",
@@ -692,7 +1734,7 @@ class  TestQnALogModel:
             notion_page_url="https://notion.so/existing-page"
         )
 
-        mock_async_task.assert_not_called()
+        assert not log.notion_outbox.exists()
 
     def test_str_returns_formated_string(self, db):
         """__str__이 올바른 형식의 문자열 반환"""
@@ -704,4 +1746,1074 @@ class  TestQnALogModel:
             hit_count = 5
         )
 
-        assert str(log) == "[Django] 테스트 제목 (빈도: 5)"
\ No newline at end of file
+        assert str(log) == "[Django] 테스트 제목 (빈도: 5)"
+
+
+# ==================================================================================
+# 비동기(ASGI) 경로 테스트
+# ==================================================================================
+
+@pytest.fixture
+def qna_bot_async_url():
+    """비동기 API 엔드포인트 URL을 제공하는 Fixture"""
+    return reverse("archiver:qna_bot_async")
+
+
+class TestAsyncQnABotAPI:
+    """AsyncQnABotAPIView의 주요 흐름을 테스트합니다"""
+
+    def test_new_question_flow(self, client, qna_bot_async_url, mock_gemini_adapter, mock_notion_adapter, mock_async_task):
+        """신규 질문은 async Gemini 호출 후 DB에 저장되고 new 상태로 응답"""
+        mock_gemini_adapter.agenerate_answer = AsyncMock(
+            return_value=mock_gemini_adapter.generate_answer.return_value
+        )
+
+        response = client.post(
+            qna_bot_async_url, {"question_text": "비동기 경로 질문"}, content_type="application/json"
+        )
+
+        assert response.status_code == 200
+        response_data = response.json()
+        assert response_data["status"] == "new"
+        created_log = QnALog.objects.get()
+        assert response_data["id"] == created_log.id
+        assert created_log.title == "AI가 생성한 테스트 제목"
+        mock_gemini_adapter.agenerate_answer.assert_awaited_once()
+        mock_gemini_adapter.generate_answer.assert_not_called()
+        assert created_log.notion_outbox.get().status == NotionSyncState.PENDING
+
+    def test_similar_question_skips_llm(self, client, qna_bot_async_url, mock_gemini_adapter, mock_notion_adapter):
+        """검증된 유사 질문이 있으면 Gemini를 호출하지 않고 hit_count를 올림"""
+        mock_gemini_adapter.agenerate_answer = AsyncMock()
+        existing = QnALog.objects.create(
+            question_text="Django ORM 사용법",
+            title="Django ORM",
+            ai_answer="ORM 사용법 답변",
+            is_verified=True,
+            notion_page_url="https://notion.so/existing-page",
+            hit_count=2,
+        )
+
+        response = client.post(
+            qna_bot_async_url, {"question_text": "Django ORM 사용법"}, content_type="application/json"
+        )
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "similar_found"
+        existing.refresh_from_db()
+        assert existing.hit_count == 3
+        mock_gemini_adapter.agenerate_answer.assert_not_awaited()
+
+    def test_llm_error_returns_503(self, client, qna_bot_async_url, mock_gemini_adapter, mock_notion_adapter):
+        """Gemini 오류는 503으로 응답"""
+        mock_gemini_adapter.agenerate_answer = AsyncMock(side_effect=LLMServiceError("AI 오류"))
+
+        response = client.post(
+            qna_bot_async_url, {"question_text": "오류 질문"}, content_type="application/json"
+        )
+
+        assert response.status_code == 503
+        assert QnALog.objects.count() == 0
+
+    def test_pending_question_returns_duplicate(self, client, qna_bot_async_url, mock_gemini_adapter, mock_notion_adapter):
+        """검토 전 동일 질문이 있으면 Gemini를 호출하지 않고 duplicate로 응답"""
+        mock_gemini_adapter.agenerate_answer = AsyncMock()
+        QnALog.objects.create(question_text="가상환경 활성화 오류", title="가상환경", ai_answer="activate 스크립트를 실행하세요")
+
+        response = client.post(
+            qna_bot_async_url, {"question_text": "가상환경 활성화 오류"}, content_type="application/json"
+        )
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "duplicate"
+        assert response.json()["ai_answer"] == "activate 스크립트를 실행하세요"
+        mock_gemini_adapter.agenerate_answer.assert_not_awaited()
+
+    def test_invalid_json_returns_400(self, client, qna_bot_async_url, mock_gemini_adapter, mock_notion_adapter):
+        """잘못된 JSON은 400으로 응답"""
+        response = client.post(qna_bot_async_url, "{", content_type="application/json")
+
+        assert response.status_code == 400
+
+
+class TestGeminiAdapterAsync:
+    """GeminiAdapter.agenerate_answer 단위 테스트"""
+
+    @override_settings(GEMINI_API_KEY="test-api-key")
+    def test_agenerate_answer_success(self, mock_genai_client):
+        """async SDK 호출 결과를 QnACreateDTO로 변환"""
+        import asyncio
+
+        mock_response = MagicMock()
+        mock_response.prompt_feedback.block_reason = None
+        mock_response.text = "제목: 비동기 테스트\n카테고리: Python\n키워드: async, await"
+        mock_genai_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
+
+        result = asyncio.run(GeminiAdapter().agenerate_answer("비동기 질문"))
+
+        assert result.title == "비동기 테스트"
+        assert result.category == "Python"
+        mock_genai_client.models.generate_content.assert_not_called()
+
+    @override_settings(GEMINI_API_KEY="test-api-key")
+    def test_agenerate_answer_quota_exceeded(self, mock_genai_client):
+        """할당량 초과 예외는 LLMServiceError로 변환"""
+        import asyncio
+
+        mock_genai_client.aio.models.generate_content = AsyncMock(side_effect=Exception("quota exceeded"))
+
+        with pytest.raises(LLMServiceError, match="할달량 초과"):
+            asyncio.run(GeminiAdapter().agenerate_answer("테스트 질문"))
+
+    @override_settings(GEMINI_API_KEY="test-api-key")
+    def test_astream_answer_yields_chunks(self, mock_genai_client):
+        """스트리밍 응답 조각을 순서대로 돌려준다"""
+        import asyncio
+
+        async def chunks():
+            for text in ("제목: 스트리밍\n", "카테고리: Python\n", "키워드: sse"):
+                yield MagicMock(text=text)
+
+        stream = mock_genai_client.aio.models.generate_content_stream = AsyncMock(return_value=chunks())
+
+        async def collect():
+            return [text async for text in GeminiAdapter().astream_answer("스트리밍 질문")]
+
+        assert asyncio.run(collect()) == ["제목: 스트리밍\n", "카테고리: Python\n", "키워드: sse"]
+        assert stream.call_args.kwargs["model"] == "models/gemini-2.5-flash"
+
+
+
+# ==================================================================================
+# 임베딩 기반 유사 질문 검색 테스트
+# ==================================================================================
+
+class TestEmbeddingIndex:
+    """디스크 기반 임베딩 인덱스 단위 테스트"""
+
+    @pytest.fixture
+    def backend(self):
+        from .embeddings import HashingEmbeddingBackend
+        return HashingEmbeddingBackend()
+
+    def test_search_returns_top_k_per_query(self, tmp_path, backend):
+        """여러 질의를 한 번에 검색하면 질의별로 가장 가까운 id가 먼저 나온다"""
+        from .embeddings import EmbeddingIndex
+
+        index = EmbeddingIndex(tmp_path)
+        index.upsert(1, backend.embed(["장고 마이그레이션이 적용되지 않습니다"])[0])
+        index.upsert(2, backend.embed(["git push 할 때 rejected 에러가 납니다"])[0])
+
+        results = index.search(
+            backend.embed(["장고 마이그레이션이 적용이 안 됩니다", "git push 하면 rejected 에러가 나요"]), k=2
+        )
+
+        assert [r[0][0] for r in results] == [1, 2]
+        assert all(len(r) == 2 for r in results)
+        assert results[0][0][1] > results[0][1][1]
+
+    def test_upsert_replaces_and_remove_deletes(self, tmp_path, backend):
+        """같은 id는 교체되고, 제거하면 검색 대상에서 빠진다"""
+        from .embeddings import EmbeddingIndex
+
+        index = EmbeddingIndex(tmp_path)
+        index.upsert(1, backend.embed(["첫 번째 질문"])[0])
+        index.upsert(1, backend.embed(["수정된 질문"])[0])
+        assert len(index) == 1
+
+        assert index.remove(1) is True
+        assert index.remove(1) is False
+        assert 1 not in index
+        assert index.search(backend.embed(["수정된 질문"])) == [[]]
+
+    def test_reader_sees_writes_from_other_instance(self, tmp_path, backend):
+        """다른 프로세스(인스턴스)가 쓴 내용을 다시 매핑해 읽는다"""
+        from .embeddings import EmbeddingIndex
+
+        reader = EmbeddingIndex(tmp_path)
+        writer = EmbeddingIndex(tmp_path)
+        assert len(reader) == 0
+
+        writer.upsert(7, backend.embed(["가상환경 활성화가 안돼요"])[0])
+
+        assert 7 in reader
+        assert reader.search(backend.embed(["가상환경 활성화가 안돼요"]))[0][0][0] == 7
+
+    def test_changes_are_appended_without_rewriting_matrix(self, tmp_path, backend):
+        """추가/교체/삭제는 기준 행렬을 다시 쓰지 않고 delta에 덧붙이며, 삭제한 기준 행은 검색에서 빠진다"""
+        from .embeddings import EmbeddingIndex
+
+        index = EmbeddingIndex(tmp_path, max_delta=100)
+        index.rebuild([1, 2], backend.embed(["장고 마이그레이션 오류", "git push rejected"]))
+        version = (tmp_path / "CURRENT").read_text()
+
+        index.upsert(3, backend.embed(["가상환경 활성화가 안돼요"])[0])
+        index.upsert(1, backend.embed(["파이썬 들여쓰기 오류"])[0])
+        assert index.remove(2) is True
+
+        assert (tmp_path / "CURRENT").read_text() == version
+        assert len(index) == 2 and 2 not in index
+        assert index.search(backend.embed(["파이썬 들여쓰기 오류"]), k=5)[0][0][0] == 1
+        assert 2 not in [log_id for log_id, _ in index.search(backend.embed(["git push rejected"]), k=5)[0]]
+
+    def test_delta_is_compacted_into_new_version(self, tmp_path, backend):
+        """delta가 max_delta개 쌓이면 기준 행렬과 합친 새 버전으로 바꾸고 검색 결과는 그대로다"""
+        from .embeddings import DELTA_FILE, EmbeddingIndex
+
+        index = EmbeddingIndex(tmp_path, max_delta=3)
+        index.upsert(1, backend.embed(["첫 번째 질문"])[0])
+        version = (tmp_path / "CURRENT").read_text()
+        index.upsert(2, backend.embed(["두 번째 질문"])[0])
+        index.upsert(3, backend.embed(["세 번째 질문"])[0])
+        assert index.remove(1) is True
+
+        new_version = (tmp_path / "CURRENT").read_text()
+        assert new_version != version
+        assert not (tmp_path / new_version / DELTA_FILE).exists()
+        results = EmbeddingIndex(tmp_path).search(backend.embed(["세 번째 질문"]), k=5)[0]
+        assert [log_id for log_id, _ in results][0] == 3
+        assert {log_id for log_id, _ in results} == {2, 3}
+        assert len(index) == 2 and 1 not in index
+
+    def test_partially_written_record_is_ignored(self, tmp_path, backend):
+        """쓰는 중인 마지막 delta 레코드(일부만 기록된 상태)는 읽지 않는다"""
+        from .embeddings import DELTA_FILE, EmbeddingIndex
+
+        index = EmbeddingIndex(tmp_path, max_delta=100)
+        index.upsert(1, backend.embed(["첫 번째 질문"])[0])
+        index.upsert(2, backend.embed(["두 번째 질문"])[0])
+        with open(tmp_path / (tmp_path / "CURRENT").read_text() / DELTA_FILE, "ab") as f:
+            f.write(b"\x03\x00\x00")
+
+        assert len(EmbeddingIndex(tmp_path)) == 2
+
+
+class TestGeminiEmbeddingBackend:
+    """google.genai 클라이언트를 사용하는 Gemini 임베딩 백엔드 테스트"""
+
+    @override_settings(GEMINI_API_KEY="test-key")
+    def test_embeds_batch_with_one_request(self, mock_genai_client):
+        """여러 문장을 요청 하나로 임베딩하고 입력 순서대로 정규화된 행렬을 돌려준다"""
+        from google import genai
+        from .embeddings import GeminiEmbeddingBackend
+
+        embed_content = mock_genai_client.models.embed_content
+        embed_content.return_value = Mock(embeddings=[Mock(values=[3.0, 4.0]), Mock(values=[0.0, 2.0])])
+
+        vectors = GeminiEmbeddingBackend().embed(["첫 번째 질문", "두 번째 질문"])
+
+        assert genai.Client.call_args.kwargs["api_key"] == "test-key"
+        embed_content.assert_called_once_with(model="models/text-embedding-004", contents=["첫 번째 질문", "두 번째 질문"])
+        assert vectors.dtype.name == "float32"
+        assert vectors.shape == (2, 2)
+        assert vectors.ravel().tolist() == pytest.approx([0.6, 0.8, 0.0, 1.0])
+
+    @override_settings(GEMINI_API_KEY="test-key")
+    def test_api_error_raises_llm_service_error(self, mock_genai_client):
+        """API 호출이 실패하면 LLMServiceError로 감싼다"""
+        from .embeddings import GeminiEmbeddingBackend
+
+        mock_genai_client.models.embed_content.side_effect = RuntimeError("quota exceeded")
+
+        with pytest.raises(LLMServiceError, match="임베딩 생성 실패"):
+            GeminiEmbeddingBackend().embed(["질문"])
+
+
+@pytest.fixture
+def hybrid_settings(tmp_path):
+    """로컬 해시 임베딩을 사용하는 hybrid 모드 설정"""
+    with override_settings(
+        SIMILARITY_MODE="hybrid",
+        EMBEDDING_BACKEND="archiver.embeddings.HashingEmbeddingBackend",
+        EMBEDDING_INDEX_DIR=str(tmp_path / "embeddings"),
+        EMBEDDING_SIMILARITY_THRESHOLD=0.6,
+    ):
+        yield
+
+
+class TestHybridSimilarity:
+    """trigram + 임베딩 하이브리드 유사도 검색 테스트"""
+
+    def test_verifying_question_enqueues_embedding_sync(self, hybrid_settings):
+        """검증 상태가 바뀔 때만 임베딩 갱신 태스크를 등록한다"""
+        log = QnALog.objects.create(question_text="질문", title="제목", ai_answer="답변")
+
+        with patch("archiver.models.async_task") as mock_async_task:
+            log.is_verified = True
+            log.notion_page_url = "https://notion.so/page"
+            log.save()
+            log.hit_count += 1
+            log.save(update_fields=["hit_count"])
+
+        mock_async_task.assert_called_once_with("archiver.tasks.task_sync_embedding", log.id)
+
+    def test_paraphrase_is_found_through_embedding_index(self, hybrid_settings, mock_qna_service):
+        """trigram으로 못 찾는 표현 차이도 임베딩 인덱스로 찾는다"""
+        from .tasks import task_sync_embedding
+
+        with patch("archiver.models.async_task"):
+            existing = QnALog.objects.create(
+                question_text="장고 마이그레이션이 적용되지 않습니다",
+                title="마이그레이션",
+                ai_answer="migrate 명령을 실행하세요",
+                is_verified=True,
+                notion_page_url="https://notion.so/page",
+            )
+        task_sync_embedding(existing.id)
+
+        with patch.object(QnAService, "_similar_queryset") as mock_trigram:
+            mock_trigram.return_value.first.return_value = None
+            result = mock_qna_service.check_similarity("장고 마이그레이션이 적용이 안 됩니다")
+
+        assert result["status"] == "similar_found"
+        assert result["data"]["id"] == existing.id
+
+    def test_unverified_question_is_removed_from_index(self, hybrid_settings):
+        """검증 해제된 질문은 인덱스에서 제거된다"""
+        from .embeddings import get_embedding_index
+        from .tasks import task_sync_embedding
+
+        with patch("archiver.models.async_task"):
+            log = QnALog.objects.create(
+                question_text="리눅스 권한 오류", title="권한", ai_answer="chmod", is_verified=True,
+                notion_page_url="https://notion.so/page",
+            )
+            task_sync_embedding(log.id)
+            assert log.id in get_embedding_index()
+
+            log.is_verified = False
+            log.save()
+            task_sync_embedding(log.id)
+
+        assert log.id not in get_embedding_index()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestHitCount:
+    """hit_count 동시 증가 테스트"""
+
+    def _run_concurrently(self, target, workers=8):
+        import threading
+        from django.db import connection
+
+        def run():
+            try:
+                target()
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def test_concurrent_increments_are_not_lost(self):
+        """여러 스레드가 같은 행을 동시에 올려도 증가분이 유실되지 않는다"""
+        from .hitcounter import increment_hit_count
+
+        log = QnALog.objects.create(question_text="질문", title="제목", ai_answer="답변", hit_count=1)
+
+        self._run_concurrently(lambda: [increment_hit_count(log.id) for _ in range(25)])
+
+        log.refresh_from_db()
+        assert log.hit_count == 1 + 8 * 25
+
+    def test_buffer_flushes_merged_counts_in_one_update(self):
+        """버퍼에 모인 증가분은 flush 시 행별로 합쳐서 반영된다"""
+        from .hitcounter import HitCountBuffer
+
+        first = QnALog.objects.create(question_text="질문1", title="제목", ai_answer="답변", hit_count=1)
+        second = QnALog.objects.create(question_text="질문2", title="제목", ai_answer="답변", hit_count=3)
+        buffer = HitCountBuffer(flush_interval=3600, flush_size=10_000)
+
+        self._run_concurrently(lambda: [buffer.add(first.id) for _ in range(50)] + [buffer.add(second.id)])
+
+        with patch("archiver.models.async_task") as mock_async_task:
+            assert buffer.flush() == 8 * 51
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert first.hit_count == 1 + 8 * 50
+        assert second.hit_count == 3 + 8
+        mock_async_task.assert_not_called()
+
+    @override_settings(HIT_COUNT_BUFFER_ENABLED=True)
+    def test_buffered_mode_defers_write_until_flush(self, mock_qna_service):
+        """버퍼 모드에서는 응답에는 증가된 값이 나가고 DB 반영은 flush 때 일어난다"""
+        from .hitcounter import HitCountBuffer
+
+        buffer = HitCountBuffer(flush_interval=3600, flush_size=10_000)
+        existing = QnALog.objects.create(
+            question_text="Django ORM 사용법",
+            title="Django ORM",
+            ai_answer="ORM 사용법 답변",
+            is_verified=True,
+            notion_page_url="https://notion.so/page",
+            hit_count=5,
+        )
+
+        with patch("archiver.hitcounter._buffer", buffer):
+            result = mock_qna_service.check_similarity("Django ORM 사용법")
+
+        assert result["data"]["hit_count"] == 6
+        existing.refresh_from_db()
+        assert existing.hit_count == 5
+        buffer.flush()
+        existing.refresh_from_db()
+        assert existing.hit_count == 6
+
+
+@pytest.mark.django_db(transaction=True)
+class TestNotionRateLimit:
+    """워커 간 공유 토큰 버킷 테스트"""
+
+    def test_reserve_token_spaces_out_calls(self):
+        """순간 허용량을 넘긴 요청은 초과분만큼 대기 시간이 늘어난다"""
+        from .ratelimit import reserve_token
+
+        waits = [reserve_token("test", rate=10, capacity=2) for _ in range(4)]
+
+        assert waits[0] == waits[1] == 0
+        assert waits[2] == pytest.approx(0.1, abs=0.02)
+        assert waits[3] == pytest.approx(0.2, abs=0.02)
+
+    def test_bucket_clock_never_moves_backwards(self):
+        """늦게 잠금을 얻은 워커의 시각이 버킷 시각보다 이르면 버킷 시각을 기준으로 계산해 토큰을 다시 충전하지 않는다"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from .models import RateLimitBucket
+        from .ratelimit import reserve_token
+
+        updated_at = timezone.now()
+        RateLimitBucket.objects.create(name="skew", tokens=0, updated_at=updated_at)
+
+        with patch("archiver.ratelimit.timezone.now", return_value=updated_at - timedelta(seconds=10)):
+            assert reserve_token("skew", rate=10, capacity=2) == pytest.approx(0.1)
+        assert RateLimitBucket.objects.get(name="skew").updated_at == updated_at
+
+        with patch("archiver.ratelimit.timezone.now", return_value=updated_at + timedelta(seconds=0.1)):
+            assert reserve_token("skew", rate=10, capacity=2) == pytest.approx(0.1)
+
+    @override_settings(NOTION_TOKEN='test-token', NOTION_DB_ID='test-db-id', NOTION_RATE_LIMIT=5, NOTION_RATE_BURST=1)
+    def test_concurrent_workers_stay_under_server_limit(self):
+        """여러 워커가 동시에 올려도 공유 버킷 덕분에 서버의 호출 제한에 걸리지 않는다"""
+        import threading
+        import time
+        from django.db import connection
+        from .fakes import FakeNotionServer
+
+        dto = QnACreateDTO(question_text="질문", title="제목", ai_answer="답변", category="General", keywords=[], hit_count=1)
+
+        def worker():
+            try:
+                for _ in range(2):
+                    NotionAdapter().create_qna_page(dto)
+            finally:
+                connection.close()
+
+        with FakeNotionServer(rate_limit=8, burst=1) as server, override_settings(NOTION_API_URL=server.base_url):
+            start = time.monotonic()
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.monotonic() - start
+
+        assert len(server.requests) == 8
+        assert server.rate_limited == 0
+        assert elapsed >= 7 / 5 - 0.1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSingleflight:
+    """동일 질문 동시 처리 합치기 부하 테스트 (느린 가짜 Gemini)"""
+
+    @pytest.fixture
+    def slow_service(self, mock_gemini_adapter, mock_async_task):
+        import asyncio
+        import time
+
+        dto = mock_gemini_adapter.generate_answer.return_value
+
+        def slow_generate(question_text, image_data=None):
+            time.sleep(0.5)
+            return dto
+
+        async def aslow_generate(question_text, image_data=None):
+            await asyncio.sleep(0.5)
+            return dto
+
+        mock_gemini_adapter.generate_answer.side_effect = slow_generate
+        mock_gemini_adapter.agenerate_answer = AsyncMock(side_effect=aslow_generate)
+        return QnAService()
+
+    def test_concurrent_identical_questions_call_gemini_once(self, slow_service):
+        """같은 질문 N개가 동시에 들어와도 Gemini는 한 번만 호출되고 모두 같은 결과를 받는다"""
+        from concurrent.futures import ThreadPoolExecutor
+        from django.db import connection
+
+        def ask(question_text):
+            try:
+                return slow_service.process_question_flow(question_text).id
+            finally:
+                connection.close()
+
+        questions = ["Django 마이그레이션 오류", "django  마이그레이션 오류?", "DJANGO 마이그레이션 오류!"] * 3
+        with ThreadPoolExecutor(max_workers=len(questions)) as pool:
+            ids = list(pool.map(ask, questions))
+
+        assert slow_service.gemini.generate_answer.call_count == 1
+        assert len(set(ids)) == 1
+        assert QnALog.objects.count() == 1
+        assert QnALog.objects.get().hit_count == len(questions) - 1
+
+    def test_async_identical_questions_call_gemini_once(self, slow_service):
+        """비동기 경로에서도 동시에 들어온 같은 질문은 한 번만 Gemini를 호출한다"""
+        import asyncio
+        from asgiref.sync import async_to_sync
+
+        async def ask_all():
+            return await asyncio.gather(
+                *[slow_service.aprocess_question_flow("가상환경 활성화 오류") for _ in range(5)]
+            )
+
+        logs = async_to_sync(ask_all)()
+
+        slow_service.gemini.agenerate_answer.assert_awaited_once()
+        assert len({log.id for log in logs}) == 1
+
+    def test_failed_leader_lets_follower_take_over(self, slow_service):
+        """리더가 실패하면 표시가 지워져 다음 요청이 다시 처리한다"""
+        from .models import InflightQuestion
+
+        slow_service.gemini.generate_answer.side_effect = LLMServiceError("AI 오류")
+        with pytest.raises(LLMServiceError):
+            slow_service.process_question_flow("실패하는 질문")
+
+        assert not InflightQuestion.objects.exists()
+
+
+class TestSpeculativeDispatch:
+    """유사 질문 검색과 동시에 Gemini 호출을 시작하는 추측 모드 테스트"""
+
+    @pytest.fixture(autouse=True)
+    def reset_stats(self):
+        from .speculation import stats
+
+        stats.reset()
+        yield stats
+
+    @override_settings(SPECULATIVE_DISPATCH="always")
+    def test_new_question_uses_speculative_result(self, api_client, qna_bot_url, mock_gemini_adapter, mock_async_task, reset_stats):
+        """새 질문이면 미리 시작한 호출 결과를 사용하고 Gemini는 한 번만 호출된다"""
+        response = api_client.post(qna_bot_url, {"question_text": "추측 호출 질문"}, format="json")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "new"
+        mock_gemini_adapter.generate_answer.assert_called_once_with("추측 호출 질문", [])
+        assert reset_stats.snapshot()["used"] == 1
+
+    @override_settings(SPECULATIVE_DISPATCH="always")
+    def test_verified_match_discards_speculation(self, api_client, qna_bot_url, mock_gemini_adapter, reset_stats):
+        """검증된 답이 있으면 추측 호출은 버려지고 낭비로 집계된다"""
+        QnALog.objects.create(
+            question_text="Django ORM 사용법",
+            title="Django ORM",
+            ai_answer="ORM 사용법 답변",
+            is_verified=True,
+            notion_page_url="https://notion.so/page",
+        )
+
+        response = api_client.post(qna_bot_url, {"question_text": "Django ORM 사용법"}, format="json")
+
+        assert response.json()["status"] == "similar_found"
+        assert reset_stats.snapshot() == {
+            "started": 1, "used": 0, "wasted": 1, "saved_ms_total": 0.0, "saved_ms_avg": 0.0
+        }
+
+    def test_async_discard_lets_call_finish(self, reset_stats):
+        """비동기 경로에서 버린 호출은 취소하지 않고 끝까지 실행되며(응답 캐시 저장), 결과만 버려진다"""
+        import asyncio
+        from asgiref.sync import async_to_sync
+
+        from .speculation import astart
+
+        finished = []
+
+        async def call_gemini():
+            await asyncio.sleep(0.01)
+            finished.append("응답")
+            return "응답"
+
+        async def discard_then_wait():
+            speculation = astart(call_gemini())
+            await asyncio.sleep(0)
+            speculation.discard()
+            await asyncio.sleep(0.05)
+            return speculation.future
+
+        future = async_to_sync(discard_then_wait)()
+
+        assert finished == ["응답"]
+        assert not future.cancelled()
+        assert reset_stats.snapshot()["wasted"] == 1
+
+    @override_settings(SPECULATIVE_DISPATCH="fingerprint_miss")
+    def test_fingerprint_hit_skips_speculation(self, api_client, qna_bot_url, mock_gemini_adapter, reset_stats):
+        """같은 지문의 질문이 이미 있으면 추측 호출을 시작하지 않는다"""
+        from .fingerprints import question_fingerprint
+
+        QnALog.objects.create(
+            question_text="Django ORM 사용법",
+            title="Django ORM",
+            ai_answer="ORM 사용법 답변",
+            is_verified=True,
+            notion_page_url="https://notion.so/page",
+            question_fingerprint=question_fingerprint("Django ORM 사용법"),
+        )
+
+        response = api_client.post(qna_bot_url, {"question_text": "django orm 사용법?"}, format="json")
+
+        assert response.json()["status"] == "similar_found"
+        mock_gemini_adapter.generate_answer.assert_not_called()
+        assert reset_stats.snapshot()["started"] == 0
+
+    @override_settings(SPECULATIVE_DISPATCH="always")
+    def test_async_new_question_uses_speculative_result(self, client, qna_bot_async_url, mock_gemini_adapter, mock_async_task, reset_stats):
+        """비동기 경로에서도 미리 시작한 태스크의 결과를 사용한다"""
+        mock_gemini_adapter.agenerate_answer = AsyncMock(
+            return_value=mock_gemini_adapter.generate_answer.return_value
+        )
+
+        response = client.post(
+            qna_bot_async_url, {"question_text": "비동기 추측 질문"}, content_type="application/json"
+        )
+
+        assert response.json()["status"] == "new"
+        mock_gemini_adapter.agenerate_answer.assert_awaited_once()
+        assert reset_stats.snapshot()["used"] == 1
+
+
+class TestQnAJobMode:
+    """job 모드(202 + 작업 id) 테스트"""
+
+    def test_job_mode_returns_202_without_calling_gemini(self, api_client, qna_bot_url, mock_gemini_adapter, mock_async_task):
+        """job 모드는 작업만 저장하고 바로 응답하며 처리는 워커 대기열에 맡긴다"""
+        from .models import QnAJob
+
+        response = api_client.post(qna_bot_url, {"question_text": "작업 모드 질문", "mode": "job"}, format="json")
+
+        assert response.status_code == 202
+        data = response.json()
+        job = QnAJob.objects.get()
+        assert data["status"] == "processing"
+        assert data["job_id"] == str(job.id)
+        assert data["status_url"].endswith(reverse("archiver:qna_job", args=[job.id]))
+        assert job.status == QnAJob.Status.QUEUED
+        mock_gemini_adapter.generate_answer.assert_not_called()
+        mock_async_task.assert_called_once_with("archiver.tasks.task_run_qna_job", str(job.id))
+
+    def test_job_mode_still_answers_known_questions_immediately(self, client, qna_bot_async_url, mock_gemini_adapter, mock_async_task):
+        """검증된 답이 있으면 작업을 만들지 않고 바로 응답한다"""
+        from .models import QnAJob
+
+        QnALog.objects.create(
+            question_text="Django ORM 사용법",
+            title="Django ORM",
+            ai_answer="ORM 사용법 답변",
+            is_verified=True,
+            notion_page_url="https://notion.so/page",
+        )
+
+        response = client.post(
+            qna_bot_async_url, {"question_text": "Django ORM 사용법", "mode": "job"}, content_type="application/json"
+        )
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "similar_found"
+        assert not QnAJob.objects.exists()
+
+    def test_worker_completes_job_and_status_endpoint_returns_result(self, api_client, mock_gemini_adapter, mock_async_task):
+        """워커가 작업을 처리하면 상태 API가 new 결과를 돌려준다"""
+        from .models import QnAJob
+        from .tasks import task_run_qna_job
+
+        job = QnAJob.objects.create(question_text="워커 처리 질문")
+        url = reverse("archiver:qna_job", args=[job.id])
+        assert api_client.get(url).json() == {"status": "processing", "job_id": str(job.id)}
+
+        task_run_qna_job(str(job.id))
+
+        job.refresh_from_db()
+        assert job.status == QnAJob.Status.DONE
+        data = api_client.get(url).json()
+        assert data["status"] == "new"
+        assert data["id"] == job.qna_log_id
+        assert data["ai_answer"] == "테스트 AI 답변입니다"
+
+    def test_failed_job_reports_error(self, api_client, mock_gemini_adapter, mock_async_task):
+        """Gemini 오류는 작업 실패로 기록되고 상태 API로 전달된다"""
+        from .models import QnAJob
+        from .tasks import task_run_qna_job
+
+        mock_gemini_adapter.generate_answer.side_effect = LLMServiceError("AI 오류")
+        job = QnAJob.objects.create(question_text="실패할 질문")
+
+        task_run_qna_job(str(job.id))
+
+        data = api_client.get(reverse("archiver:qna_job", args=[job.id])).json()
+        assert data == {"status": "failed", "job_id": str(job.id), "error": "AI 오류"}
+
+    def test_unknown_job_returns_404(self, api_client):
+        """없는 작업 id는 404"""
+        import uuid
+
+        response = api_client.get(reverse("archiver:qna_job", args=[uuid.uuid4()]))
+
+        assert response.status_code == 404
+
+
+class TestQnAStreaming:
+    """SSE 스트리밍 엔드포인트 테스트"""
+
+    @staticmethod
+    def _events(response):
+        import json
+
+        body = b"".join(response).decode()
+        events = []
+        for block in body.strip().split("\n\n"):
+            event_line, data_line = block.split("\n")
+            events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+        return events
+
+    def test_new_question_streams_chunks_then_result(self, client, mock_gemini_adapter, mock_async_task):
+        """새 질문이면 응답 조각을 먼저 보내고, 파싱/저장한 결과를 마지막에 보낸다"""
+        async def astream_answer(question_text, image_data=None):
+            for text in ("제목: 스트리밍 제목\n", "카테고리: Python\n", "키워드: sse, stream"):
+                yield text
+
+        mock_gemini_adapter.astream_answer = astream_answer
+
+        response = client.post(
+            reverse("archiver:qna_bot_stream"), {"question_text": "스트리밍 질문"}, content_type="application/json"
+        )
+
+        assert response["Content-Type"] == "text/event-stream"
+        events = self._events(response)
+        assert [event for event, _ in events] == ["chunk", "chunk", "chunk", "result"]
+        result = events[-1][1]
+        assert result["status"] == "new"
+        assert result["title"] == "스트리밍 제목"
+        assert result["ttft_ms"] is not None
+        assert QnALog.objects.get(question_text="스트리밍 질문").title == "스트리밍 제목"
+        mock_async_task.assert_called_once()
+
+    def test_verified_question_sends_single_result(self, client, mock_gemini_adapter):
+        """검증된 답이 있으면 Gemini를 호출하지 않고 결과 이벤트 하나만 보낸다"""
+        QnALog.objects.create(
+            question_text="Django ORM 사용법",
+            title="Django ORM",
+            ai_answer="ORM 사용법 답변",
+            is_verified=True,
+            notion_page_url="https://notion.so/page",
+        )
+
+        response = client.post(
+            reverse("archiver:qna_bot_stream"), {"question_text": "Django ORM 사용법"}, content_type="application/json"
+        )
+
+        events = self._events(response)
+        assert len(events) == 1
+        assert events[0][0] == "result"
+        assert events[0][1]["status"] == "similar_found"
+
+    def test_empty_question_returns_400(self, client):
+        response = client.post(reverse("archiver:qna_bot_stream"), {}, content_type="application/json")
+
+        assert response.status_code == 400
+
+
+class TestImagePreprocessing:
+    """Gemini 전송 전 이미지 전처리(images.prepare_image) 테스트"""
+
+    @staticmethod
+    def _encode(size, fmt, mode="RGB"):
+        import io
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new(mode, size, "white").save(buffer, format=fmt)
+        return buffer.getvalue()
+
+    @override_settings(IMAGE_MAX_EDGE=800, IMAGE_FORMAT="WEBP")
+    def test_large_screenshot_is_downscaled_and_reencoded(self):
+        """긴 변을 IMAGE_MAX_EDGE로 줄이고 WEBP로 다시 인코딩한다"""
+        import hashlib
+        from .images import prepare_image
+
+        raw = self._encode((1170, 2532), "PNG", mode="RGBA")
+        prepared = prepare_image(raw)
+
+        assert max(prepared.width, prepared.height) == 800
+        assert prepared.mime_type == "image/webp"
+        assert prepared.data[8:12] == b"WEBP"
+        assert prepared.sha256 == hashlib.sha256(prepared.data).hexdigest()
+        assert prepared.original_bytes == len(raw)
+
+    @override_settings(IMAGE_MAX_EDGE=500, IMAGE_FORMAT="JPEG")
+    def test_jpeg_uses_draft_decoding(self):
+        """JPEG는 draft 모드로 축소 디코딩한 뒤 목표 크기로 맞춘다"""
+        from .images import prepare_image
+
+        prepared = prepare_image(self._encode((4000, 3000), "JPEG"))
+
+        assert (prepared.width, prepared.height) == (500, 375)
+        assert prepared.mime_type == "image/jpeg"
+
+    @override_settings(IMAGE_MAX_PIXELS=1000)
+    def test_oversized_or_invalid_images_are_skipped(self):
+        """픽셀 수 상한을 넘거나 읽을 수 없는 이미지는 None"""
+        from .images import prepare_image
+
+        assert prepare_image(self._encode((100, 100), "PNG")) is None
+        assert prepare_image(b"not an image") is None
+
+    @override_settings(IMAGE_MAX_EDGE=800)
+    def test_gemini_receives_prepared_image(self, api_client, qna_bot_url, mock_gemini_adapter, mock_async_task):
+        """서비스는 원본 대신 전처리한 바이트를 Gemini에 넘긴다"""
+        import io
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        raw = self._encode((1600, 1200), "PNG")
+        upload = SimpleUploadedFile("screenshot.png", raw, content_type="image/png")
+
+        api_client.post(qna_bot_url, {"question_text": "이미지 질문", "image": upload}, format="multipart")
+
+        _, [image_data] = mock_gemini_adapter.generate_answer.call_args.args
+        assert image_data != raw
+        assert Image.open(io.BytesIO(image_data)).size == (800, 600)
+
+
+class TestImageHashIndex:
+    """스크린샷 지각 해시(dHash)와 다중 인덱스 해싱 검색 테스트"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_index(self):
+        from .image_index import get_image_index
+
+        get_image_index().invalidate()
+        yield
+        get_image_index().invalidate()
+
+    @staticmethod
+    def _screenshot(seed, size=(1200, 800), fmt="PNG"):
+        import io
+        import random
+        from PIL import Image, ImageDraw
+
+        # 같은 seed는 같은 화면, size는 다시 찍은 해상도
+        rng = random.Random(seed)
+        img = Image.new("RGB", (1200, 800), (30, 30, 30))
+        draw = ImageDraw.Draw(img)
+        for _ in range(60):
+            x, y = rng.randrange(1000), rng.randrange(780)
+            draw.rectangle([x, y, x + rng.randrange(40, 200), y + 14], fill=(220, 220, 220))
+        buffer = io.BytesIO()
+        img.resize(size).save(buffer, format=fmt)
+        return buffer.getvalue()
+
+    def test_dhash_is_stable_across_resize_and_format(self):
+        """같은 화면은 해상도/형식이 달라도 가깝고, 다른 화면은 멀다"""
+        import io
+        from PIL import Image
+        from .images import dhash, hamming_distance
+
+        original = Image.open(io.BytesIO(self._screenshot(1)))
+        recaptured = Image.open(io.BytesIO(self._screenshot(1, size=(600, 400), fmt="JPEG")))
+        other = Image.open(io.BytesIO(self._screenshot(2)))
+
+        assert hamming_distance(dhash(original), dhash(recaptured)) <= 16
+        assert hamming_distance(dhash(original), dhash(other)) > 48
+
+    def test_multi_index_hash_finds_values_within_radius(self):
+        """반경 안의 해시만 찾고 가까운 순으로 정렬한다"""
+        from .image_index import MultiIndexHash
+
+        base = (1 << 255) | 12345
+        index = MultiIndexHash(256, 4, [(base, 1), (base ^ 0b111, 2), (base ^ ((1 << 20) - 1), 3)])
+
+        assert index.search(base) == [(0, 1), (3, 2)]
+        assert index.search(base, radius=1) == [(0, 1)]
+        with pytest.raises(ValueError):
+            index.search(base, radius=5)
+
+    def test_multi_index_hash_keeps_nearest_image_per_id(self):
+        """한 질문에 이미지가 여러 장이면 먼 이미지가 먼저 후보로 나와도 가까운 이미지의 거리로 한 번만 찾는다"""
+        from .image_index import MultiIndexHash
+
+        # far는 query(0)와 첫 구간만 같고 거리가 멀며, near는 마지막 구간에서 1비트만 다름
+        far = ((1 << 64) - 1) << 64
+        near = 1 << 255
+        index = MultiIndexHash(256, 3, [(far, 7), (near, 7)])
+
+        assert index.search(0) == [(1, 7)]
+
+    def test_same_screenshot_resolves_to_verified_answer(self, api_client, qna_bot_url, mock_gemini_adapter):
+        """검증된 질문과 같은 스크린샷이면 글이 달라도 Gemini 없이 기존 답변을 돌려준다"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .images import dhash_hex, prepare_image
+
+        log = QnALog.objects.create(
+            question_text="이 에러 뭔가요",
+            title="ModuleNotFoundError",
+            ai_answer="가상환경을 확인하세요",
+            is_verified=True,
+            notion_page_url="https://notion.so/page",
+            image_dhash=dhash_hex(prepare_image(self._screenshot(1)).dhash),
+        )
+        upload = SimpleUploadedFile("again.jpg", self._screenshot(1, size=(900, 600), fmt="JPEG"))
+
+        response = api_client.post(qna_bot_url, {"question_text": "??", "image": upload}, format="multipart")
+
+        assert response.json()["status"] == "similar_found"
+        assert response.json()["id"] == log.id
+        mock_gemini_adapter.generate_answer.assert_not_called()
+
+    def test_screenshot_without_text_resolves_to_verified_answer(self, api_client, qna_bot_url, mock_gemini_adapter):
+        """글 없이 스크린샷만 올려도 이미지 해시로 검증된 답변을 찾는다"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .images import dhash_hex, prepare_image
+
+        log = QnALog.objects.create(
+            question_text="이 에러 뭔가요",
+            title="ModuleNotFoundError",
+            ai_answer="가상환경을 확인하세요",
+            is_verified=True,
+            notion_page_url="https://notion.so/page",
+            image_dhash=dhash_hex(prepare_image(self._screenshot(1)).dhash),
+        )
+        upload = SimpleUploadedFile("again.png", self._screenshot(1), content_type="image/png")
+
+        response = api_client.post(qna_bot_url, {"image": upload}, format="multipart")
+
+        assert response.json()["status"] == "similar_found"
+        assert response.json()["id"] == log.id
+        mock_gemini_adapter.generate_answer.assert_not_called()
+
+    def test_new_screenshot_without_text_is_answered(self, api_client, qna_bot_url, mock_gemini_adapter, mock_async_task):
+        """처음 보는 스크린샷만 올린 질문은 Gemini에 이미지로 묻고 저장한다"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        upload = SimpleUploadedFile("new.png", self._screenshot(5), content_type="image/png")
+
+        response = api_client.post(qna_bot_url, {"image": upload}, format="multipart")
+
+        assert response.json()["status"] == "new"
+        question_text, image_data = mock_gemini_adapter.generate_answer.call_args.args
+        assert question_text == "" and len(image_data) == 1
+        assert QnALog.objects.get().image_dhash is not None
+
+    def test_question_without_text_or_image_is_rejected(self, api_client, qna_bot_url, mock_gemini_adapter):
+        """글도 이미지도 없으면 400"""
+        response = api_client.post(qna_bot_url, {"question_text": ""}, format="json")
+
+        assert response.status_code == 400
+        mock_gemini_adapter.generate_answer.assert_not_called()
+
+    def test_migration_backfills_existing_image_hashes(self, tmp_path):
+        """이미지 해시 컬럼을 추가하는 마이그레이션이 기존 질문의 해시를 채우고, 파일이 없는 질문은 건너뛴다"""
+        from importlib import import_module
+        from django.apps import apps
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .images import dhash_hex, prepare_image
+
+        migration = import_module("archiver.migrations.0009_qnalog_image_dhash")
+        raw = self._screenshot(4)
+        with override_settings(MEDIA_ROOT=str(tmp_path)):
+            stored = QnALog.objects.create(
+                question_text="스크린샷", title="t", ai_answer="a", image=SimpleUploadedFile("old.png", raw)
+            )
+            missing = QnALog.objects.create(question_text="파일 없음", title="t", ai_answer="a", image="qna/missing.png")
+            QnALog.objects.update(image_dhash=None)
+
+            migration.backfill_image_hashes(apps, None)
+
+        assert QnALog.objects.get(pk=stored.pk).image_dhash == dhash_hex(prepare_image(raw).dhash)
+        assert QnALog.objects.get(pk=missing.pk).image_dhash is None
+
+    def test_new_question_stores_image_hash(self, api_client, qna_bot_url, mock_gemini_adapter, mock_async_task):
+        """새 질문을 저장할 때 첨부 이미지의 해시도 함께 저장한다"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .images import dhash_hex, prepare_image
+
+        raw = self._screenshot(3)
+        upload = SimpleUploadedFile("error.png", raw, content_type="image/png")
+
+        api_client.post(qna_bot_url, {"question_text": "스크린샷 질문", "image": upload}, format="multipart")
+
+        assert QnALog.objects.get(question_text="스크린샷 질문").image_dhash == dhash_hex(prepare_image(raw).dhash)
+
+
+class TestMultipleImages:
+    """봇이 여러 첨부를 multipart "images" 필드로 보내는 경우 테스트"""
+
+    @staticmethod
+    def _upload(name, color):
+        import io
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (320, 240), color).save(buffer, format="PNG")
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+    def test_all_images_are_sent_and_extras_are_stored(self, api_client, qna_bot_url, mock_gemini_adapter, mock_async_task):
+        """모든 이미지를 Gemini에 넘기고 첫 장은 QnALog.image, 나머지는 QnAImage로 저장한다"""
+        from .models import QnAImage
+
+        images = [self._upload("a.png", "red"), self._upload("b.png", "blue"), self._upload("c.png", "green")]
+
+        api_client.post(qna_bot_url, {"question_text": "여러 장 질문", "images": images}, format="multipart")
+
+        _, image_data = mock_gemini_adapter.generate_answer.call_args.args
+        assert len(image_data) == 3
+        log = QnALog.objects.get(question_text="여러 장 질문")
+        assert log.image
+        assert [extra.position for extra in log.extra_images.all()] == [1, 2]
+        assert QnAImage.objects.filter(job__isnull=True).count() == 2
+
+    def test_non_image_parts_are_ignored(self, api_client, qna_bot_url, mock_gemini_adapter, mock_async_task):
+        """이미지가 아닌 첨부는 버린다"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        note = SimpleUploadedFile("notes.txt", b"hello", content_type="text/plain")
+
+        api_client.post(
+            qna_bot_url,
+            {"question_text": "첨부 섞인 질문", "images": [note, self._upload("a.png", "red")]},
+            format="multipart",
+        )
+
+        _, image_data = mock_gemini_adapter.generate_answer.call_args.args
+        assert len(image_data) == 1
+
+    def test_job_mode_keeps_every_image_for_the_worker(self, api_client, qna_bot_url, mock_gemini_adapter, mock_async_task):
+        """job 모드도 모든 이미지를 작업에 저장하고 워커가 함께 넘긴다"""
+        from .models import QnAJob
+        from .tasks import task_run_qna_job
+
+        images = [self._upload("a.png", "red"), self._upload("b.png", "blue")]
+        api_client.post(qna_bot_url, {"question_text": "작업 여러 장", "mode": "job", "images": images}, format="multipart")
+
+        job = QnAJob.objects.get()
+        assert job.extra_images.count() == 1
+
+        task_run_qna_job(str(job.id))
+
+        _, image_data = mock_gemini_adapter.generate_answer.call_args.args
+        assert len(image_data) == 2
+        job.refresh_from_db()
+        assert job.qna_log.extra_images.count() == 1
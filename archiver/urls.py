@@ -8,4 +8,13 @@ urlpatterns = [
     path(
         "qna/", views.QnABotAPIView.as_view(), name="qna_bot"
     ),  # http://127.0.0.1:8000/archiver/ 주소
+    path(
+        "qna/async/", views.AsyncQnABotAPIView.as_view(), name="qna_bot_async"
+    ),  # ASGI 서버에서 비동기로 처리되는 주소
+    path(
+        "qna/stream/", views.AsyncQnAStreamView.as_view(), name="qna_bot_stream"
+    ),  # AI 답변을 SSE로 스트리밍하는 주소 (ASGI)
+    path(
+        "qna/jobs/<uuid:job_id>/", views.QnAJobStatusAPIView.as_view(), name="qna_job"
+    ),  # job 모드로 접수된 질문의 처리 상태 조회
 ]
@@ -1,37 +1,89 @@
+import json
 import logging
+import time
 
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils.decorators import method_decorator
+from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from common.exceptions import ValidationError, LLMServiceError, AIResponseParsingError, DatabaseOperationError
-from .services import QnAService
+from common.exceptions import BaseProjectError, ValidationError, LLMServiceError, AIResponseParsingError, DatabaseOperationError
+from .services import get_qna_service
 from .adapters import qna_model_to_response_dto
+from .models import QnAJob
 
 logger = logging.getLogger(__name__)
 
 
+def job_accepted_data(request, job: QnAJob) -> dict:
+    """job 모드 접수 응답 (봇은 status_url을 주기적으로 조회해 결과를 받음)"""
+    return {
+        "status": "processing",
+        "job_id": str(job.id),
+        "status_url": request.build_absolute_uri(reverse("archiver:qna_job", args=[job.id])),
+        "message": "질문이 접수되었습니다",
+    }
+
+
+def uploaded_images(request) -> list:
+    """
+    첨부 이미지 목록 ("images" 여러 장, 기존 클라이언트의 "image" 한 장)
+    이미지가 아닌 파일과 IMAGE_MAX_COUNT를 넘는 파일은 제외합니다 (용량 상한은 전처리에서 디코딩 전에 확인)
+    """
+    files = request.FILES.getlist("images") + request.FILES.getlist("image")
+    images = [f for f in files if (f.content_type or "").startswith("image/")]
+    if len(images) > settings.IMAGE_MAX_COUNT or len(images) != len(files):
+        logger.warning(f"첨부 파일 {len(files)}개 중 이미지 {min(len(images), settings.IMAGE_MAX_COUNT)}개만 사용")
+    return images[: settings.IMAGE_MAX_COUNT]
+
+
+def job_status_data(job: QnAJob) -> dict:
+    if job.status == QnAJob.Status.DONE:
+        return {**job.result, "job_id": str(job.id)}
+    if job.status == QnAJob.Status.FAILED:
+        return {"status": "failed", "job_id": str(job.id), "error": job.error}
+    return {"status": "processing", "job_id": str(job.id)}
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class QnABotAPIView(APIView):
     def post(self, request):
         try:
             logger.info("QnABotAPIView POST called")
-            question_text = request.data.get("question_text")
-            image = request.FILES.get("image")
+            question_text = request.data.get("question_text") or ""
+            images = uploaded_images(request)
+            # job 모드: Gemini 응답을 기다리지 않고 작업을 접수한 뒤 202로 바로 응답
+            job_mode = request.data.get("mode") == "job"
 
-            service = QnAService()
+            service = get_qna_service()
+
+            # 정책에 따라 유사도 체크와 동시에 Gemini 호출 시작
+            speculation = None if job_mode else service.start_speculation(question_text, images)
 
             # 유사도 체크
-            similarity_result = service.check_similarity(question_text)
+            similarity_result = service.check_similarity(question_text, images=images)
 
 
-            if similarity_result['status'] == 'similar_found':
+            if similarity_result['status'] in ('similar_found', 'duplicate'):
+                if speculation:
+                    speculation.discard()
                 return Response(similarity_result['data'])
 
+            if job_mode:
+                job = service.submit_job(question_text, images)
+                return Response(job_accepted_data(request, job), status=202)
+
             # 새로운 질문 처리
             new_log = service.process_question_flow(
                 question_text=question_text,
-                image=image
+                images=images,
+                speculation=speculation,
             )
 
             response_dto = qna_model_to_response_dto(new_log)
@@ -54,4 +106,147 @@ class QnABotAPIView(APIView):
             return Response({"error": e.message}, status=500)
         except Exception as e:
             logger.error(f"알수없는 에러 발생 {e}", exc_info=True)
-            return Response({"error": "알수없는 에러 발생"}, status=500)
\ No newline at end of file
+            return Response({"error": "알수없는 에러 발생"}, status=500)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncQnABotAPIView(View):
+    """
+    QnABotAPIView의 비동기 버전 (config.asgi로 서빙)
+    Gemini 응답을 기다리는 동안 워커를 점유하지 않으므로
+    한 프로세스가 여러 질문을 동시에 처리할 수 있습니다
+    """
+
+    async def post(self, request):
+        try:
+            logger.info("AsyncQnABotAPIView POST called")
+            if request.content_type == "application/json":
+                payload = json.loads(request.body or b"{}")
+            else:
+                payload = request.POST
+            question_text = payload.get("question_text") or ""
+            images = uploaded_images(request)
+            job_mode = payload.get("mode") == "job"
+
+            service = get_qna_service()
+
+            speculation = None if job_mode else await service.astart_speculation(question_text, images)
+
+            # 유사도 체크
+            similarity_result = await service.acheck_similarity(question_text, images=images)
+
+            if similarity_result['status'] in ('similar_found', 'duplicate'):
+                if speculation:
+                    speculation.discard()
+                return JsonResponse(similarity_result['data'])
+
+            if job_mode:
+                job = await sync_to_async(service.submit_job)(question_text, images)
+                return JsonResponse(job_accepted_data(request, job), status=202)
+
+            # 새로운 질문 처리
+            new_log = await service.aprocess_question_flow(
+                question_text=question_text,
+                images=images,
+                speculation=speculation,
+            )
+
+            response_dto = qna_model_to_response_dto(new_log)
+            response_data = response_dto.model_dump()
+            response_data["status"] = "new"
+            response_data["message"] = "AI 분석이 끝났습니다"
+
+            return JsonResponse(response_data)
+
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "잘못된 JSON 형식입니다"}, status=400)
+        except ValidationError as e:
+            return JsonResponse({"error": e.message}, status=400)
+        except LLMServiceError as e:
+            return JsonResponse({"error": e.message}, status=503)
+        except AIResponseParsingError as e:
+            return JsonResponse({"error": e.message}, status=400)
+        except DatabaseOperationError as e:
+            return JsonResponse({"error": e.message}, status=500)
+        except Exception as e:
+            logger.error(f"알수없는 에러 발생 {e}", exc_info=True)
+            return JsonResponse({"error": "알수없는 에러 발생"}, status=500)
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Server-Sent Events 형식의 이벤트 하나"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, cls=DjangoJSONEncoder)}\n\n"
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncQnAStreamView(View):
+    """
+    AI 답변을 생성되는 대로 SSE(text/event-stream)로 전달하는 엔드포인트 (config.asgi로 서빙)
+
+    event: chunk   {"text": "..."}          Gemini 응답 조각
+    event: result  {..., "status": ...}     최종 결과 (유사 질문이면 이 이벤트 하나만 전송)
+    event: error   {"error": "..."}         처리 중 오류
+    """
+
+    async def post(self, request):
+        logger.info("AsyncQnAStreamView POST called")
+        try:
+            if request.content_type == "application/json":
+                payload = json.loads(request.body or b"{}")
+            else:
+                payload = request.POST
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "잘못된 JSON 형식입니다"}, status=400)
+        question_text = payload.get("question_text") or ""
+        images = uploaded_images(request)
+        # 글 없이 스크린샷만 올린 질문도 받음
+        if not question_text and not images:
+            return JsonResponse({"error": "질문을 입력해주세요"}, status=400)
+
+        response = StreamingHttpResponse(
+            self._events(question_text, images), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # 프록시가 응답을 모아서 보내지 않도록
+        return response
+
+    async def _events(self, question_text, images):
+        started = time.perf_counter()
+        ttft_ms = None
+        try:
+            service = get_qna_service()
+            similarity_result = await service.acheck_similarity(question_text, images=images)
+            if similarity_result["status"] in ("similar_found", "duplicate"):
+                yield sse_event("result", similarity_result["data"])
+                return
+
+            async for kind, value in service.astream_question_flow(question_text, images):
+                if kind == "chunk":
+                    if ttft_ms is None:
+                        # 첫 토큰까지 걸린 시간 (스트리밍 도입으로 줄이려는 지표)
+                        ttft_ms = (time.perf_counter() - started) * 1000
+                        logger.info(f"스트리밍 첫 응답까지 {ttft_ms:.0f}ms")
+                    yield sse_event("chunk", {"text": value})
+                    continue
+
+                response_data = qna_model_to_response_dto(value).model_dump(mode="json")
+                response_data["status"] = "new"
+                response_data["message"] = "AI 분석이 끝났습니다"
+                response_data["ttft_ms"] = ttft_ms
+                response_data["total_ms"] = (time.perf_counter() - started) * 1000
+                yield sse_event("result", response_data)
+        except BaseProjectError as e:
+            yield sse_event("error", {"error": e.message})
+        except Exception as e:
+            logger.error(f"알수없는 에러 발생 {e}", exc_info=True)
+            yield sse_event("error", {"error": "알수없는 에러 발생"})
+
+
+class QnAJobStatusAPIView(APIView):
+    """job 모드 작업의 처리 상태/결과 조회 (DB 조회만 하므로 가볍게 자주 호출해도 됨)"""
+
+    def get(self, request, job_id):
+        job = QnAJob.objects.filter(pk=job_id).first()
+        if job is None:
+            return Response({"error": "작업을 찾을 수 없습니다"}, status=404)
+        return Response(job_status_data(job))
@@ -4,9 +4,17 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 logger.info("BOT FILE LOADED")
+import asyncio
+import bisect
+import difflib
+import json
 import os
+import re
+import time
+from collections import Counter, deque
 
 import aiohttp
+import aiohttp.payload
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
@@ -16,7 +24,40 @@ load_dotenv()
 logger.info("imports done")
 token = os.getenv("DISCORD_BOT_TOKEN")
 logger.debug(f"DISCORD_BOT_TOKEN set: {bool(token)}")
-DJANGO_API_URL = "http://web:8000/archiver/qna/"
+DJANGO_API_URL = os.getenv("DJANGO_API_URL", "http://web:8000/archiver/qna/async/")
+# job 모드: 서버는 질문을 접수만 하고(202) 워커가 처리, 봇은 상태 API를 주기적으로 조회해 결과를 전달
+DJANGO_JOB_MODE = os.getenv("DJANGO_JOB_MODE", "true").lower() in ("1", "true", "yes")
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_POLL_TIMEOUT = float(os.getenv("JOB_POLL_TIMEOUT", "300"))
+# 스트리밍 모드: AI 답변을 SSE로 받아 생성되는 대로 메세지를 수정 (켜져 있으면 job 모드보다 우선)
+DJANGO_STREAM_MODE = os.getenv("DJANGO_STREAM_MODE", "true").lower() in ("1", "true", "yes")
+DJANGO_STREAM_URL = os.getenv("DJANGO_STREAM_URL", "http://web:8000/archiver/qna/stream/")
+# 디스코드 메세지 수정은 채널당 호출 제한이 있으므로 이 간격(초)보다 자주 수정하지 않음
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1.5"))
+DISCORD_MESSAGE_LIMIT = 1990
+# Django API 호출 동시 실행 수 (넘는 요청은 대기열에서 순서를 기다림)
+DJANGO_MAX_CONCURRENCY = int(os.getenv("DJANGO_MAX_CONCURRENCY", "4"))
+# 공용 세션의 연결 풀 설정 (web:8000 한 곳으로 가므로 호스트당 제한이 곧 전체 연결 수)
+DJANGO_CONN_LIMIT_PER_HOST = int(os.getenv("DJANGO_CONN_LIMIT_PER_HOST", "8"))
+DJANGO_KEEPALIVE_TIMEOUT = float(os.getenv("DJANGO_KEEPALIVE_TIMEOUT", "30"))
+# API 호출 지연시간 히스토그램을 이 횟수마다 로그로 남김
+API_LATENCY_LOG_EVERY = int(os.getenv("API_LATENCY_LOG_EVERY", "50"))
+# 질문 접수 대기열: 가득 차면 새 질문은 거절, INTAKE_WORKERS개의 작업자가 순서대로 처리
+INTAKE_QUEUE_SIZE = int(os.getenv("INTAKE_QUEUE_SIZE", "100"))
+INTAKE_WORKERS = int(os.getenv("INTAKE_WORKERS", "4"))
+# 사용자/채널별 질문 빈도 제한 (분당 충전량, 한 번에 허용하는 최대 개수)
+USER_QUESTIONS_PER_MINUTE = float(os.getenv("USER_QUESTIONS_PER_MINUTE", "3"))
+USER_QUESTION_BURST = int(os.getenv("USER_QUESTION_BURST", "2"))
+CHANNEL_QUESTIONS_PER_MINUTE = float(os.getenv("CHANNEL_QUESTIONS_PER_MINUTE", "30"))
+CHANNEL_QUESTION_BURST = int(os.getenv("CHANNEL_QUESTION_BURST", "10"))
+# 질문에 첨부된 이미지 전달: 개수/용량/형식 상한 (넘는 파일은 내려받지 않고 안내만 함)
+ATTACHMENT_MAX_COUNT = int(os.getenv("ATTACHMENT_MAX_COUNT", "4"))
+ATTACHMENT_MAX_BYTES = int(os.getenv("ATTACHMENT_MAX_BYTES", str(8 * 1024 * 1024)))
+ATTACHMENT_TYPES = {"image/png", "image/jpeg", "image/webp", "image/gif"}
+ATTACHMENT_CHUNK_SIZE = 64 * 1024
+# 같은 사용자가 이 시간(초) 안에 거의 같은 질문(유사도 FLOOD_SIMILARITY 이상)을 다시 보내면 무시
+FLOOD_WINDOW = float(os.getenv("FLOOD_WINDOW", "60"))
+FLOOD_SIMILARITY = float(os.getenv("FLOOD_SIMILARITY", "0.9"))
 NOTION_CATEGORIES = [
     "Git",
     "Linux",
@@ -28,6 +69,302 @@ NOTION_CATEGORIES = [
     "General",
 ]
 
+class LatencyHistogram:
+    """API 호출 지연시간 분포 (누적 버킷 대신 구간별 개수)"""
+
+    BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+        if API_LATENCY_LOG_EVERY and self.total % API_LATENCY_LOG_EVERY == 0:
+            logger.info(self.summary())
+
+    def percentile(self, pct):
+        """pct 백분위가 속한 버킷의 상한(초)을 반환"""
+        if not self.total:
+            return 0.0
+        target = self.total * pct / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.BUCKETS[index] if index < len(self.BUCKETS) else float("inf")
+        return float("inf")
+
+    def summary(self):
+        labels = [f"≤{b}s" for b in self.BUCKETS] + [f">{self.BUCKETS[-1]}s"]
+        buckets = " ".join(f"{label}:{count}" for label, count in zip(labels, self.counts) if count)
+        mean = self.sum / self.total if self.total else 0.0
+        p50, p99 = (
+            f"≤{value}s" if value != float("inf") else f">{self.BUCKETS[-1]}s"
+            for value in (self.percentile(50), self.percentile(99))
+        )
+        return f"[{self.name}] {self.total}건 평균 {mean * 1000:.0f}ms p50{p50} p99{p99} | {buckets}"
+
+
+class RequestQueue:
+    """
+    Django API 동시 호출 수 제한 (선착순 대기열)
+    빈 자리가 없으면 대기열에 들어가고, 순서가 바뀔 때마다 on_position(n)으로 현재 순번을 알려줌
+    (차례가 오면 on_position(0))
+    """
+
+    def __init__(self, max_concurrency):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.waiters = deque()
+
+    async def acquire(self, on_position=None):
+        if self.active < self.max_concurrency and not self.waiters:
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        waiter = (future, on_position)
+        self.waiters.append(waiter)
+        self._schedule_notify(waiter, len(self.waiters))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+            elif future.done() and not future.cancelled():
+                # 자리를 넘겨받은 직후 취소되면 다음 대기자에게 넘김
+                self.release()
+            raise
+
+    def release(self):
+        if self.waiters:
+            # 자리를 그대로 다음 대기자에게 넘기므로 active는 그대로 유지
+            waiter = self.waiters.popleft()
+            waiter[0].set_result(None)
+            updates = [(waiter, 0)] + [(w, position) for position, w in enumerate(self.waiters, start=1)]
+            for waiter, position in updates:
+                self._schedule_notify(waiter, position)
+        else:
+            self.active -= 1
+
+    def _schedule_notify(self, waiter, position):
+        # 순번 표시(메세지 수정)를 기다리느라 대기열 처리가 늦어지지 않도록 태스크로 실행
+        if waiter[1] is None:
+            return
+        task = asyncio.create_task(self._notify(waiter, position))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+    async def _notify(self, waiter, position):
+        _, on_position = waiter
+        try:
+            await on_position(position)
+        except Exception as e:
+            logger.warning(f"대기 순번 표시 실패: {e}")
+
+    def slot(self, on_position=None):
+        return _QueueSlot(self, on_position)
+
+
+class _QueueSlot:
+    def __init__(self, queue, on_position):
+        self.queue = queue
+        self.on_position = on_position
+
+    async def __aenter__(self):
+        await self.queue.acquire(self.on_position)
+
+    async def __aexit__(self, *exc):
+        self.queue.release()
+
+
+class QnABot(commands.Bot):
+    """Django API 호출용 공용 HTTP 세션/대기열/지연시간 통계를 가진 봇"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.http_session = None
+        self.api_queue = RequestQueue(DJANGO_MAX_CONCURRENCY)
+        self.api_latency = {}
+        self.intake = QuestionIntake(INTAKE_QUEUE_SIZE, INTAKE_WORKERS)
+
+    async def setup_hook(self):
+        # 질문마다 세션(커넥터, DNS 조회, TCP 연결)을 새로 만들지 않도록 봇 수명 동안 하나를 재사용
+        connector = aiohttp.TCPConnector(
+            limit_per_host=DJANGO_CONN_LIMIT_PER_HOST,
+            keepalive_timeout=DJANGO_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300,
+        )
+        self.http_session = aiohttp.ClientSession(connector=connector)
+        logger.info(
+            f"Django API 세션 생성 (동시 호출 {DJANGO_MAX_CONCURRENCY}, 호스트당 연결 {DJANGO_CONN_LIMIT_PER_HOST})"
+        )
+        self.intake.start(answer_question)
+
+    async def close(self):
+        await self.intake.stop()
+        logger.info(self.intake.status_text())
+        for histogram in self.api_latency.values():
+            logger.info(histogram.summary())
+        if self.http_session:
+            await self.http_session.close()
+        await super().close()
+
+    def record_latency(self, name, seconds):
+        if name not in self.api_latency:
+            self.api_latency[name] = LatencyHistogram(name)
+        self.api_latency[name].observe(seconds)
+
+
+class TokenBucket:
+    """초당 rate개씩 충전되고 최대 capacity개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self):
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def refund(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def is_full(self):
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+def normalize_for_flood(text):
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class QuestionIntake:
+    """
+    질문 접수 파이프라인
+    중복 질문 억제 -> 사용자/채널 빈도 제한 -> 크기가 정해진 대기열 -> 작업자 풀 순서로 처리하며
+    거절/억제된 건수는 사유별로 집계 (!봇상태로 확인)
+    """
+
+    # 버킷/최근 질문 기록이 이 개수를 넘으면 다 충전된(한동안 조용한) 항목부터 정리
+    MAX_TRACKED_KEYS = 5000
+
+    def __init__(self, maxsize, workers):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.worker_count = workers
+        self.workers = []
+        self.user_buckets = {}
+        self.channel_buckets = {}
+        self.recent_questions = {}
+        self.stats = Counter()
+
+    def start(self, handler):
+        for index in range(self.worker_count):
+            self.workers.append(asyncio.create_task(self._work(handler), name=f"question-worker-{index}"))
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers.clear()
+
+    async def _work(self, handler):
+        while True:
+            message, question_text = await self.queue.get()
+            try:
+                await handler(message, question_text)
+            except Exception as e:
+                logger.error(f"질문 처리 중 오류: {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+
+    def _bucket(self, buckets, key, per_minute, burst):
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.MAX_TRACKED_KEYS:
+                for stale in [k for k, b in buckets.items() if b.is_full()]:
+                    del buckets[stale]
+            bucket = buckets[key] = TokenBucket(per_minute / 60, burst)
+        return bucket
+
+    def _is_flood(self, user_id, question_text):
+        now = time.monotonic()
+        normalized = normalize_for_flood(question_text)
+        recent = [(at, text) for at, text in self.recent_questions.get(user_id, []) if now - at < FLOOD_WINDOW]
+        self.recent_questions[user_id] = recent
+        for _, text in recent:
+            if text == normalized or difflib.SequenceMatcher(None, text, normalized).ratio() >= FLOOD_SIMILARITY:
+                return True
+        return False
+
+    def _remember(self, user_id, question_text):
+        if user_id not in self.recent_questions and len(self.recent_questions) >= self.MAX_TRACKED_KEYS:
+            now = time.monotonic()
+            for stale in [k for k, v in self.recent_questions.items() if not v or now - v[-1][0] >= FLOOD_WINDOW]:
+                del self.recent_questions[stale]
+        self.recent_questions.setdefault(user_id, []).append((time.monotonic(), normalize_for_flood(question_text)))
+
+    def submit(self, message, question_text):
+        """
+        질문을 대기열에 넣고 결과를 반환
+        accepted / duplicate / user_limited / channel_limited / queue_full
+        """
+        user_id, channel_id = message.author.id, message.channel.id
+        # 스크린샷만 올린 질문은 비교할 글이 없으므로 중복 억제 없이 빈도 제한만 적용
+        if question_text and self._is_flood(user_id, question_text):
+            return self._count("duplicate")
+
+        user_bucket = self._bucket(self.user_buckets, user_id, USER_QUESTIONS_PER_MINUTE, USER_QUESTION_BURST)
+        if not user_bucket.try_take():
+            return self._count("user_limited")
+        channel_bucket = self._bucket(
+            self.channel_buckets, channel_id, CHANNEL_QUESTIONS_PER_MINUTE, CHANNEL_QUESTION_BURST
+        )
+        if not channel_bucket.try_take():
+            user_bucket.refund()
+            return self._count("channel_limited")
+
+        try:
+            self.queue.put_nowait((message, question_text))
+        except asyncio.QueueFull:
+            user_bucket.refund()
+            channel_bucket.refund()
+            return self._count("queue_full")
+        if question_text:
+            self._remember(user_id, question_text)
+        return self._count("accepted")
+
+    def _count(self, outcome):
+        self.stats[outcome] += 1
+        return outcome
+
+    def status_text(self):
+        dropped = {k: v for k, v in self.stats.items() if k != "accepted"}
+        return (
+            f"대기열 {self.queue.qsize()}/{self.queue.maxsize} (작업자 {self.worker_count}) | "
+            f"접수 {self.stats['accepted']} | 거절 {sum(dropped.values())} "
+            f"(중복 {dropped.get('duplicate', 0)}, 사용자 제한 {dropped.get('user_limited', 0)}, "
+            f"채널 제한 {dropped.get('channel_limited', 0)}, 대기열 초과 {dropped.get('queue_full', 0)})"
+        )
+
+
+# 백그라운드 태스크 (가비지 컬렉션으로 중단되지 않도록 참조 유지)
+background_tasks = set()
+
 # 2. 봇 설정
 intents = discord.Intents.default()
 intents.message_content = True
@@ -35,7 +372,7 @@ intents.messages = True
 intents.message_content = True
 intents.guilds = True
 intents.members = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = QnABot(command_prefix="!", intents=intents)
 logger.info("bot object created")
 
 try:
@@ -49,14 +386,246 @@ async def on_ready():
     logger.info(f"✅ 봇 로그인 성공: {bot.user.name}")
 
 
-async def call_django_api(question_text):
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            DJANGO_API_URL,
-            json={"question_text": question_text},
-            timeout=aiohttp.ClientTimeout(total=120),
+def select_attachments(message):
+    """
+    질문과 함께 보낼 첨부 이미지를 고름 (내려받기 전에 디스코드가 알려준 형식/크기로 판단)
+    반환: (보낼 첨부 목록, 제외한 파일 안내 목록)
+    """
+    accepted, skipped = [], []
+    for attachment in message.attachments:
+        content_type = (attachment.content_type or "").split(";")[0].strip()
+        if content_type not in ATTACHMENT_TYPES:
+            skipped.append(f"{attachment.filename} (이미지 파일이 아닙니다)")
+        elif attachment.size > ATTACHMENT_MAX_BYTES:
+            skipped.append(f"{attachment.filename} ({ATTACHMENT_MAX_BYTES // (1024 * 1024)}MB 초과)")
+        elif len(accepted) >= ATTACHMENT_MAX_COUNT:
+            skipped.append(f"{attachment.filename} (최대 {ATTACHMENT_MAX_COUNT}장)")
+        else:
+            accepted.append(attachment)
+    return accepted, skipped
+
+
+class AttachmentPayload(aiohttp.payload.AsyncIterablePayload):
+    """
+    디스코드 CDN의 첨부 파일을 받는 대로 multipart 본문으로 흘려보내는 payload (봇 메모리에 파일 전체를 올리지 않음)
+    크기를 미리 알려주므로 요청에 Content-Length가 붙어 chunked 요청을 받지 못하는 서버(runserver)에도 보낼 수 있음
+    """
+
+    def __init__(self, attachment, session):
+        super().__init__(self._chunks(attachment, session), content_type=attachment.content_type)
+        self._size = attachment.size
+
+    @staticmethod
+    async def _chunks(attachment, session):
+        received = 0
+        async with session.get(attachment.url, timeout=aiohttp.ClientTimeout(total=60)) as resp:
+            resp.raise_for_status()
+            async for chunk in resp.content.iter_chunked(ATTACHMENT_CHUNK_SIZE):
+                received += len(chunk)
+                if received > attachment.size:
+                    raise ValueError(f"첨부 파일 크기가 예상보다 큽니다: {attachment.filename}")
+                yield chunk
+        # 선언한 Content-Length와 실제 본문이 다르면 서버가 요청을 잘못 읽으므로 중단
+        if received != attachment.size:
+            raise ValueError(f"첨부 파일을 끝까지 받지 못했습니다: {attachment.filename}")
+
+
+def question_request_body(fields, attachments):
+    """첨부가 없으면 JSON, 있으면 첨부를 스트리밍하는 multipart 요청 인자"""
+    if not attachments:
+        return {"json": fields}
+    writer = aiohttp.MultipartWriter("form-data")
+    for name, value in fields.items():
+        part = aiohttp.payload.StringPayload(str(value))
+        part.set_content_disposition("form-data", name=name)
+        writer.append_payload(part)
+    for attachment in attachments:
+        part = AttachmentPayload(attachment, bot.http_session)
+        part.set_content_disposition("form-data", name="images", filename=attachment.filename)
+        writer.append_payload(part)
+    return {"data": writer}
+
+
+async def call_django_api(question_text, attachments=(), on_position=None):
+    fields = {"question_text": question_text}
+    if DJANGO_JOB_MODE:
+        fields["mode"] = "job"
+    async with bot.api_queue.slot(on_position):
+        started = time.monotonic()
+        try:
+            async with bot.http_session.post(
+                DJANGO_API_URL,
+                **question_request_body(fields, attachments),
+                timeout=aiohttp.ClientTimeout(total=120),
+            ) as resp:
+                return await resp.json()
+        finally:
+            bot.record_latency("qna", time.monotonic() - started)
+
+
+async def fetch_job_status(status_url):
+    # 상태 조회는 가벼운 GET이라 대기열을 거치지 않음
+    started = time.monotonic()
+    try:
+        async with bot.http_session.get(
+            status_url, timeout=aiohttp.ClientTimeout(total=10)
         ) as resp:
             return await resp.json()
+    finally:
+        bot.record_latency("job_status", time.monotonic() - started)
+
+
+async def wait_for_job(message, status_url):
+    """
+    job 모드로 접수된 질문의 처리 결과를 기다렸다가 원래 메세지에 답장
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + JOB_POLL_TIMEOUT
+    while loop.time() < deadline:
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        try:
+            result = await fetch_job_status(status_url)
+        except Exception as e:
+            logger.warning(f"작업 상태 조회 실패, 다시 시도합니다: {e}")
+            continue
+        if result.get("status") != "processing":
+            await deliver_result(message, result)
+            return
+    await message.reply("⌛ 답변 생성이 지연되고 있습니다. 잠시 후 다시 질문해주세요")
+
+
+async def deliver_result(message, result):
+    """서버 응답(status별)을 디스코드 메세지로 전달"""
+    # 노션에 등록되있으면 링크 반환
+    if result.get("status") == "verified":
+        notion_url = result.get("notion_url")
+        msg_content = (
+            f"**이미 정리된 질문입니다!**\n **노션링크** {notion_url}"
+            if notion_url
+            else "✅ 이미 정리된 질문입니다! 노션 게시판을 확인해주세요."
+        )
+        await send_long_message(message, msg_content)
+    elif result.get("status") == "duplicate":
+        ai_ans = result.get("ai_answer", "이전 답변을 찾을수 없습니다")
+        await send_long_message(
+            message, ai_ans, prefix="**관리자가 노션에 정리중입니다**"
+        )
+    elif result.get("status") == "processing":
+        await message.reply(
+            "** 새로운 질문이 접수되었습니다!**\n AI가 분석을 시작했습니다**"
+        )
+        status_url = result.get("status_url")
+        if status_url:
+            task = asyncio.create_task(wait_for_job(message, status_url))
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+    elif result.get("status") == "new":
+        ai_ans = result.get("ai_answer", "답변 생성에 실패했습니다.")
+        await send_long_message(message, ai_ans, prefix="🆕 **분석 결과**")
+    elif result.get("status") == "failed":
+        await message.reply(f"❌ 답변 생성 실패: {result.get('error', '')[:200]}")
+
+    else:
+        current_status = result.get("status")
+        await message.reply(
+            f" 알수 없는 서버 응답입니다 (status: {current_status})"
+        )
+
+
+async def iter_sse_events(resp):
+    """SSE 응답에서 (event, data) 쌍을 읽어옵니다"""
+    event, data_lines = "message", []
+    async for raw_line in resp.content:
+        line = raw_line.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+
+
+class StreamingReply:
+    """
+    스트리밍되는 답변을 디스코드 메세지에 점진적으로 반영
+    수정은 STREAM_EDIT_INTERVAL마다 한 번으로 모으고, 2000자를 넘으면 다음 메세지로 이어서 보냄
+    """
+
+    def __init__(self, reply_target, prefix=""):
+        self.reply_target = reply_target
+        self.text = f"{prefix}\n" if prefix else ""
+        self.messages = []
+        self.rendered = []
+        self.last_flush = 0.0
+
+    def _segments(self):
+        return [
+            self.text[i : i + DISCORD_MESSAGE_LIMIT]
+            for i in range(0, len(self.text), DISCORD_MESSAGE_LIMIT)
+        ]
+
+    async def append(self, chunk):
+        self.text += chunk
+        if time.monotonic() - self.last_flush >= STREAM_EDIT_INTERVAL:
+            await self.flush()
+
+    async def flush(self):
+        self.last_flush = time.monotonic()
+        for index, segment in enumerate(self._segments()):
+            if index < len(self.messages):
+                # 이미 보낸 메세지는 내용이 바뀐 경우(보통 마지막 메세지)에만 수정
+                if self.rendered[index] != segment:
+                    await self.messages[index].edit(content=segment)
+                    self.rendered[index] = segment
+            else:
+                if index == 0:
+                    sent = await self.reply_target.reply(segment)
+                else:
+                    sent = await self.reply_target.channel.send(segment)
+                self.messages.append(sent)
+                self.rendered.append(segment)
+
+
+async def stream_question(message, question_text, attachments=(), on_position=None):
+    """
+    스트리밍 엔드포인트로 질문을 보내고 답변을 생성되는 대로 보여줌
+    chunk 없이 결과 이벤트만 오면(기존 질문, 처리 중인 같은 질문의 결과 등) deliver_result로 전달
+    """
+    reply = StreamingReply(message, prefix="🆕 **분석 결과**")
+    async with bot.api_queue.slot(on_position):
+        started = time.monotonic()
+        try:
+            async with bot.http_session.post(
+                DJANGO_STREAM_URL,
+                **question_request_body({"question_text": question_text}, attachments),
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=120),
+            ) as resp:
+                if resp.content_type != "text/event-stream":
+                    await deliver_result(message, await resp.json())
+                    return
+                first_chunk_at = None
+                async for event, data in iter_sse_events(resp):
+                    if event == "chunk":
+                        if first_chunk_at is None:
+                            first_chunk_at = time.monotonic()
+                            bot.record_latency("stream_ttft", first_chunk_at - started)
+                            logger.info(f"첫 응답까지 {(first_chunk_at - started) * 1000:.0f}ms")
+                        await reply.append(data["text"])
+                    elif event == "result":
+                        # 처리 중인 같은 질문의 결과를 받은 경우 등은 chunk 없이 결과만 오므로 결과 내용을 그대로 전달
+                        if first_chunk_at is not None:
+                            await reply.flush()
+                            logger.info(
+                                f"스트리밍 완료 (서버 TTFT {data.get('ttft_ms')}ms, 전체 {(time.monotonic() - started) * 1000:.0f}ms)"
+                            )
+                        else:
+                            await deliver_result(message, data)
+                    elif event == "error":
+                        await message.reply(f"❌ 서버 오류: {data.get('error', '')[:200]}")
+        finally:
+            bot.record_latency("stream", time.monotonic() - started)
 
 
 def sanitize_category(ai_answer):
@@ -87,61 +656,68 @@ async def send_long_message(reply_target, content, prefix=""):
             await reply_target.channel.send(chunk)
 
 
+async def answer_question(message, question_text):
+    """접수된 질문 하나를 처리 (QuestionIntake 작업자가 호출)"""
+    attachments, skipped = select_attachments(message)
+    if skipped:
+        await message.reply("📎 다음 첨부는 제외하고 질문합니다:\n" + "\n".join(f"- {name}" for name in skipped))
+    status_msg = await message.channel.send("🤖 분석 중입니다...")
+
+    async def show_position(position):
+        if position:
+            await status_msg.edit(content=f"⏳ 질문이 많아 대기 중입니다 (대기 {position}번째)")
+        else:
+            await status_msg.edit(content="🤖 분석 중입니다...")
+
+    try:
+        if DJANGO_STREAM_MODE:
+            await stream_question(message, question_text, attachments, on_position=show_position)
+        else:
+            result = await call_django_api(question_text, attachments, on_position=show_position)
+            logger.debug(f"🔥 Django API 응답: {result}")
+            await deliver_result(message, result)
+
+    except Exception as e:
+        await message.reply(f"❌ 서버 오류: {str(e)[:200]}")
+
+    finally:
+        await status_msg.delete()
+
+
 @bot.event
 async def on_message(message):
-    logger.info(
-        f"메세지: {message.content} | 채널타입: {message.channel.type} | 작성자: {message.author}"
-    )
+    # 모든 채널의 모든 메세지가 들어오므로 값싼 접두어 검사로 명령이 아닌 메세지는 바로 무시
+    content = message.content
+    if not content.startswith("!"):
+        return
     # 봇 본인의 메시지는 무시
     if message.author == bot.user:
         return
 
-    if message.content.startswith("!질문"):
-        question_text = message.content.replace("!질문", "").strip()
-
-        if not question_text:
-            await message.reply("❓ 질문 내용을 입력해주세요")
-            return
-
-        status_msg = await message.channel.send("🤖 분석 중입니다...")
-
-        try:
-            result = await call_django_api(question_text)
-            logger.debug(f"🔥 Django API 응답: {result}")
+    if content.startswith("!봇상태"):
+        latency = "\n".join(h.summary() for h in bot.api_latency.values())
+        await message.reply(f"{bot.intake.status_text()}\n{latency}".strip())
+        return
 
-            # 노션에 등록되있으면 링크 반환
-            if result.get("status") == "verified":
-                notion_url = result.get("notion_url")
-                msg_content = (
-                    f"**이미 정리된 질문입니다!**\n **노션링크** {notion_url}"
-                    if notion_url
-                    else "✅ 이미 정리된 질문입니다! 노션 게시판을 확인해주세요."
-                )
-                await send_long_message(message, msg_content)
-            elif result.get("status") == "duplicate":
-                ai_ans = result.get("ai_answer", "이전 답변을 찾을수 없습니다")
-                await send_long_message(
-                    message, ai_ans, prefix="**관리자가 노션에 정리중입니다**"
-                )
-            elif result.get("status") == "processing":
-                await message.reply(
-                    "** 새로운 질문이 접수되었습니다!**\n AI가 분석을 시작했습니다**"
-                )
-            elif result.get("status") == "new":
-                ai_ans = result.get("ai_answer", "답변 생성에 실패했습니다.")
-                await send_long_message(message, ai_ans, prefix="🆕 **분석 결과**")
+    if not content.startswith("!질문"):
+        return
 
-            else:
-                current_status = result.get("status")
-                await message.reply(
-                    f" 알수 없는 서버 응답입니다 (status: {current_status})"
-                )
+    logger.info(f"질문 수신 | 채널: {message.channel.id} | 작성자: {message.author.id}")
+    question_text = content[len("!질문"):].strip()
 
-        except Exception as e:
-            await message.reply(f"❌ 서버 오류: {str(e)[:200]}")
+    # 글 없이 스크린샷만 올린 질문도 받음 (서버가 같은 스크린샷의 검증된 질문을 이미지 해시로 찾음)
+    if not question_text and not select_attachments(message)[0]:
+        await message.reply("❓ 질문 내용이나 스크린샷을 입력해주세요")
+        return
 
-        finally:
-            await status_msg.delete()
+    outcome = bot.intake.submit(message, question_text)
+    if outcome == "queue_full":
+        await message.reply("🚧 지금은 질문이 너무 많습니다. 잠시 후 다시 질문해주세요")
+    elif outcome in ("user_limited", "channel_limited"):
+        # 답장 대신 반응만 남겨 채널이 거절 메세지로 도배되지 않도록 함
+        await message.add_reaction("⏳")
+    elif outcome == "duplicate":
+        await message.add_reaction("🔁")
 
     # 3. 봇 실행
 
@@ -189,8 +189,42 @@ Q_CLUSTER = {
     "orm": "default",
 }
 
+# 유사 질문 판정 기준 (pg_trgm 유사도)
+SIMILARITY_THRESHOLD = env.float("SIMILARITY_THRESHOLD", default=0.6)
+# trigram 비교 대상: question_signature(경로/줄 번호 등을 지운 정규화 서명) / question_text(원문)
+# 기존 질문의 서명은 0011 마이그레이션이 채움 (정규화 규칙을 바꾼 뒤에는 backfill_question_signatures --all)
+SIMILARITY_FIELD = env("SIMILARITY_FIELD", default="question_signature")
+QUESTION_SIGNATURE_MAX_LENGTH = env.int("QUESTION_SIGNATURE_MAX_LENGTH", default=512)
+# 검토 전 질문 중 이 기간(일) 안에 들어온 질문은 저장된 AI 답변을 duplicate로 재사용
+DUPLICATE_LOOKBACK_DAYS = env.int("DUPLICATE_LOOKBACK_DAYS", default=7)
+# trigram: pg_trgm만 사용 / hybrid: trigram에서 못 찾으면 임베딩 인덱스로 한 번 더 검색
+SIMILARITY_MODE = env("SIMILARITY_MODE", default="trigram")
+EMBEDDING_BACKEND = env("EMBEDDING_BACKEND", default="archiver.embeddings.GeminiEmbeddingBackend")
+EMBEDDING_INDEX_DIR = env("EMBEDDING_INDEX_DIR", default=os.path.join(BASE_DIR, "data", "embeddings"))
+EMBEDDING_SIMILARITY_THRESHOLD = env.float("EMBEDDING_SIMILARITY_THRESHOLD", default=0.85)
+EMBEDDING_TOP_K = env.int("EMBEDDING_TOP_K", default=5)
+# 인덱스에 덧붙인 변경(추가/교체/삭제)이 이만큼 쌓이면 기준 행렬과 합쳐 새 버전을 만듦
+EMBEDDING_INDEX_MAX_DELTA = env.int("EMBEDDING_INDEX_MAX_DELTA", default=1000)
+
+# hit_count 버퍼링: 켜면 프로세스별로 모아 FLUSH_INTERVAL초마다(또는 FLUSH_SIZE개마다) 한 번에 반영
+HIT_COUNT_BUFFER_ENABLED = env.bool("HIT_COUNT_BUFFER_ENABLED", default=False)
+HIT_COUNT_FLUSH_INTERVAL = env.float("HIT_COUNT_FLUSH_INTERVAL", default=5.0)
+HIT_COUNT_FLUSH_SIZE = env.int("HIT_COUNT_FLUSH_SIZE", default=100)
+
+# 동일 질문 동시 처리 합치기: 리더를 기다리는 최대 시간(초, 이보다 오래된 리더 표시는 넘겨받음)과
+# 같은 지문의 최근 질문을 재사용하는 기간(초)
+SINGLEFLIGHT_TIMEOUT = env.float("SINGLEFLIGHT_TIMEOUT", default=30.0)
+SINGLEFLIGHT_REUSE_WINDOW = env.float("SINGLEFLIGHT_REUSE_WINDOW", default=60.0)
+
+# 유사 질문 검색과 동시에 Gemini 호출 시작 (off / always / fingerprint_miss, archiver.speculation 참고)
+SPECULATIVE_DISPATCH = env("SPECULATIVE_DISPATCH", default="off")
+SPECULATIVE_MAX_WORKERS = env.int("SPECULATIVE_MAX_WORKERS", default=8)
+SPECULATIVE_STATS_LOG_EVERY = env.int("SPECULATIVE_STATS_LOG_EVERY", default=100)
+
 # Gemini
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Gemini API 주소 (비우면 SDK 기본 주소, 벤치마크는 가짜 서버 주소로 바꿔서 사용)
+GEMINI_API_BASE_URL = env("GEMINI_API_BASE_URL", default=None)
 
 # Discord
 DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
@@ -199,5 +233,44 @@ DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 NOTION_DB_ID = os.getenv("NOTION_DB_ID")
 NOTION_BOARD_URL = os.getenv("NOTION_BOARD_URL")
+# 로컬 가짜 서버로 벤치마크/테스트할 때 변경
+NOTION_API_URL = env("NOTION_API_URL", default="https://api.notion.com/v1")
+# 노션 호출 제한: 모든 워커 합산 초당 호출 수(0이면 제한 없음)와 순간 허용량, 429/5xx 재시도 횟수
+NOTION_RATE_LIMIT = env.float("NOTION_RATE_LIMIT", default=3.0)
+NOTION_RATE_BURST = env.int("NOTION_RATE_BURST", default=3)
+NOTION_MAX_RETRIES = env.int("NOTION_MAX_RETRIES", default=5)
+NOTION_POOL_SIZE = env.int("NOTION_POOL_SIZE", default=4)
+# 노션 업로드 outbox 디스패처: 한 번에 가져갈 항목 수, 최대 시도 횟수, 재시도 대기(초, 시도마다 2배),
+# 이 시간(초)이 지나도록 끝나지 않은 in_flight 항목은 워커가 죽은 것으로 보고 다시 가져감
+NOTION_OUTBOX_BATCH_SIZE = env.int("NOTION_OUTBOX_BATCH_SIZE", default=20)
+NOTION_OUTBOX_MAX_ATTEMPTS = env.int("NOTION_OUTBOX_MAX_ATTEMPTS", default=5)
+NOTION_OUTBOX_RETRY_DELAY = env.float("NOTION_OUTBOX_RETRY_DELAY", default=60.0)
+NOTION_OUTBOX_CLAIM_TIMEOUT = env.float("NOTION_OUTBOX_CLAIM_TIMEOUT", default=300.0)
+# 노션 페이지 주기 동기화(notion-page-sync 스케줄)에서 한 번에 가져갈 바뀐 질문 수,
+# 이 시간(초)이 지나도록 끝나지 않은 동기화는 워커가 죽은 것으로 보고 다시 가져감
+NOTION_SYNC_BATCH_SIZE = env.int("NOTION_SYNC_BATCH_SIZE", default=20)
+NOTION_SYNC_CLAIM_TIMEOUT = env.float("NOTION_SYNC_CLAIM_TIMEOUT", default=300.0)
+# 노션을 호출하는 워커 태스크 한 번의 작업 시간(초) - 지나면 새 묶음을 가져가지 않고 멈춤
+# (Q_CLUSTER timeout 60초 안에 끝나야 워커가 강제 종료되지 않음)
+NOTION_TASK_TIME_BUDGET = env.float("NOTION_TASK_TIME_BUDGET", default=30.0)
 
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+
+# Gemini 응답 캐시 (같은 호스트의 모든 프로세스가 공유하는 SQLite 파일)
+GEMINI_CACHE_ENABLED = env.bool("GEMINI_CACHE_ENABLED", default=True)
+GEMINI_CACHE_PATH = env("GEMINI_CACHE_PATH", default=os.path.join(BASE_DIR, "data", "gemini_cache.sqlite3"))
+GEMINI_CACHE_TTL = env.float("GEMINI_CACHE_TTL", default=7 * 24 * 3600)
+GEMINI_CACHE_MAX_ENTRIES = env.int("GEMINI_CACHE_MAX_ENTRIES", default=10000)
+
+# Gemini로 보내기 전 첨부 이미지 전처리 (긴 변 기준 축소 후 재인코딩)
+IMAGE_MAX_EDGE = env.int("IMAGE_MAX_EDGE", default=1568)
+IMAGE_FORMAT = env("IMAGE_FORMAT", default="WEBP")
+IMAGE_QUALITY = env.int("IMAGE_QUALITY", default=80)
+# 디코딩 전에 거르는 상한 (업로드 크기, 픽셀 수)
+IMAGE_MAX_UPLOAD_BYTES = env.int("IMAGE_MAX_UPLOAD_BYTES", default=20 * 1024 * 1024)
+IMAGE_MAX_PIXELS = env.int("IMAGE_MAX_PIXELS", default=40_000_000)
+# 같은 스크린샷 재질문 검색: dHash 해밍 거리 상한(256비트 중)과 인덱스 갱신 확인 주기(초)
+IMAGE_HASH_MAX_DISTANCE = env.int("IMAGE_HASH_MAX_DISTANCE", default=16)
+IMAGE_INDEX_REFRESH_SECONDS = env.float("IMAGE_INDEX_REFRESH_SECONDS", default=30)
+# 질문 하나에 첨부할 수 있는 이미지 수 (초과분은 무시)
+IMAGE_MAX_COUNT = env.int("IMAGE_MAX_COUNT", default=4)